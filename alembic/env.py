@@ -28,6 +28,24 @@ if database_url:
 # target_metadata = mymodel.Base.metadata
 target_metadata = BaseModel.metadata
 
+# Объекты поиска создаются DDL-событиями (src/models/search.py) и не описаны
+# в метаданных: autogenerate не должен предлагать их удалить
+SEARCH_OBJECTS = {
+    "search_vector",
+    "ix_tasks_search_vector",
+    "ix_users_email_trgm",
+    "ix_users_username_trgm",
+    "ix_categories_title_trgm",
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Исключить объекты поиска из autogenerate"""
+    if reflected and compare_to is None:
+        return name not in SEARCH_OBJECTS and not name.startswith("tasks_fts")
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -50,6 +68,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -73,7 +92,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,61 @@
+"""add_task_access_path_indexes
+
+Revision ID: 3c1d2e4f5a6b
+Revises: 987099a9f639
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1d2e4f5a6b"
+down_revision: str | Sequence[str] | None = "987099a9f639"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ix_tasks_task_id дублирует первичный ключ, а B-tree по title
+    # не используется запросами ILIKE '%...%'
+    op.drop_index("ix_tasks_title", table_name="tasks")
+    op.drop_index("ix_tasks_task_id", table_name="tasks")
+
+    op.create_index(
+        "ix_tasks_user_id_created_at",
+        "tasks",
+        ["user_id", sa.text("created_at DESC"), sa.text("task_id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_tasks_user_id_status", "tasks", ["user_id", "status"], unique=False
+    )
+    op.create_index(
+        "ix_tasks_user_id_category_id",
+        "tasks",
+        ["user_id", "category_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_tasks_user_id_priority", "tasks", ["user_id", "priority"], unique=False
+    )
+    op.create_index(
+        "ix_categories_user_id_title", "categories", ["user_id", "title"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_categories_user_id_title", table_name="categories")
+    op.drop_index("ix_tasks_user_id_priority", table_name="tasks")
+    op.drop_index("ix_tasks_user_id_category_id", table_name="tasks")
+    op.drop_index("ix_tasks_user_id_status", table_name="tasks")
+    op.drop_index("ix_tasks_user_id_created_at", table_name="tasks")
+
+    op.create_index(op.f("ix_tasks_task_id"), "tasks", ["task_id"], unique=False)
+    op.create_index(op.f("ix_tasks_title"), "tasks", ["title"], unique=False)
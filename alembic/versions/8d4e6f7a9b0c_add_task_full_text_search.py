@@ -0,0 +1,80 @@
+"""add_task_full_text_search
+
+Revision ID: 8d4e6f7a9b0c
+Revises: 3c1d2e4f5a6b
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d4e6f7a9b0c"
+down_revision: str | Sequence[str] | None = "3c1d2e4f5a6b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        # Генерируемая колонка заполняется для существующих строк сразу
+        op.execute("""
+            ALTER TABLE tasks ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+                || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+            ) STORED
+            """)
+        op.execute(
+            "CREATE INDEX ix_tasks_search_vector ON tasks USING GIN (search_vector)"
+        )
+    elif dialect == "sqlite":
+        op.execute("""
+            CREATE VIRTUAL TABLE tasks_fts USING fts5(
+                title, description, content='tasks', content_rowid='task_id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+            """)
+        op.execute(
+            "INSERT INTO tasks_fts(tasks_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')"
+        )
+        op.execute("""
+            CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts(rowid, title, description)
+                VALUES (new.task_id, new.title, new.description);
+            END
+            """)
+        op.execute("""
+            CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+                VALUES ('delete', old.task_id, old.title, old.description);
+            END
+            """)
+        op.execute("""
+            CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description
+            ON tasks BEGIN
+                INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+                VALUES ('delete', old.task_id, old.title, old.description);
+                INSERT INTO tasks_fts(rowid, title, description)
+                VALUES (new.task_id, new.title, new.description);
+            END
+            """)
+        # Индексируем задачи, созданные до миграции
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_tasks_search_vector")
+        op.execute("ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS tasks_fts_insert")
+        op.execute("DROP TABLE IF EXISTS tasks_fts")
@@ -0,0 +1,50 @@
+"""add_trigram_search_indexes
+
+Revision ID: b5c7d9e1f3a2
+Revises: 8d4e6f7a9b0c
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5c7d9e1f3a2"
+down_revision: str | Sequence[str] | None = "8d4e6f7a9b0c"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Триграммные индексы для поиска подстроки (ILIKE '%...%') и сходства
+TRIGRAM_INDEXES = [
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_users_username_trgm", "users", "username"),
+    ("ix_categories_title_trgm", "categories", "title"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # В SQLite триграммных индексов нет, сходство считается функцией на Python
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table_name, column_name in TRIGRAM_INDEXES:
+        op.create_index(
+            index_name,
+            table_name,
+            [column_name],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column_name: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != "postgresql":
+        return
+    for index_name, table_name, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(index_name, table_name=table_name)
+    # Расширение не удаляется: его могут использовать другие объекты базы
@@ -0,0 +1,190 @@
+"""
+Общие утилиты для бенчмарков: движок, наполнение данными,
+перехват SQL-запросов и получение планов выполнения.
+"""
+
+import os
+import random
+import statistics
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any
+
+# Бенчмарки не требуют полного набора переменных окружения приложения
+os.environ.setdefault("TESTING", "true")
+
+from sqlalchemy import Engine, create_engine, event, insert, text  # noqa: E402
+
+from src.models import Category, Task, User  # noqa: E402
+from src.models.base import Base  # noqa: E402
+from src.models.task import PriorityEnum, StatusEnum  # noqa: E402
+
+BATCH_SIZE = 10_000
+
+# Словарь для описаний задач: поиск по тексту получает слова с разной
+# частотой (первые слова встречаются чаще последних)
+WORD_STEMS = (
+    "report review deploy design budget invoice meeting release migrate "
+    "refactor support audit backup client contract sprint roadmap hiring "
+    "onboard security network database frontend backend mobile testing "
+    "document research launch partner"
+).split()
+WORDS = [f"{stem}{suffix}" for suffix in ("", "ing", "er", "ed") for stem in WORD_STEMS]
+
+
+def create_bench_engine(database_url: str) -> Engine:
+    """Создать движок для бенчмарка"""
+    connect_args = (
+        {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    )
+    return create_engine(database_url, connect_args=connect_args)
+
+
+def reset_schema(engine: Engine) -> None:
+    """Пересоздать все таблицы"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def analyze(engine: Engine) -> None:
+    """Обновить статистику планировщика"""
+    if engine.dialect.name == "postgresql":
+        # VACUUM обновляет visibility map, без нее нет Index Only Scan
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def seed_tasks(
+    engine: Engine,
+    users: int,
+    heavy_user_tasks: int,
+    tasks_per_user: int,
+    categories_per_user: int = 10,
+    seed: int = 42,
+) -> int:
+    """
+    Наполнить базу задачами: один "тяжелый" пользователь и остальные
+    с небольшим количеством задач. Возвращает ID тяжелого пользователя.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    statuses = list(StatusEnum)
+    priorities = list(PriorityEnum)
+    word_weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {
+                    "user_id": user_id,
+                    "email": f"bench{user_id}@example.com",
+                    "username": f"bench{user_id}",
+                    "hashed_password": "x",
+                }
+                for user_id in range(1, users + 1)
+            ],
+        )
+        conn.execute(
+            insert(Category),
+            [
+                {
+                    "category_id": (user_id - 1) * categories_per_user + index + 1,
+                    "user_id": user_id,
+                    "title": f"Category {index}",
+                }
+                for user_id in range(1, users + 1)
+                for index in range(categories_per_user)
+            ],
+        )
+
+    def rows() -> Iterator[dict[str, Any]]:
+        for user_id in range(1, users + 1):
+            count = heavy_user_tasks if user_id == 1 else tasks_per_user
+            for index in range(count):
+                created_at = start + timedelta(seconds=index * 7 + user_id)
+                yield {
+                    "title": f"Task {index} of user {user_id}",
+                    "description": f"Benchmark task number {index} "
+                    + " ".join(rng.choices(WORDS, weights=word_weights, k=4)),
+                    "status": rng.choice(statuses),
+                    "priority": rng.choice(priorities),
+                    "due_date": created_at + timedelta(days=rng.randint(-30, 30)),
+                    "user_id": user_id,
+                    "category_id": (user_id - 1) * categories_per_user
+                    + rng.randrange(categories_per_user)
+                    + 1,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+
+    batch: list[dict[str, Any]] = []
+    with engine.begin() as conn:
+        for row in rows():
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(insert(Task), batch)
+                batch.clear()
+        if batch:
+            conn.execute(insert(Task), batch)
+
+    analyze(engine)
+    return 1
+
+
+@contextmanager
+def capture_statements(engine: Engine) -> Iterator[list[tuple[str, Any]]]:
+    """Перехватить SQL-запросы (с параметрами), выполненные внутри блока"""
+    captured: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(engine: Engine, statement: str, parameters: Any) -> list[str]:
+    """Получить план выполнения запроса"""
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as conn:
+        result = conn.exec_driver_sql(prefix + statement, parameters)
+        # В SQLite описание шага - последняя колонка, в PostgreSQL - единственная
+        return [str(row[-1]) for row in result]
+
+
+def is_index_only(plan: list[str]) -> bool:
+    """Выполняется ли запрос только по индексу, без чтения таблицы"""
+    return any("Index Only Scan" in line or "COVERING INDEX" in line for line in plan)
+
+
+def uses_index(plan: list[str]) -> bool:
+    """Использует ли запрос индекс без полного сканирования таблицы"""
+    return any("Index" in line or "INDEX" in line for line in plan) and not any(
+        line.startswith("SCAN tasks") or "Seq Scan" in line for line in plan
+    )
+
+
+def timed(func: Callable[[], Any], repeat: int) -> float:
+    """Медианное время выполнения функции в миллисекундах"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Перцентиль задержки в миллисекундах"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
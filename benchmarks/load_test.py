@@ -0,0 +1,379 @@
+"""
+Нагрузочный тест HTTP API.
+
+Наполняет базу (SQLite-файл или PostgreSQL) и прогоняет через приложение
+смесь запросов: вход, список задач, поиск, создание, массовая смена
+статуса, статистика. Запросы идут в настоящее ASGI-приложение через
+httpx.ASGITransport, без сети. Последовательность запросов определяется
+--seed, поэтому прогоны с одинаковыми параметрами сравнимы.
+
+Для каждого маршрута выводятся количество запросов, пропускная
+способность, p50/p95/p99 и число ошибок; --output сохраняет результат в
+JSON. С --baseline результат сравнивается с сохраненным: если перцентиль
+(--metric) какого-либо маршрута вырос больше чем на --tolerance, команда
+завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.load_test --requests 2000 --concurrency 20
+    python -m benchmarks.load_test --mix list=10,search=2,create=1 --output load.json
+    python -m benchmarks.load_test --baseline load.json --tolerance 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import Engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import (
+    WORDS,
+    create_bench_engine,
+    percentile,
+    reset_schema,
+    seed_tasks,
+)
+from src.app import app
+from src.config import settings
+from src.database import get_db
+from src.models import Task, User
+from src.utils.password import get_password_hash
+
+PASSWORD = "benchpassword123"
+# Смесь запросов по умолчанию: сценарий -> вес
+DEFAULT_MIX = "login=1,list=10,search=4,create=2,bulk_status=1,statistics=2"
+# Сколько задач пользователя меняет один запрос массовой смены статуса
+BULK_SIZE = 20
+STATUSES = ("todo", "in_progress", "done")
+
+
+@dataclass
+class Request:
+    """HTTP-запрос сценария"""
+
+    method: str
+    url: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class LoadUser:
+    """Пользователь нагрузочного теста: токен и ID его задач"""
+
+    user_id: int
+    username: str
+    headers: dict[str, str]
+    task_ids: list[int]
+
+
+# Сценарий: маршрут (для отчета) и построение запроса
+SCENARIOS: dict[str, tuple[str, Callable[[LoadUser, random.Random], Request]]] = {
+    "login": (
+        "POST /token",
+        lambda user, rng: Request(
+            "POST",
+            "/token",
+            {"data": {"username": user.username, "password": PASSWORD}},
+        ),
+    ),
+    "list": (
+        "GET /api/tasks/",
+        lambda user, rng: Request(
+            "GET", "/api/tasks/", {"params": {"limit": 20, "include_total": "none"}}
+        ),
+    ),
+    "search": (
+        "GET /api/tasks/search",
+        lambda user, rng: Request(
+            "GET", "/api/tasks/search", {"params": {"q": rng.choice(WORDS[:20])}}
+        ),
+    ),
+    "create": (
+        "POST /api/tasks/",
+        lambda user, rng: Request(
+            "POST",
+            "/api/tasks/",
+            {"json": {"title": f"Load task {rng.randrange(1_000_000)}"}},
+        ),
+    ),
+    "bulk_status": (
+        "PATCH /api/tasks/bulk/status",
+        lambda user, rng: Request(
+            "PATCH",
+            "/api/tasks/bulk/status",
+            {
+                "json": {
+                    "task_ids": rng.sample(
+                        user.task_ids, min(BULK_SIZE, len(user.task_ids))
+                    ),
+                    "new_status": rng.choice(STATUSES),
+                }
+            },
+        ),
+    ),
+    "statistics": (
+        "GET /api/tasks/statistics",
+        lambda user, rng: Request("GET", "/api/tasks/statistics"),
+    ),
+}
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """Разобрать смесь запросов вида "list=10,search=2" """
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(
+                f"unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}"
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def prepare_users(engine: Engine, count: int) -> list[tuple[int, str, list[int]]]:
+    """Задать пароль первым count пользователям и получить ID их задач"""
+    hashed_password = get_password_hash(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(
+            update(User)
+            .where(User.user_id <= count)
+            .values(hashed_password=hashed_password)
+        )
+        users = conn.execute(
+            select(User.user_id, User.username)
+            .where(User.user_id <= count)
+            .order_by(User.user_id)
+        ).all()
+        return [
+            (
+                user_id,
+                username,
+                list(
+                    conn.scalars(
+                        select(Task.task_id)
+                        .where(Task.user_id == user_id)
+                        .order_by(Task.task_id)
+                        .limit(1000)
+                    )
+                ),
+            )
+            for user_id, username in users
+        ]
+
+
+async def run_load(
+    users: list[tuple[int, str, list[int]]],
+    mix: dict[str, float],
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> tuple[dict[str, list[float]], dict[str, int], float]:
+    """
+    Выполнить requests запросов с заданной параллельностью.
+    Возвращает задержки (мс) и число ошибок по маршрутам и общее время.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    # Последовательность запросов заранее: не зависит от порядка завершения
+    scenarios = rng.choices(names, weights=list(mix.values()), k=requests)
+    plan = [(name, rng.randrange(len(users))) for name in scenarios]
+    latencies: dict[str, list[float]] = {SCENARIOS[name][0]: [] for name in names}
+    errors: dict[str, int] = dict.fromkeys(latencies, 0)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        load_users = []
+        for user_id, username, task_ids in users:
+            response = await client.post(
+                "/token", data={"username": username, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            token = response.json()["access_token"]
+            load_users.append(
+                LoadUser(
+                    user_id, username, {"Authorization": f"Bearer {token}"}, task_ids
+                )
+            )
+
+        queue: asyncio.Queue[tuple[int, str, int]] = asyncio.Queue()
+        for index, (name, user_index) in enumerate(plan):
+            queue.put_nowait((index, name, user_index))
+
+        async def worker() -> None:
+            while not queue.empty():
+                index, name, user_index = queue.get_nowait()
+                route, build = SCENARIOS[name]
+                user = load_users[user_index]
+                request = build(user, random.Random(seed + index))
+                started = time.perf_counter()
+                response = await client.request(
+                    request.method,
+                    request.url,
+                    headers=user.headers,
+                    **request.kwargs,
+                )
+                latencies[route].append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 400:
+                    errors[route] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def summarize(
+    latencies: dict[str, list[float]], errors: dict[str, int], elapsed: float
+) -> dict[str, dict[str, float]]:
+    """Сводка по маршрутам: количество, запросов в секунду, перцентили"""
+    return {
+        route: {
+            "requests": len(values),
+            "errors": errors[route],
+            "throughput_rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        }
+        for route, values in latencies.items()
+        if values
+    }
+
+
+def compare(
+    routes: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    metric: str,
+    tolerance: float,
+) -> list[str]:
+    """Маршруты, у которых metric вырос больше чем на tolerance"""
+    regressions = []
+    for route, result in routes.items():
+        before = baseline.get(route, {}).get(metric)
+        if before and result[metric] > before * (1 + tolerance):
+            regressions.append(
+                f"{route}: {metric} {before:.2f} -> {result[metric]:.2f} ms "
+                f"(+{(result[metric] / before - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument(
+        "--heavy-user-tasks", type=int, default=10_000, help="задач у пользователя 1"
+    )
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument(
+        "--active-users", type=int, default=10, help="пользователей, шлющих запросы"
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="сохранить результат в JSON")
+    parser.add_argument("--baseline", type=Path, help="сравнить с результатом")
+    parser.add_argument("--metric", choices=("p50_ms", "p95_ms", "p99_ms"))
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.set_defaults(metric="p95_ms")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_load.db'}"
+    engine = create_bench_engine(database_url)
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    reset_schema(engine)
+    seed_tasks(
+        engine,
+        args.users,
+        args.heavy_user_tasks,
+        args.tasks_per_user,
+        seed=args.seed,
+    )
+    users = prepare_users(engine, min(args.active_users, args.users))
+
+    session_factory = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+    def get_bench_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_bench_db
+    try:
+        latencies, errors, elapsed = asyncio.run(
+            run_load(users, args.mix, args.requests, args.concurrency, args.seed)
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    routes = summarize(latencies, errors, elapsed)
+    total = sum(len(values) for values in latencies.values())
+    print(
+        f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s), "
+        f"concurrency {args.concurrency}, bcrypt rounds {settings.bcrypt_rounds}"
+    )
+    print(
+        f"\n{'route':<30} {'requests':>8} {'req/s':>8} {'p50':>8} "
+        f"{'p95':>8} {'p99':>8} {'errors':>6}  (ms)"
+    )
+    for route, result in routes.items():
+        print(
+            f"{route:<30} {result['requests']:>8} {result['throughput_rps']:>8.1f} "
+            f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['errors']:>6}"
+        )
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "config": {
+                        "database": engine.dialect.name,
+                        "users": args.users,
+                        "heavy_user_tasks": args.heavy_user_tasks,
+                        "tasks_per_user": args.tasks_per_user,
+                        "active_users": len(users),
+                        "mix": args.mix,
+                        "requests": args.requests,
+                        "concurrency": args.concurrency,
+                        "seed": args.seed,
+                    },
+                    "elapsed_s": elapsed,
+                    "routes": routes,
+                },
+                indent=2,
+            )
+        )
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["routes"]
+        regressions = compare(routes, baseline, args.metric, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} ({args.metric})")
+
+    if any(errors.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
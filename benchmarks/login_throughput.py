@@ -0,0 +1,175 @@
+"""
+Бенчмарк пропускной способности входа в систему.
+
+Запускает поток одновременных запросов POST /token и параллельно измеряет
+задержку легкого эндпоинта GET /health. Сравниваются режимы хеширования:
+bcrypt прямо в event loop (как при хешировании внутри async def), в пуле
+потоков (PASSWORD_HASH_WORKERS=0) и в пуле процессов. С пулом процессов
+задержка остальных эндпоинтов во время входа должна оставаться ровной.
+
+Запуск:
+    python -m benchmarks.login_throughput --logins 200 --concurrency 20
+    BCRYPT_ROUNDS=10 python -m benchmarks.login_throughput --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+# Бенчмарк измеряет реальный cost bcrypt, а не облегченный тестовый
+os.environ.setdefault("BCRYPT_ROUNDS", "12")
+
+import httpx  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from benchmarks.common import (  # noqa: E402
+    create_bench_engine,
+    percentile,
+    reset_schema,
+)
+from src.app import app  # noqa: E402
+from src.config import settings  # noqa: E402
+from src.database import get_db  # noqa: E402
+from src.models import User  # noqa: E402
+from src.utils import password  # noqa: E402
+
+USERNAME = "benchuser"
+PASSWORD = "benchpassword123"
+# Интервал между запросами GET /health, с
+PROBE_INTERVAL = 0.01
+
+
+async def _run_on_event_loop(func: Callable[..., Any], *args: str) -> Any:
+    """Хеширование прямо в event loop - поведение до выноса в пул"""
+    return func(*args)
+
+
+async def probe_latency(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    """
+    Измерять задержку GET /health, пока не выставлен stop.
+    Задержка считается от запланированного момента запроса, поэтому
+    включает время, на которое занятый event loop откладывает запрос.
+    """
+    latencies = []
+    while not stop.is_set():
+        scheduled = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        response = await client.get("/health")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+    return latencies
+
+
+async def login_storm(
+    client: httpx.AsyncClient, logins: int, concurrency: int
+) -> float:
+    """Выполнить logins входов с заданной параллельностью, вернуть время в с"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            response = await client.post(
+                "/token", data={"username": USERNAME, "password": PASSWORD}
+            )
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+async def run_mode(logins: int, concurrency: int) -> dict[str, float]:
+    """Измерить пропускную способность входа и задержку /health"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        # Прогрев: запуск пула процессов не должен попадать в измерения
+        await client.post("/token", data={"username": USERNAME, "password": PASSWORD})
+
+        idle_stop = asyncio.Event()
+        idle_task = asyncio.create_task(probe_latency(client, idle_stop))
+        await asyncio.sleep(0.5)
+        idle_stop.set()
+        idle = await idle_task
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe_latency(client, stop))
+        elapsed = await login_storm(client, logins, concurrency)
+        stop.set()
+        busy = await probe_task
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "idle_p50": statistics.median(idle),
+        "p50": statistics.median(busy),
+        "p95": percentile(busy, 95),
+        "max": max(busy),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 2, help="процессов bcrypt"
+    )
+    args = parser.parse_args()
+
+    database_path = Path(tempfile.mkdtemp()) / "bench_login.db"
+    engine = create_bench_engine(f"sqlite:///{database_path}")
+    reset_schema(engine)
+    session_factory = sessionmaker(autoflush=False, bind=engine)
+    with session_factory() as db:
+        db.add(
+            User(
+                email="bench@example.com",
+                username=USERNAME,
+                hashed_password=password.get_password_hash(PASSWORD),
+            )
+        )
+        db.commit()
+
+    def get_bench_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_bench_db
+    print(f"bcrypt rounds: {settings.bcrypt_rounds}, logins: {args.logins}")
+
+    run_hashing = password._run_hashing
+    modes: list[tuple[str, int, Callable[..., Any]]] = [
+        ("event loop", 0, _run_on_event_loop),
+        ("thread pool", 0, run_hashing),
+        (f"process pool x{args.workers}", args.workers, run_hashing),
+    ]
+
+    print(
+        f"\n{'mode':<18} {'logins/s':>9} {'idle p50':>9} "
+        f"{'p50':>8} {'p95':>8} {'max':>8}  (/health, ms)"
+    )
+    try:
+        for name, workers, hashing in modes:
+            settings.password_hash_workers = workers
+            password._run_hashing = hashing
+            result = asyncio.run(run_mode(args.logins, args.concurrency))
+            password.shutdown_password_executor()
+            print(
+                f"{name:<18} {result['logins_per_s']:>9.1f} "
+                f"{result['idle_p50']:>9.2f} {result['p50']:>8.2f} "
+                f"{result['p95']:>8.2f} {result['max']:>8.2f}"
+            )
+    finally:
+        password._run_hashing = run_hashing
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
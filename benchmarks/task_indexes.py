@@ -0,0 +1,141 @@
+"""
+Бенчмарк индексов таблицы задач.
+
+Наполняет базу большим количеством задач, выполняет запросы TaskRepository
+без индексов путей доступа и с ними и показывает планы выполнения:
+запросы подсчета должны выполняться только по индексу (Index Only Scan /
+COVERING INDEX), а списки - без полного сканирования и сортировки.
+
+Запуск:
+    python -m benchmarks.task_indexes --tasks 200000
+    python -m benchmarks.task_indexes --database-url postgresql://...
+"""
+
+import argparse
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, Index
+from sqlalchemy.orm import Session
+
+from benchmarks.common import (
+    analyze,
+    capture_statements,
+    create_bench_engine,
+    explain,
+    is_index_only,
+    reset_schema,
+    seed_tasks,
+    timed,
+    uses_index,
+)
+from src.models import Category, Task
+from src.models.task import StatusEnum
+from src.repositories.task_repository import TaskRepository
+
+# Индексы путей доступа, эффект которых измеряется
+ACCESS_PATH_INDEXES: list[Index] = [
+    *Task.__table__.indexes,
+    *Category.__table__.indexes,
+]
+
+Scenario = Callable[[TaskRepository, int], Any]
+
+SCENARIOS: dict[str, Scenario] = {
+    "list first page": lambda repo, user_id: repo.get_all_by_user(user_id, limit=20),
+    "list deep page": lambda repo, user_id: repo.get_all_by_user(
+        user_id, skip=10_000, limit=20
+    ),
+    "list by status": lambda repo, user_id: repo.get_by_status(
+        user_id, StatusEnum.todo, limit=20
+    ),
+    "list by category": lambda repo, user_id: repo.get_by_category(
+        user_id, 1, limit=20
+    ),
+    "count by user": lambda repo, user_id: repo.count_by_user(user_id),
+    "count by status": lambda repo, user_id: repo.count_by_status(
+        user_id, StatusEnum.done
+    ),
+    "statistics": lambda repo, user_id: repo.get_task_statistics(user_id),
+}
+
+
+def run_scenarios(engine: Engine, user_id: int, repeat: int) -> list[dict[str, Any]]:
+    """Выполнить сценарии и собрать время и планы выполнения"""
+    results = []
+    with Session(engine) as session:
+        repo = TaskRepository(session)
+        for name, scenario in SCENARIOS.items():
+            with capture_statements(engine) as statements:
+                scenario(repo, user_id)
+            plans = [explain(engine, sql, params) for sql, params in statements]
+            results.append(
+                {
+                    "scenario": name,
+                    "ms": timed(lambda s=scenario: s(repo, user_id), repeat),
+                    "index_only": [is_index_only(plan) for plan in plans],
+                    "uses_index": [uses_index(plan) for plan in plans],
+                    "plans": plans,
+                }
+            )
+    return results
+
+
+def print_results(title: str, results: list[dict[str, Any]], verbose: bool) -> None:
+    """Вывести результаты в виде таблицы"""
+    print(f"\n=== {title} ===")
+    print(f"{'scenario':<20} {'median ms':>10}  index-only  uses index")
+    for result in results:
+        print(
+            f"{result['scenario']:<20} {result['ms']:>10.2f}  "
+            f"{str(result['index_only']):<10}  {result['uses_index']}"
+        )
+        if verbose:
+            for plan in result["plans"]:
+                for line in plan:
+                    print(f"    {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument(
+        "--tasks", type=int, default=200_000, help="задач у тяжелого пользователя"
+    )
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--verbose", action="store_true", help="печатать планы")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_indexes.db'}"
+    engine = create_bench_engine(database_url)
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    reset_schema(engine)
+    for index in ACCESS_PATH_INDEXES:
+        index.drop(engine)
+    user_id = seed_tasks(engine, args.users, args.tasks, args.tasks_per_user)
+
+    without_indexes = run_scenarios(engine, user_id, args.repeat)
+    print_results("without access path indexes", without_indexes, args.verbose)
+
+    for index in ACCESS_PATH_INDEXES:
+        index.create(engine)
+    analyze(engine)
+
+    with_indexes = run_scenarios(engine, user_id, args.repeat)
+    print_results("with access path indexes", with_indexes, args.verbose)
+
+    print(f"\n{'scenario':<20} {'speedup':>10}")
+    for before, after in zip(without_indexes, with_indexes, strict=True):
+        speedup = before["ms"] / after["ms"] if after["ms"] else float("inf")
+        print(f"{before['scenario']:<20} {speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Бенчмарк поиска задач.
+
+Наполняет базу задачами (по умолчанию 1 000 000 у одного пользователя) и
+сравнивает TaskRepository.search_tasks через ILIKE по подстроке
+(FULL_TEXT_SEARCH=false) и через полнотекстовый индекс: FTS5 в SQLite,
+tsvector с GIN-индексом в PostgreSQL. Время измеряется для первой страницы
+с точным total и без подсчета (include_total=none).
+
+Запуск:
+    python -m benchmarks.task_search
+    python -m benchmarks.task_search --tasks 200000 --database-url postgresql://...
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from benchmarks.common import (
+    WORDS,
+    create_bench_engine,
+    reset_schema,
+    seed_tasks,
+    timed,
+)
+from src.config import settings
+from src.repositories.task_repository import TaskRepository
+from src.utils.pagination import TotalMode
+
+# Поисковые запросы: частое слово, редкое слово, два слова, нет совпадений
+QUERIES: dict[str, str] = {
+    "frequent word": WORDS[0],
+    "rare word": WORDS[-1],
+    "two words": f"{WORDS[1]} {WORDS[5]}",
+    "no match": "nonexistent",
+}
+PAGE_SIZE = 20
+
+
+def run_queries(
+    engine: Engine, user_id: int, full_text: bool, repeat: int
+) -> list[dict[str, Any]]:
+    """Выполнить поисковые запросы в заданном режиме и измерить время"""
+    settings.full_text_search = full_text
+    results = []
+    with Session(engine) as session:
+        repo = TaskRepository(session)
+        for name, query in QUERIES.items():
+            _, total = repo.search_tasks(query, user_id, limit=PAGE_SIZE)
+            results.append(
+                {
+                    "scenario": name,
+                    "matches": total,
+                    "exact_ms": timed(
+                        lambda q=query: repo.search_tasks(q, user_id, limit=PAGE_SIZE),
+                        repeat,
+                    ),
+                    "none_ms": timed(
+                        lambda q=query: repo.search_tasks(
+                            q, user_id, limit=PAGE_SIZE, total_mode=TotalMode.none
+                        ),
+                        repeat,
+                    ),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument(
+        "--tasks", type=int, default=1_000_000, help="задач у тяжелого пользователя"
+    )
+    parser.add_argument("--tasks-per-user", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_search.db'}"
+    engine = create_bench_engine(database_url)
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    reset_schema(engine)
+    user_id = seed_tasks(engine, args.users, args.tasks, args.tasks_per_user)
+
+    full_text_search = settings.full_text_search
+    try:
+        ilike = run_queries(engine, user_id, full_text=False, repeat=args.repeat)
+        full_text = run_queries(engine, user_id, full_text=True, repeat=args.repeat)
+    finally:
+        settings.full_text_search = full_text_search
+
+    print(
+        f"\n{'scenario':<14} {'matches':>16}  {'ILIKE ms':>9} {'FTS ms':>9} "
+        f"{'speedup':>8}  {'ILIKE ms':>9} {'FTS ms':>9} {'speedup':>8}"
+    )
+    print(f"{'':<14} {'ILIKE / FTS':>16}  {'total=exact':^28}  {'total=none':^28}")
+    for before, after in zip(ilike, full_text, strict=True):
+        matches = f"{before['matches']} / {after['matches']}"
+        columns = []
+        for key in ("exact_ms", "none_ms"):
+            speedup = before[key] / after[key] if after[key] else float("inf")
+            columns.append(f"{before[key]:>9.2f} {after[key]:>9.2f} {speedup:>7.1f}x")
+        print(f"{before['scenario']:<14} {matches:>16}  {'  '.join(columns)}")
+
+
+if __name__ == "__main__":
+    main()
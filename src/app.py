@@ -1,10 +1,20 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .routers import auth, categories, tasks, token, users
+from .monitoring.middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryCountMiddleware,
+    TracingMiddleware,
+)
+from .monitoring.tracing import configure_tracing, create_exporter
+from .routers import auth, categories, monitoring, tasks, token, users
+from .utils.password import shutdown_password_executor
 
 # Описание для Swagger документации
 description = """
@@ -76,6 +86,14 @@ tags_metadata: list[dict[str, Any]] = [
     },
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Жизненный цикл приложения: остановка пула процессов bcrypt"""
+    yield
+    shutdown_password_executor()
+
+
 # Создаем экземпляр FastAPI приложения
 app = FastAPI(
     title="Task Manager API",
@@ -103,6 +121,7 @@ app = FastAPI(
         "filter": True,
         "tryItOutEnabled": True,
     },
+    lifespan=lifespan,
 )
 
 # Настройка CORS для фронтенда
@@ -114,6 +133,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Профилирование по требованию; выключенное не добавляет middleware вовсе
+if settings.profiling_enabled:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=settings.profiling_token,
+        interval_seconds=settings.profiling_interval_ms / 1000,
+        output_dir=settings.profiling_output_dir,
+    )
+
+# Метрики HTTP-запросов для /metrics (внутри счетчика запросов к БД)
+app.add_middleware(MetricsMiddleware)
+
+# Трассировка выбранной доли запросов (внутри счетчика запросов к БД)
+tracing_exporter = create_exporter(settings.tracing_exporter, settings.tracing_file)
+if tracing_exporter is not None:
+    configure_tracing(tracing_exporter, settings.tracing_sample_rate)
+    app.add_middleware(TracingMiddleware)
+
+# Счетчик запросов к БД; заголовки X-DB-Query-Count/X-DB-Time-Ms в режиме отладки
+app.add_middleware(
+    QueryCountMiddleware,
+    expose_headers=settings.debug,
+    repeated_threshold=settings.db_repeated_query_threshold,
+)
+
 # Подключаем роутеры с улучшенными тегами
 app.include_router(
     token.router,
@@ -168,6 +212,8 @@ app.include_router(
     },
 )
 
+app.include_router(monitoring.router, tags=["🏠 Health & Info"])
+
 
 @app.get(
     "/",
@@ -5,12 +5,13 @@ import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
 
 from src.config import settings
-from src.database import get_db
+from src.database import SESSION_USER_KEY, DBSession, get_session
 from src.models.user import User
 from src.schemas.token import TokenData
+from src.schemas.user import UserPrincipal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -30,9 +31,14 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
 
 
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)], db: Session = Depends(get_db)
-):
-    """Получение текущего пользователя по токену"""
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: DBSession = Depends(get_session),
+) -> User | UserPrincipal:
+    """
+    Получение текущего пользователя по токену.
+    При JWT_STATELESS_PRINCIPAL возвращает UserPrincipal из claims токена
+    без запроса к БД; токены без claims user_id/username проверяются по БД.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,25 +51,64 @@ async def get_current_user(
         email = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
-    except InvalidTokenError:
+        token_data = TokenData(
+            email=email,
+            user_id=payload.get("user_id"),
+            username=payload.get("username"),
+        )
+    except (InvalidTokenError, ValidationError):
         raise credentials_exception from None
 
     if token_data.email is None:
         raise credentials_exception
+    # Пользователь запроса: после его записи чтения идут в основную БД
+    if token_data.user_id is not None:
+        db.info[SESSION_USER_KEY] = token_data.user_id
+
+    if (
+        settings.jwt_stateless_principal
+        and token_data.user_id is not None
+        and token_data.username is not None
+    ):
+        return UserPrincipal(
+            user_id=token_data.user_id,
+            email=token_data.email,
+            username=token_data.username,
+        )
 
     # Импортируем здесь чтобы избежать циркулярного импорта
-    from src.services.auth_service import UserService
+    from src.services.async_services import AsyncUserService
 
-    user_service = UserService(db)
-    user = user_service.get_user_by_email(token_data.email)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_email(token_data.email)
     if user is None:
         raise credentials_exception
+    db.info[SESSION_USER_KEY] = user.user_id
+    return user
+
+
+async def get_current_user_record(
+    current_user: Annotated[User | UserPrincipal, Depends(get_current_user)],
+    db: DBSession = Depends(get_session),
+) -> User:
+    """Получение полной записи текущего пользователя (загружается по запросу)"""
+    if isinstance(current_user, User):
+        return current_user
+
+    from src.services.async_services import AsyncUserService
+
+    user = await AsyncUserService(db).get_user_by_id(current_user.user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user_record)],
 ):
     """Получение текущего активного пользователя"""
     # Можно добавить проверку на активность пользователя, если есть такое поле
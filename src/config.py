@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -48,6 +49,46 @@ class Settings(BaseSettings):
     database_url: str = Field(
         default="sqlite:///:memory:" if TESTING else "", validation_alias="DATABASE_URL"
     )
+    # Асинхронный драйвер (asyncpg для PostgreSQL, aiosqlite для SQLite)
+    database_async: bool = Field(default=False, validation_alias="DATABASE_ASYNC")
+    # Реплики для чтения: URL через запятую (пусто - все запросы в основную БД)
+    database_replica_urls: str = Field(
+        default="", validation_alias="DATABASE_REPLICA_URLS"
+    )
+    # Сколько секунд после записи пользователь читает из основной БД
+    replica_read_your_writes_seconds: float = Field(
+        default=5.0, ge=0, validation_alias="REPLICA_READ_YOUR_WRITES_SECONDS"
+    )
+    # Пауза перед повторной проверкой недоступной реплики
+    replica_retry_seconds: float = Field(
+        default=10.0, gt=0, validation_alias="REPLICA_RETRY_SECONDS"
+    )
+    # Запрос, повторенный за HTTP-запрос столько раз, пишется в лог как N+1
+    db_repeated_query_threshold: int = Field(
+        default=5, ge=2, validation_alias="DB_REPEATED_QUERY_THRESHOLD"
+    )
+    # Запросы дольше порога (мс) пишутся в журнал медленных запросов (0 - выкл.)
+    db_slow_query_ms: float = Field(
+        default=500.0, ge=0, validation_alias="DB_SLOW_QUERY_MS"
+    )
+    # Снимать EXPLAIN для медленных SELECT (в фоне, не чаще раза в минуту)
+    db_slow_query_explain: bool = Field(
+        default=False, validation_alias="DB_SLOW_QUERY_EXPLAIN"
+    )
+    # Пул соединений (не применяется к SQLite в памяти)
+    db_pool_size: int = Field(default=5, ge=1, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, ge=0, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(
+        default=30.0, gt=0, validation_alias="DB_POOL_TIMEOUT"
+    )
+    # Время жизни соединения в секундах (-1 - без ограничения)
+    db_pool_recycle: int = Field(default=-1, ge=-1, validation_alias="DB_POOL_RECYCLE")
+    # Проверять соединение перед выдачей (SELECT 1)
+    db_pool_pre_ping: bool = Field(default=False, validation_alias="DB_POOL_PRE_PING")
+    # Ожидание соединения дольше порога (мс) пишется в лог
+    db_pool_slow_checkout_ms: float = Field(
+        default=100.0, ge=0, validation_alias="DB_POOL_SLOW_CHECKOUT_MS"
+    )
     db_host: str = Field(
         default="localhost" if TESTING else "", validation_alias="DB_HOST"
     )
@@ -79,6 +120,41 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(
         default=30 if TESTING else 0, validation_alias="ACCESS_TOKEN_EXPIRE_MINUTES"
     )
+    # Пул процессов для bcrypt (0 - хеширование в пуле потоков) и cost bcrypt
+    password_hash_workers: int = Field(
+        default=0 if TESTING else 2, ge=0, validation_alias="PASSWORD_HASH_WORKERS"
+    )
+    bcrypt_rounds: int = Field(
+        default=4 if TESTING else 12, ge=4, le=31, validation_alias="BCRYPT_ROUNDS"
+    )
+    # Брать пользователя из claims токена (user_id, username) без запроса к БД
+    jwt_stateless_principal: bool = Field(
+        default=False, validation_alias="JWT_STATELESS_PRINCIPAL"
+    )
+
+    # Профилирование запросов по требованию (заголовок X-Profile с токеном)
+    profiling_enabled: bool = Field(default=False, validation_alias="PROFILING_ENABLED")
+    profiling_token: str = Field(default="", validation_alias="PROFILING_TOKEN")
+    # Интервал снятия стеков (мс) и каталог для отчетов (пусто - в ответе)
+    profiling_interval_ms: float = Field(
+        default=1.0, gt=0, validation_alias="PROFILING_INTERVAL_MS"
+    )
+    profiling_output_dir: str = Field(
+        default="", validation_alias="PROFILING_OUTPUT_DIR"
+    )
+
+    # Трассировка: экспортер (none, memory, jsonl), файл для jsonl и доля запросов
+    tracing_exporter: Literal["none", "memory", "jsonl"] = Field(
+        default="none", validation_alias="TRACING_EXPORTER"
+    )
+    tracing_file: str = Field(default="traces.jsonl", validation_alias="TRACING_FILE")
+    tracing_sample_rate: float = Field(
+        default=0.01, ge=0, le=1, validation_alias="TRACING_SAMPLE_RATE"
+    )
+
+    # Search settings
+    # Полнотекстовый поиск задач (tsvector/FTS5); false - поиск через ILIKE
+    full_text_search: bool = Field(default=True, validation_alias="FULL_TEXT_SEARCH")
 
     # CORS settings
     allowed_origins: str = Field(
@@ -1,15 +1,209 @@
+from collections.abc import AsyncIterator, Callable, Iterator, Sequence
 from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Concatenate
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Connection, Engine, Row, Select, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from src.config import settings
+from src.monitoring.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_pool,
+)
+from src.monitoring.profiling import profiled
+from src.monitoring.slow_queries import install_slow_query_log
+from src.replicas import ReplicaSet
 
-# Создание движка SQLAlchemy
-engine = create_engine(settings.database_url, echo=settings.debug)
+# Сессия, с которой работают роутеры: синхронная или асинхронная
+DBSession = Session | AsyncSession
 
-# Создание фабрики сессий
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Асинхронные драйверы для поддерживаемых баз данных
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# Ключи Session.info: глубина вложенности transaction(), пользователь
+# запроса (для read-your-writes) и принудительное чтение из основной БД
+TRANSACTION_DEPTH_KEY = "transaction_depth"
+SESSION_USER_KEY = "user_id"
+USE_PRIMARY_KEY = "use_primary"
+
+
+def pool_options(database_url: str) -> dict[str, Any]:
+    """Параметры пула соединений из настроек"""
+    url = make_url(database_url)
+    # SQLite в памяти работает с одним соединением без очереди
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def instrument_engine(db_engine: Engine, name: str) -> None:
+    """Метрики пула и журнал медленных запросов для движка"""
+    instrument_pool(db_engine, name, settings.db_pool_slow_checkout_ms / 1000)
+    if settings.db_slow_query_ms > 0:
+        install_slow_query_log(
+            db_engine,
+            settings.db_slow_query_ms / 1000,
+            explain=settings.db_slow_query_explain,
+        )
+
+
+def create_db_engine(database_url: str, name: str = "primary", **kwargs: Any) -> Engine:
+    """Создание движка базы данных с настроенным пулом и метриками"""
+    if "poolclass" not in kwargs and (options := pool_options(database_url)):
+        kwargs = {"poolclass": InstrumentedQueuePool, **options, **kwargs}
+    db_engine = create_engine(database_url, echo=settings.debug, **kwargs)
+    instrument_engine(db_engine, name)
+    return db_engine
+
+
+class RoutingSession(Session):
+    """
+    Сессия, читающая из реплик.
+
+    В реплику уходят только SELECT вне transaction(), пока в сессии не было
+    записи и пользователь запроса не писал в последние секунды; остальное
+    (запись, SELECT ... FOR UPDATE, текстовые запросы) идет в основную БД.
+    """
+
+    def __init__(self, *args: Any, replicas: ReplicaSet | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.wrote = False
+
+    def _reads_from_replica(self, clause: Any) -> bool:
+        """Можно ли выполнить запрос на реплике"""
+        if self.replicas is None or self.wrote or self.info.get(USE_PRIMARY_KEY):
+            return False
+        if not isinstance(clause, Select) or clause._for_update_arg is not None:
+            return False
+        if self.info.get(TRANSACTION_DEPTH_KEY, 0) > 0:
+            return False
+        user_id = self.info.get(SESSION_USER_KEY)
+        return user_id is None or not self.replicas.wrote_recently(user_id)
+
+    def get_bind(
+        self, mapper: Any = None, *, clause: Any = None, **kwargs: Any
+    ) -> Engine | Connection:
+        if self._flushing or getattr(clause, "is_dml", False):
+            # После записи сессия читает только из основной БД
+            self.wrote = True
+        elif self._reads_from_replica(clause) and self.replicas is not None:
+            replica = self.replicas.choose()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def commit(self) -> None:
+        super().commit()
+        user_id = self.info.get(SESSION_USER_KEY)
+        if self.wrote and self.replicas is not None and user_id is not None:
+            self.replicas.record_write(user_id)
+
+
+def use_primary(db: DBSession) -> None:
+    """Читать в этой сессии только из основной БД"""
+    db.info[USE_PRIMARY_KEY] = True
+
+
+def create_replica_set(
+    urls: str, engine_factory: Callable[[str, str], Engine]
+) -> ReplicaSet | None:
+    """Набор реплик из списка URL через запятую (None, если список пуст)"""
+    replica_urls = [url.strip() for url in urls.split(",") if url.strip()]
+    if not replica_urls:
+        return None
+    return ReplicaSet(
+        [
+            engine_factory(url, f"replica-{index}")
+            for index, url in enumerate(replica_urls)
+        ],
+        read_your_writes_seconds=settings.replica_read_your_writes_seconds,
+        retry_seconds=settings.replica_retry_seconds,
+    )
+
+
+# Создание движка SQLAlchemy и реплик для чтения
+engine = create_db_engine(settings.database_url)
+replica_set = create_replica_set(settings.database_replica_urls, create_db_engine)
+
+# Создание фабрики сессий. expire_on_commit=False: объекты, полученные
+# через RETURNING, остаются загруженными после коммита без повторного SELECT
+SessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+    replicas=replica_set,
+)
+
+
+def make_async_url(database_url: str) -> str:
+    """Преобразовать URL базы данных в URL с асинхронным драйвером"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Async driver is not configured for '{backend}'")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def create_async_db_engine(
+    database_url: str, name: str = "primary_async", **kwargs: Any
+) -> AsyncEngine:
+    """Создание асинхронного движка базы данных с метриками"""
+    if "poolclass" not in kwargs and (options := pool_options(database_url)):
+        kwargs = {"poolclass": InstrumentedAsyncQueuePool, **options, **kwargs}
+    db_engine = create_async_engine(make_async_url(database_url), **kwargs)
+    instrument_engine(db_engine.sync_engine, name)
+    return db_engine
+
+
+def create_async_session_factory(
+    bind: AsyncEngine, replicas: ReplicaSet | None = None
+) -> async_sessionmaker[AsyncSession]:
+    """Создание фабрики асинхронных сессий"""
+    # expire_on_commit=False: после коммита атрибуты не перечитываются лениво,
+    # что в асинхронном режиме привело бы к вызову вне greenlet-контекста
+    return async_sessionmaker(
+        bind=bind,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        replicas=replicas,
+    )
+
+
+# Асинхронный движок создается только если он включен в настройках
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if settings.database_async:
+    async_engine = create_async_db_engine(settings.database_url, echo=settings.debug)
+    # Асинхронным сессиям нужны движки реплик на асинхронном драйвере
+    async_replica_set = create_replica_set(
+        settings.database_replica_urls,
+        lambda url, name: create_async_db_engine(
+            url, name=f"{name}_async", echo=settings.debug
+        ).sync_engine,
+    )
+    AsyncSessionLocal = create_async_session_factory(async_engine, async_replica_set)
 
 
 # Dependency для получения сессии базы данных
@@ -22,6 +216,97 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Получение асинхронной сессии базы данных"""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database is disabled (set DATABASE_ASYNC=true)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency, используемая роутерами: выбирается настройкой DATABASE_ASYNC
+get_session = get_async_db if settings.database_async else get_db
+
+
+async def run_in_session[T](db: DBSession, func: Callable[[Session], T]) -> T:
+    """
+    Выполнить синхронный код работы с БД, не блокируя event loop.
+
+    Для AsyncSession код выполняется через run_sync: запросы идут через
+    асинхронный драйвер. Для обычной Session код уходит в пул потоков.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(func)
+    # При профилировании запроса поток пула тоже попадает в профиль
+    return await run_in_threadpool(profiled(func), db)
+
+
+async def stream_in_session(
+    db: DBSession, statement: Select, batch_size: int
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Выполнить SELECT с серверным курсором и отдавать строки пачками по
+    batch_size, не загружая весь результат в память.
+
+    Для AsyncSession строки читаются через AsyncSession.stream, для обычной
+    Session каждая пачка читается в пуле потоков. По завершении (или при
+    прерывании, например, когда клиент закрыл соединение) курсор
+    закрывается, а сессия освобождает соединение.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    if isinstance(db, AsyncSession):
+        async_result = await db.stream(statement)
+        try:
+            async for partition in async_result.partitions():
+                yield partition
+        finally:
+            await async_result.close()
+            await db.close()
+        return
+
+    result = await run_in_threadpool(profiled(db.execute), statement)
+    try:
+        partitions = result.partitions()
+        while partition := await run_in_threadpool(profiled(next), partitions, []):
+            yield partition
+    finally:
+        await run_in_threadpool(result.close)
+        await run_in_threadpool(db.close)
+
+
+class AsyncSessionProxy:
+    """
+    Базовый класс асинхронных вариантов репозиториев и сервисов.
+
+    Каждый публичный метод обернутого класса становится корутиной, которая
+    выполняет исходный метод через run_in_session.
+    """
+
+    wrapped_class: type
+
+    def __init__(self, db: DBSession):
+        self.db = db
+
+    async def _call(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        """Выполнить метод обернутого класса через run_in_session"""
+        return await run_in_session(
+            self.db,
+            lambda session: getattr(self.wrapped_class(session), name)(*args, **kwargs),
+        )
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_") or not callable(
+            getattr(self.wrapped_class, name, None)
+        ):
+            raise AttributeError(name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._call(name, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+
 @contextmanager
 def get_db_context():
     """Контекстный менеджер для работы с базой данных"""
@@ -32,6 +317,42 @@ def get_db_context():
         db.close()
 
 
+@contextmanager
+def transaction(db: Session) -> Iterator[Session]:
+    """
+    Единица работы: изменения внутри блока фиксируются одним коммитом.
+
+    Репозитории только выполняют flush, коммит делает этот блок. При
+    исключении транзакция откатывается целиком. Вложенный блок
+    присоединяется к внешнему: коммитит только самый внешний.
+    """
+    depth = db.info.get(TRANSACTION_DEPTH_KEY, 0)
+    db.info[TRANSACTION_DEPTH_KEY] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+    except BaseException:
+        if depth == 0:
+            db.rollback()
+        raise
+    finally:
+        db.info[TRANSACTION_DEPTH_KEY] = depth
+
+
+def transactional[S, **P, R](
+    method: Callable[Concatenate[S, P], R],
+) -> Callable[Concatenate[S, P], R]:
+    """Выполнить метод сервиса в transaction(self.db)"""
+
+    @wraps(method)
+    def wrapper(self: S, *args: P.args, **kwargs: P.kwargs) -> R:
+        with transaction(self.db):  # type: ignore[attr-defined]
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 def create_test_engine(database_url: str | None = None):
     """Создание тестового движка базы данных"""
     if database_url is None:
@@ -41,5 +362,7 @@ def create_test_engine(database_url: str | None = None):
 
 def create_test_session(engine):
     """Создание тестовой сессии"""
-    TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    TestSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+    )
     return TestSessionLocal()
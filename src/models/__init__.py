@@ -1,3 +1,4 @@
+from src.models import search  # noqa: F401  # DDL полнотекстового поиска
 from src.models.base import BaseModel
 from src.models.category import Category
 from src.models.task import Task
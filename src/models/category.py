@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from src.models.base import BaseModel
@@ -8,6 +8,7 @@ class Category(BaseModel):
     """Модель категории, представляющая таблицу категорий в базе данных."""
 
     __tablename__ = "categories"
+    __table_args__ = (Index("ix_categories_user_id_title", "user_id", "title"),)
 
     category_id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(50), nullable=False)
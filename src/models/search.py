@@ -0,0 +1,150 @@
+"""
+Объекты БД для поиска.
+
+Полнотекстовый поиск по задачам. PostgreSQL: генерируемая колонка
+search_vector (tsvector по названию и описанию) с GIN-индексом. SQLite:
+таблица FTS5 tasks_fts с внешним содержимым, которую синхронизируют
+триггеры на таблице задач.
+
+Поиск подстроки по пользователям и категориям. PostgreSQL: триграммные
+GIN-индексы pg_trgm. SQLite: функция similarity() на Python.
+
+Объекты создаются вместе с таблицами (create_all) и миграциями.
+"""
+
+import re
+import sqlite3
+from typing import Any
+
+from sqlalchemy import DDL, Engine, event
+from sqlalchemy.dialects.sqlite.aiosqlite import AsyncAdapt_aiosqlite_connection
+
+from src.models.base import Base
+from src.models.category import Category
+from src.models.task import Task
+from src.models.user import User
+
+# Конфигурация без стемминга: задачи пишут и на русском, и на английском
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR_COLUMN = "search_vector"
+FTS_TABLE = "tasks_fts"
+
+POSTGRESQL_DDL = [
+    f"""
+    ALTER TABLE tasks ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX ix_tasks_search_vector ON tasks USING GIN ({SEARCH_VECTOR_COLUMN})",
+]
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, description, content='tasks', content_rowid='task_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Совпадение в названии весит вдвое больше, чем в описании
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(2.0, 1.0)')",
+    f"""
+    CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.task_id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.task_id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.task_id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.task_id, new.title, new.description);
+    END
+    """,
+]
+
+for statement in POSTGRESQL_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_DDL:
+    event.listen(
+        Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+# Триггеры удаляются вместе с таблицей задач, таблицу FTS5 удаляем явно
+event.listen(
+    Task.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+# Триграммные индексы: ILIKE '%...%' и оператор % используют их в PostgreSQL
+TRIGRAM_INDEXES = {
+    User.__table__: {
+        "ix_users_email_trgm": "email",
+        "ix_users_username_trgm": "username",
+    },
+    Category.__table__: {"ix_categories_title_trgm": "title"},
+}
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for trigram_table, indexes in TRIGRAM_INDEXES.items():
+    for index_name, column_name in indexes.items():
+        event.listen(
+            trigram_table,
+            "after_create",
+            DDL(
+                f"CREATE INDEX {index_name} ON {trigram_table.name} "
+                f"USING GIN ({column_name} gin_trgm_ops)"
+            ).execute_if(dialect="postgresql"),
+        )
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Множество триграмм строки по правилам pg_trgm: строка приводится
+    к нижнему регистру и делится на слова из букв и цифр, каждое слово
+    дополняется двумя пробелами в начале и одним в конце.
+    """
+    result: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(left: str | None, right: str | None) -> float:
+    """Доля общих триграмм двух строк (от 0 до 1), как similarity() в pg_trgm"""
+    if left is None or right is None:
+        return 0.0
+    left_trigrams, right_trigrams = trigrams(left), trigrams(right)
+    union = len(left_trigrams | right_trigrams)
+    if not union:
+        return 0.0
+    return len(left_trigrams & right_trigrams) / union
+
+
+@event.listens_for(Engine, "connect")
+def register_sqlite_functions(dbapi_connection: Any, connection_record: Any) -> None:
+    """Зарегистрировать similarity() для соединений SQLite (sqlite3, aiosqlite)"""
+    if isinstance(
+        dbapi_connection, sqlite3.Connection | AsyncAdapt_aiosqlite_connection
+    ):
+        dbapi_connection.create_function(
+            "similarity", 2, similarity, deterministic=True
+        )
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 
 from src.models.base import BaseModel
@@ -24,9 +24,22 @@ class Task(BaseModel):
     """Модель задачи, представляющая таблицу задач в базе данных."""
 
     __tablename__ = "tasks"
+    # Индексы повторяют пути доступа TaskRepository: все запросы фильтруют
+    # по user_id, списки сортируются по (created_at DESC, task_id DESC)
+    __table_args__ = (
+        Index(
+            "ix_tasks_user_id_created_at",
+            "user_id",
+            text("created_at DESC"),
+            text("task_id DESC"),
+        ),
+        Index("ix_tasks_user_id_status", "user_id", "status"),
+        Index("ix_tasks_user_id_category_id", "user_id", "category_id"),
+        Index("ix_tasks_user_id_priority", "user_id", "priority"),
+    )
 
-    task_id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True, nullable=False)
+    task_id = Column(Integer, primary_key=True)
+    title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     status: "Column[StatusEnum]" = Column(
         Enum(StatusEnum), default=StatusEnum.todo, nullable=False
@@ -0,0 +1,79 @@
+"""
+Инициализация пакета monitoring.
+"""
+
+from .histogram import Counter, Gauge, Histogram, HistogramSnapshot
+from .metrics import REGISTRY, MetricFamily, render_metrics
+from .middleware import (
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryCountMiddleware,
+    TracingMiddleware,
+    match_route_template,
+)
+from .pool import (
+    POOL_METRICS,
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    PoolMetrics,
+    instrument_pool,
+    pool_snapshot,
+)
+from .profiling import SamplingProfiler, profiled
+from .queries import (
+    QueryStats,
+    assert_max_queries,
+    current_query_stats,
+    track_queries,
+)
+from .slow_queries import SlowQueryLog, install_slow_query_log, redact_parameters
+from .tracing import (
+    TRACER,
+    InMemoryExporter,
+    JsonLinesExporter,
+    Span,
+    SpanExporter,
+    configure_tracing,
+    current_span,
+    span,
+    traced,
+)
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "HistogramSnapshot",
+    "MetricFamily",
+    "REGISTRY",
+    "render_metrics",
+    "PoolMetrics",
+    "InstrumentedQueuePool",
+    "InstrumentedAsyncQueuePool",
+    "POOL_METRICS",
+    "instrument_pool",
+    "pool_snapshot",
+    "QueryStats",
+    "track_queries",
+    "current_query_stats",
+    "assert_max_queries",
+    "SlowQueryLog",
+    "install_slow_query_log",
+    "redact_parameters",
+    "QueryCountMiddleware",
+    "MetricsMiddleware",
+    "TracingMiddleware",
+    "Span",
+    "SpanExporter",
+    "InMemoryExporter",
+    "JsonLinesExporter",
+    "TRACER",
+    "configure_tracing",
+    "current_span",
+    "span",
+    "traced",
+    "ProfilingMiddleware",
+    "SamplingProfiler",
+    "profiled",
+    "match_route_template",
+]
@@ -0,0 +1,143 @@
+"""
+Счетчики и гистограммы для метрик.
+
+Значения хранятся по потокам: каждый поток пишет только в свою часть,
+поэтому inc() и observe() не берут блокировок. Блокировка нужна лишь
+при первом обращении потока; при чтении части суммируются.
+"""
+
+import threading
+from bisect import bisect_left
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+# Границы по умолчанию (секунды): от 1 мс до 10 с
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Sharded:
+    """Набор чисел, у каждого потока - своя копия"""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._shards: dict[int, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> list[float]:
+        """Часть текущего потока (создается при первом обращении)"""
+        shard = self._shards.get(threading.get_ident())
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(
+                    threading.get_ident(), [0.0] * self._size
+                )
+        return shard
+
+    def _totals(self) -> list[float]:
+        """Суммы по всем потокам"""
+        with self._lock:
+            shards = list(self._shards.values())
+        if not shards:
+            return [0.0] * self._size
+        return [sum(values) for values in zip(*shards, strict=True)]
+
+
+class Counter(_Sharded):
+    """Монотонный счетчик"""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        """Увеличить счетчик"""
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class Gauge(_Sharded):
+    """Значение, которое растет и убывает (например, запросы в обработке)"""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        """Увеличить значение"""
+        self._shard()[0] += amount
+
+    def dec(self, amount: float = 1) -> None:
+        """Уменьшить значение"""
+        self._shard()[0] -= amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    """Состояние гистограммы: накопленные счетчики по границам le"""
+
+    buckets: tuple[float, ...]
+    cumulative_counts: tuple[int, ...]
+    sum: float
+    count: int
+
+    def quantile(self, q: float) -> float | None:
+        """Оценка квантиля по верхней границе интервала (None без наблюдений)"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        for bound, cumulative in zip(
+            self.buckets, self.cumulative_counts, strict=False
+        ):
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+
+class Histogram(_Sharded):
+    """Гистограмма с фиксированными границами интервалов"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # Счетчики интервалов (последний - больше всех границ), сумма, количество
+        super().__init__(len(self.buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        """Добавить наблюдение"""
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Текущее состояние гистограммы"""
+        totals = self._totals()
+        cumulative: list[int] = []
+        running = 0
+        for count in totals[: len(self.buckets) + 1]:
+            running += int(count)
+            cumulative.append(running)
+        return HistogramSnapshot(
+            buckets=(*self.buckets, float("inf")),
+            cumulative_counts=tuple(cumulative),
+            sum=totals[-2],
+            count=int(totals[-1]),
+        )
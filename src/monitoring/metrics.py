@@ -0,0 +1,209 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Метрика с метками (MetricFamily) хранит отдельный счетчик или гистограмму
+для каждого набора значений меток. Блокировка берется только при первом
+появлении набора меток; запись в уже созданную метрику идет без блокировок
+(см. histogram.py). Метрики пулов соединений берутся из POOL_METRICS в
+момент выгрузки.
+"""
+
+import math
+import threading
+from collections.abc import Callable, Iterator
+
+from src.monitoring.histogram import Counter, Gauge, Histogram
+from src.monitoring.pool import POOL_METRICS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Границы размера ответа (байты): от 100 Б до 1 МБ
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000)
+# Границы числа запросов к БД за HTTP-запрос
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Границы времени bcrypt (секунды): cost 12 занимает ~0.25 с
+PASSWORD_HASH_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+Metric = Counter | Gauge | Histogram
+
+
+class MetricFamily[M: Metric]:
+    """Метрика с метками: по экземпляру M на каждый набор значений меток"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: tuple[str, ...],
+        factory: Callable[[], M],
+    ):
+        self.name = name
+        self.documentation = documentation
+        # Тип метрики в выгрузке: counter, gauge или histogram
+        self.kind = kind
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: dict[tuple[str, ...], M] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> M:
+        """Метрика для значений меток (создается при первом обращении)"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self) -> list[tuple[tuple[str, ...], M]]:
+        """Все наборы значений меток и их метрики"""
+        with self._lock:
+            return list(self._children.items())
+
+
+HTTP_REQUESTS = MetricFamily(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    "counter",
+    ("method", "route", "status"),
+    Counter,
+)
+HTTP_REQUEST_DURATION = MetricFamily(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    "histogram",
+    ("method", "route"),
+    Histogram,
+)
+HTTP_REQUESTS_IN_FLIGHT = MetricFamily(
+    "http_requests_in_flight",
+    "HTTP requests being processed",
+    "gauge",
+    ("method", "route"),
+    Gauge,
+)
+HTTP_RESPONSE_SIZE = MetricFamily(
+    "http_response_size_bytes",
+    "HTTP response body size",
+    "histogram",
+    ("method", "route"),
+    lambda: Histogram(SIZE_BUCKETS),
+)
+HTTP_DB_DURATION = MetricFamily(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per HTTP request",
+    "histogram",
+    ("method", "route"),
+    Histogram,
+)
+HTTP_DB_QUERIES = MetricFamily(
+    "http_request_db_queries",
+    "Database queries per HTTP request",
+    "histogram",
+    ("method", "route"),
+    lambda: Histogram(QUERY_COUNT_BUCKETS),
+)
+PASSWORD_HASH_DURATION = MetricFamily(
+    "password_hash_duration_seconds",
+    "bcrypt hashing and verification time, including executor queueing",
+    "histogram",
+    ("operation",),
+    lambda: Histogram(PASSWORD_HASH_BUCKETS),
+)
+
+REGISTRY: list[MetricFamily] = [
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSE_SIZE,
+    HTTP_DB_DURATION,
+    HTTP_DB_QUERIES,
+    PASSWORD_HASH_DURATION,
+]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _sample(name: str, labels: dict[str, str], value: float) -> str:
+    return f"{name}{_format_labels(labels)} {_format_value(value)}"
+
+
+def _histogram_samples(
+    name: str, labels: dict[str, str], histogram: Histogram
+) -> Iterator[str]:
+    snapshot = histogram.snapshot()
+    for bound, count in zip(snapshot.buckets, snapshot.cumulative_counts, strict=True):
+        yield _sample(f"{name}_bucket", labels | {"le": _format_value(bound)}, count)
+    yield _sample(f"{name}_sum", labels, snapshot.sum)
+    yield _sample(f"{name}_count", labels, snapshot.count)
+
+
+def _header(name: str, documentation: str, kind: str) -> Iterator[str]:
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+
+
+def _family_lines(family: MetricFamily) -> Iterator[str]:
+    yield from _header(family.name, family.documentation, family.kind)
+    for values, metric in sorted(family.children(), key=lambda item: item[0]):
+        labels = dict(zip(family.labelnames, values, strict=True))
+        if isinstance(metric, Histogram):
+            yield from _histogram_samples(family.name, labels, metric)
+        else:
+            yield _sample(family.name, labels, metric.value)
+
+
+def _pool_lines() -> Iterator[str]:
+    pools = sorted(POOL_METRICS.items())
+    states = [({"pool": name}, metrics.snapshot()) for name, metrics in pools]
+    for key, documentation in (
+        ("checked_out", "Connections checked out of the pool"),
+        ("overflow", "Connections open above pool_size"),
+    ):
+        yield from _header(f"db_pool_{key}", documentation, "gauge")
+        for labels, state in states:
+            if key in state:
+                yield _sample(f"db_pool_{key}", labels, state[key])
+    for key, documentation in (
+        ("checkouts", "Connection checkouts"),
+        ("timeouts", "Checkouts that timed out waiting for a connection"),
+        ("invalidations", "Invalidated connections"),
+    ):
+        yield from _header(f"db_pool_{key}_total", documentation, "counter")
+        for labels, state in states:
+            yield _sample(f"db_pool_{key}_total", labels, state[key])
+    yield from _header(
+        "db_pool_wait_seconds", "Time spent waiting for a connection", "histogram"
+    )
+    for name, metrics in pools:
+        yield from _histogram_samples(
+            "db_pool_wait_seconds", {"pool": name}, metrics.wait_seconds
+        )
+
+
+def render_metrics() -> str:
+    """Все метрики в текстовом формате Prometheus"""
+    lines: list[str] = []
+    for family in REGISTRY:
+        lines.extend(_family_lines(family))
+    lines.extend(_pool_lines())
+    return "\n".join(lines) + "\n"
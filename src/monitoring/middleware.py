@@ -0,0 +1,286 @@
+"""
+ASGI middleware мониторинга.
+"""
+
+import hmac
+import json
+import logging
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.monitoring.metrics import (
+    HTTP_DB_DURATION,
+    HTTP_DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_RESPONSE_SIZE,
+)
+from src.monitoring.profiling import SamplingProfiler
+from src.monitoring.queries import current_query_stats, track_queries
+from src.monitoring.tracing import format_traceparent, root_span
+
+logger = logging.getLogger(__name__)
+
+
+def match_route_template(scope: Scope) -> str:
+    """
+    Шаблон маршрута запроса (например, /api/tasks/{task_id}) до его
+    обработки: scope["route"] заполняет только роутер.
+    """
+    app: Any = scope.get("app")
+    partial = None
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return str(route.path)
+        if match == Match.PARTIAL and partial is None:
+            partial = str(route.path)
+    return partial or "unmatched"
+
+
+class QueryCountMiddleware:
+    """
+    Считает запросы к БД для каждого HTTP-запроса.
+
+    С expose_headers ответ получает заголовки X-DB-Query-Count и
+    X-DB-Time-Ms. Запросы, повторенные repeated_threshold и более раз,
+    пишутся в лог как возможный N+1.
+    """
+
+    def __init__(self, app: ASGIApp, expose_headers: bool, repeated_threshold: int):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            # Маршрут нужен во время обработки (журнал медленных запросов)
+            stats.method = scope["method"]
+            stats.route = match_route_template(scope)
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+                await send(message)
+
+            await self.app(
+                scope, receive, send_with_headers if self.expose_headers else send
+            )
+
+        for statement, count in stats.repeated(self.repeated_threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: statement executed %d times: %s",
+                stats.method,
+                stats.route,
+                count,
+                statement,
+            )
+
+
+class MetricsMiddleware:
+    """
+    Метрики HTTP-запросов по шаблонам маршрутов: количество по кодам ответа,
+    задержка, запросы в обработке, размер ответа, время и число запросов к БД.
+
+    Время запросов к БД берется из статистики QueryCountMiddleware, поэтому
+    MetricsMiddleware должен работать внутри него.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Маршрут уже определен счетчиком запросов к БД, если он снаружи
+        stats = current_query_stats()
+        if stats is not None and stats.route:
+            labels = (stats.method, stats.route)
+        else:
+            labels = (scope["method"], match_route_template(scope))
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(*labels)
+        status_code = 500
+        response_size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            HTTP_REQUEST_DURATION.labels(*labels).observe(time.perf_counter() - start)
+            in_flight.dec()
+            HTTP_REQUESTS.labels(*labels, str(status_code)).inc()
+            HTTP_RESPONSE_SIZE.labels(*labels).observe(response_size)
+            if stats is not None:
+                HTTP_DB_DURATION.labels(*labels).observe(stats.seconds)
+                HTTP_DB_QUERIES.labels(*labels).observe(stats.count)
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование отдельного запроса по требованию.
+
+    Запрос профилируется, если в заголовке X-Profile или параметре profile
+    передан токен PROFILING_TOKEN. Формат отчета - заголовок
+    X-Profile-Format или параметр profile_format: speedscope (по умолчанию)
+    или collapsed. С output_dir отчет сохраняется в файл, а имя файла
+    возвращается в заголовке X-Profile-Report; без него отчет заменяет тело
+    ответа (исходный код ответа - в заголовке X-Profile-Status).
+
+    Middleware подключается только при PROFILING_ENABLED=true; запросы без
+    токена проходят без профилирования.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str,
+        interval_seconds: float,
+        output_dir: str = "",
+    ):
+        self.app = app
+        self.token = token.encode()
+        self.interval_seconds = interval_seconds
+        self.output_dir = Path(output_dir) if output_dir else None
+
+    def _trigger(self, scope: Scope) -> tuple[bool, str]:
+        """Запрошено ли профилирование с верным токеном и формат отчета"""
+        headers = dict(scope["headers"])
+        token = headers.get(b"x-profile")
+        report_format = headers.get(b"x-profile-format", b"speedscope").decode()
+        if token is None and b"profile=" in scope["query_string"]:
+            query = parse_qs(scope["query_string"].decode())
+            token = query.get("profile", [""])[0].encode()
+            report_format = query.get("profile_format", [report_format])[0]
+        if not token or not self.token:
+            return False, report_format
+        return hmac.compare_digest(token, self.token), report_format
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        triggered, report_format = self._trigger(scope)
+        if not triggered:
+            await self.app(scope, receive, send)
+            return
+
+        # Ответ придерживается до конца профилирования: имя файла отчета
+        # попадает в заголовки, а без output_dir отчет заменяет тело
+        messages: list[Message] = []
+
+        async def capture(message: Message) -> None:
+            messages.append(message)
+
+        profiler = SamplingProfiler(self.interval_seconds)
+        with profiler.profile():
+            await self.app(scope, receive, capture)
+
+        name = f"{scope['method']} {scope['path']}"
+        if report_format == "collapsed":
+            report = profiler.collapsed().encode()
+            content_type, suffix = b"text/plain; charset=utf-8", "collapsed.txt"
+        else:
+            report = json.dumps(profiler.speedscope(name)).encode()
+            content_type, suffix = b"application/json", "speedscope.json"
+
+        if self.output_dir is not None:
+            stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+            path = self.output_dir / f"profile-{stamp}.{suffix}"
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(report)
+            logger.info("Profile of %s saved to %s", name, path)
+            for message in messages:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)["X-Profile-Report"] = path.name
+                await send(message)
+            return
+
+        status_code = next(
+            (
+                message["status"]
+                for message in messages
+                if message["type"] == "http.response.start"
+            ),
+            500,
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"content-length", str(len(report)).encode()),
+                    (b"x-profile-status", str(status_code).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": report})
+
+
+class TracingMiddleware:
+    """
+    Корневой спан трассы для каждого выбранного HTTP-запроса.
+
+    Контекст вызывающего сервиса берется из заголовка traceparent, ответ
+    получает traceparent корневого спана. Маршрут берется из статистики
+    QueryCountMiddleware, поэтому TracingMiddleware работает внутри него.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_query_stats()
+        route = (
+            stats.route if stats is not None and stats.route else None
+        ) or match_route_template(scope)
+        traceparent = dict(scope["headers"]).get(b"traceparent", b"").decode()
+        with root_span(
+            f"{scope['method']} {route}",
+            "route",
+            traceparent=traceparent,
+            method=scope["method"],
+            route=route,
+        ) as span:
+            if span is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_traceparent(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.attributes["status_code"] = message["status"]
+                    MutableHeaders(scope=message)["traceparent"] = format_traceparent(
+                        span
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_with_traceparent)
@@ -0,0 +1,150 @@
+"""
+Метрики пула соединений SQLAlchemy.
+
+Счетчики обновляются событиями пула (connect, checkout, checkin,
+invalidate). Время ожидания соединения измеряют классы пула
+InstrumentedQueuePool/InstrumentedAsyncQueuePool: у SQLAlchemy нет
+события "начало ожидания", поэтому замер сделан вокруг Pool.connect().
+"""
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    PoolProxiedConnection,
+    QueuePool,
+)
+
+from src.monitoring.histogram import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Границы гистограммы ожидания соединения (секунды)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolMetrics:
+    """Метрики пула соединений одного движка"""
+
+    def __init__(self, name: str, engine: Engine, slow_checkout_seconds: float):
+        self.name = name
+        self.engine = engine
+        self.slow_checkout_seconds = slow_checkout_seconds
+        self.connects = Counter()
+        self.checkouts = Counter()
+        self.checkins = Counter()
+        self.invalidations = Counter()
+        self.timeouts = Counter()
+        self.wait_seconds = Histogram(POOL_WAIT_BUCKETS)
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """Учесть ожидание соединения; долгие ожидания и таймауты логируются"""
+        self.wait_seconds.observe(seconds)
+        if timed_out:
+            self.timeouts.inc()
+            logger.warning(
+                "Connection pool %s timed out after %.3fs (%s)",
+                self.name,
+                seconds,
+                self.engine.pool.status(),
+            )
+        elif seconds >= self.slow_checkout_seconds:
+            logger.warning(
+                "Connection pool %s: checkout waited %.3fs (%s)",
+                self.name,
+                seconds,
+                self.engine.pool.status(),
+            )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Текущее состояние пула и накопленные счетчики"""
+        pool = self.engine.pool
+        wait = self.wait_seconds.snapshot()
+        state: dict[str, Any] = {"pool_class": type(pool).__name__}
+        # Размер и переполнение есть только у пулов с очередью
+        if isinstance(pool, QueuePool):
+            state |= {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        return state | {
+            "connects": int(self.connects.value),
+            "checkouts": int(self.checkouts.value),
+            "checkins": int(self.checkins.value),
+            "invalidations": int(self.invalidations.value),
+            "timeouts": int(self.timeouts.value),
+            "wait_seconds": {
+                "count": wait.count,
+                "sum": wait.sum,
+                "p50": wait.quantile(0.5),
+                "p99": wait.quantile(0.99),
+                "buckets": dict(
+                    zip(map(str, wait.buckets), wait.cumulative_counts, strict=True)
+                ),
+            },
+        }
+
+
+class _WaitTimingPool(QueuePool):
+    """Замер времени получения соединения из пула"""
+
+    metrics: PoolMetrics | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        if self.metrics is None:
+            return super().connect()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self) -> QueuePool:
+        # engine.dispose() заменяет пул новым: метрики переходят к нему
+        pool = super().recreate()
+        if isinstance(pool, _WaitTimingPool):
+            pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_WaitTimingPool):
+    """QueuePool с замером ожидания соединения"""
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool с замером ожидания соединения"""
+
+
+# Метрики пулов по именам движков (primary, replica-0, ...)
+POOL_METRICS: dict[str, PoolMetrics] = {}
+
+
+def instrument_pool(
+    engine: Engine, name: str, slow_checkout_seconds: float
+) -> PoolMetrics:
+    """Подключить сбор метрик к пулу движка и зарегистрировать их под name"""
+    metrics = PoolMetrics(name, engine, slow_checkout_seconds)
+    if isinstance(engine.pool, _WaitTimingPool):
+        engine.pool.metrics = metrics
+
+    event.listen(engine, "connect", lambda *args: metrics.connects.inc())
+    event.listen(engine, "checkout", lambda *args: metrics.checkouts.inc())
+    event.listen(engine, "checkin", lambda *args: metrics.checkins.inc())
+    event.listen(engine, "invalidate", lambda *args: metrics.invalidations.inc())
+
+    POOL_METRICS[name] = metrics
+    return metrics
+
+
+def pool_snapshot() -> dict[str, dict[str, Any]]:
+    """Состояние всех зарегистрированных пулов"""
+    return {name: metrics.snapshot() for name, metrics in POOL_METRICS.items()}
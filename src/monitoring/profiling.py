@@ -0,0 +1,175 @@
+"""
+Профилирование отдельного HTTP-запроса.
+
+SamplingProfiler снимает стеки зарегистрированных потоков с заданным
+интервалом: потока event loop (маршрут, валидация pydantic, сериализация
+ответа) и потоков пула, в которых run_in_session выполняет работу с БД
+(запросы, загрузка объектов ORM). cProfile для этого не подходит: он
+видит только поток, в котором включен, и замедляет каждый вызов функции.
+
+Отчет строится в формате speedscope (https://www.speedscope.app) или в
+свернутых стеках (collapsed) для flamegraph.pl. Время - настенное: в
+стеках потока event loop видны и ожидание (select), и параллельные
+запросы, выполнявшиеся в том же потоке.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from types import FrameType
+from typing import Any
+
+# Кадр стека: функция, файл, строка объявления
+Frame = tuple[str, str, int]
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+_active_profiler: ContextVar["SamplingProfiler | None"] = ContextVar(
+    "active_profiler", default=None
+)
+
+
+class SamplingProfiler:
+    """Профилировщик, снимающий стеки потоков запроса в фоновом потоке"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        # Стек (от корня к листу) -> суммарное время в секундах
+        self.stacks: dict[tuple[Frame, ...], float] = {}
+        self.duration = 0.0
+        self._threads: Counter[int] = Counter()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Снимать стеки текущего потока внутри блока"""
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    @contextmanager
+    def profile(self) -> Iterator["SamplingProfiler"]:
+        """Профилировать текущий поток и потоки run_in_session внутри блока"""
+        token = _active_profiler.set(self)
+        self._sampler = threading.Thread(
+            target=self._sample, name="request-profiler", daemon=True
+        )
+        start = time.perf_counter()
+        try:
+            with self.thread():
+                self._sampler.start()
+                yield self
+        finally:
+            self._stopped.set()
+            self._sampler.join()
+            self.duration = time.perf_counter() - start
+            _active_profiler.reset(token)
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval_seconds):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            with self._lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                root = (f"thread {names.get(ident, ident)}", "", 0)
+                stack = (root, *_stack(frame))
+                self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed
+
+    def collapsed(self) -> str:
+        """Свернутые стеки: "корень;...;лист вес", вес - микросекунды"""
+        return "".join(
+            ";".join(_frame_label(frame) for frame in stack)
+            + f" {round(seconds * 1_000_000)}\n"
+            for stack, seconds in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """Отчет в формате speedscope (sampled-профиль, единица - секунды)"""
+        frame_index: dict[Frame, int] = {}
+        samples: list[list[int]] = []
+        weights: list[float] = []
+        for stack, seconds in self.stacks.items():
+            samples.append(
+                [frame_index.setdefault(frame, len(frame_index)) for frame in stack]
+            )
+            weights.append(seconds)
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "task-manager-api",
+            "shared": {
+                "frames": [
+                    {"name": function, "file": file, "line": line}
+                    for function, file, line in frame_index
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+def _stack(frame: FrameType | None) -> list[Frame]:
+    """Кадры стека от корня к листу"""
+    stack: list[Frame] = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _frame_label(frame: Frame) -> str:
+    function, file, line = frame
+    label = f"{function} ({file}:{line})" if file else function
+    # ";" разделяет кадры в свернутом формате
+    return label.replace(";", ":")
+
+
+def profiled[**P, R](func: Callable[P, R]) -> Callable[P, R]:
+    """
+    Функция, которая при активном профилировании запроса регистрирует
+    свой поток в профилировщике. Без профилирования возвращается func.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with profiler.thread():
+            return func(*args, **kwargs)
+
+    return wrapper
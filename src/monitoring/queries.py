@@ -0,0 +1,121 @@
+"""
+Учет SQL-запросов в пределах HTTP-запроса.
+
+Слушатели событий курсора на классе Engine считают запросы и их время для
+всех движков (синхронных, асинхронных, реплик). Статистика привязана к
+запросу через ContextVar: она видна и в пуле потоков (run_in_threadpool
+копирует контекст), и в run_sync асинхронной сессии. Вне track_queries()
+слушатели ничего не делают.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+
+@dataclass
+class QueryStats:
+    """Запросы к БД в пределах одного HTTP-запроса"""
+
+    count: int = 0
+    seconds: float = 0.0
+    # HTTP-запрос, к которому относится статистика (метод и шаблон маршрута)
+    method: str = ""
+    route: str = ""
+    # Количество выполнений каждого текста запроса
+    statements: dict[str, int] = field(default_factory=dict)
+
+    def record(self, statement: str, seconds: float, many: bool = False) -> None:
+        """
+        Учесть выполненный запрос. Пакетные executemany (загрузка задач
+        пачками) не считаются повторами: это не признак N+1.
+        """
+        self.count += 1
+        self.seconds += seconds
+        if not many:
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Запросы, выполненные не меньше threshold раз (признак N+1)"""
+        return sorted(
+            (
+                (statement, count)
+                for statement, count in self.statements.items()
+                if count >= threshold
+            ),
+            key=lambda item: -item[1],
+        )
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "db_query_stats", default=None
+)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Статистика текущего HTTP-запроса (None вне track_queries())"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Считать запросы к БД, выполненные внутри блока в этом контексте"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    if context is not None and _current_stats.get() is not None:
+        context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    stats = _current_stats.get()
+    started_at = getattr(context, "_query_started_at", None)
+    if stats is not None and started_at is not None:
+        stats.record(statement, time.perf_counter() - started_at, many)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[list[str]]:
+    """
+    Проверить, что блок выполнил не больше limit запросов к БД.
+    Считаются запросы всех движков и потоков (в том числе TestClient).
+    """
+    statements: list[str] = []
+
+    def capture(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        many: bool,
+    ) -> None:
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    if len(statements) > limit:
+        listing = "\n".join(f"  {statement}" for statement in statements)
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {len(statements)}:\n{listing}"
+        )
@@ -0,0 +1,227 @@
+"""
+Журнал медленных SQL-запросов.
+
+SlowQueryLog подключается к движку (как метрики пула) и пишет в лог только
+запросы дольше порога: текст, параметры со скрытыми чувствительными
+значениями, метод репозитория, из которого выполнен запрос, и маршрут
+HTTP-запроса. По желанию для медленного SELECT снимается план EXPLAIN: в
+фоновом потоке (или задачей event loop для асинхронного драйвера), чтобы
+не задерживать ответ.
+"""
+
+import asyncio
+import contextvars
+import logging
+import re
+import sys
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from types import FrameType
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.monitoring.queries import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+# Параметры с такими именами не попадают в лог
+SENSITIVE_PARAMETER = re.compile(r"pass|secret|token|hash|email", re.IGNORECASE)
+# Длинные строковые параметры обрезаются
+MAX_PARAMETER_LENGTH = 64
+# Один и тот же запрос объясняется не чаще раза в этот интервал (секунды)
+EXPLAIN_INTERVAL_SECONDS = 60.0
+# Опция выполнения, исключающая запрос из журнала (сами EXPLAIN)
+SKIP_OPTION = "skip_slow_query_log"
+# Модули, чьи функции указываются как источник запроса
+CALLER_MODULE_PREFIX = "src.repositories"
+
+
+def redact_parameters(parameters: Any, names: Sequence[str] | None = None) -> Any:
+    """
+    Параметры запроса для лога: значения с чувствительными именами скрыты,
+    длинные строки обрезаны. Позиционные параметры сопоставляются с
+    именами из скомпилированного запроса (names).
+    """
+    if isinstance(parameters, Mapping):
+        items = list(parameters.items())
+    elif names is not None and len(names) == len(parameters):
+        items = list(zip(names, parameters, strict=True))
+    else:
+        return [_redact_value(value) for value in parameters]
+    return {
+        name: "***" if SENSITIVE_PARAMETER.search(name) else _redact_value(value)
+        for name, value in items
+    }
+
+
+def _redact_value(value: Any) -> Any:
+    if isinstance(value, str | bytes) and len(value) > MAX_PARAMETER_LENGTH:
+        return f"{value[:MAX_PARAMETER_LENGTH]!r}... ({len(value)} chars)"
+    return value
+
+
+def calling_method() -> str | None:
+    """Метод репозитория, выполняющий запрос (ближайший по стеку вызовов)"""
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith(CALLER_MODULE_PREFIX):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Журнал запросов дольше threshold_seconds для одного движка"""
+
+    def __init__(self, engine: Engine, threshold_seconds: float, explain: bool):
+        self.engine = engine
+        self.threshold_seconds = threshold_seconds
+        self.explain = explain
+        self._explained_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def before_cursor_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        many: bool,
+    ) -> None:
+        if context is not None:
+            context._slow_query_started_at = time.perf_counter()
+
+    def after_cursor_execute(
+        self,
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        many: bool,
+    ) -> None:
+        started_at = getattr(context, "_slow_query_started_at", None)
+        if started_at is None:
+            return
+        seconds = time.perf_counter() - started_at
+        if seconds < self.threshold_seconds or context.execution_options.get(
+            SKIP_OPTION
+        ):
+            return
+
+        names = getattr(context.compiled, "positiontup", None)
+        if many:
+            redacted: Any = {
+                "rows": len(parameters),
+                "first": redact_parameters(parameters[0], names) if parameters else {},
+            }
+        else:
+            redacted = redact_parameters(parameters, names)
+        stats = current_query_stats()
+        route = f"{stats.method} {stats.route}" if stats and stats.route else "-"
+        caller = calling_method() or "-"
+        logger.warning(
+            "Slow query %.1f ms in %s (route %s): %s | parameters: %s",
+            seconds * 1000,
+            caller,
+            route,
+            statement,
+            redacted,
+        )
+        if self.explain and not many and self._should_explain(statement):
+            self._schedule_explain(statement, parameters, caller)
+
+    def _should_explain(self, statement: str) -> bool:
+        """Только SELECT и не чаще раза в EXPLAIN_INTERVAL_SECONDS"""
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            explained_at = self._explained_at.get(statement)
+            if explained_at is not None and now - explained_at < (
+                EXPLAIN_INTERVAL_SECONDS
+            ):
+                return False
+            self._explained_at[statement] = now
+        return True
+
+    def _explain_sql(self, statement: str) -> str:
+        prefix = "EXPLAIN QUERY PLAN" if self.engine.name == "sqlite" else "EXPLAIN"
+        return f"{prefix} {statement}"
+
+    def _log_plan(self, caller: str, statement: str, rows: list[Any]) -> None:
+        plan = "\n".join(" | ".join(str(column) for column in row) for row in rows)
+        logger.warning("EXPLAIN for slow query in %s: %s\n%s", caller, statement, plan)
+
+    def _schedule_explain(self, statement: str, parameters: Any, caller: str) -> None:
+        """Снять план в фоне: запрос уже выполнен, ответ не ждет EXPLAIN"""
+        if self.engine.dialect.is_async:
+            # Асинхронный драйвер работает только в event loop; пустой
+            # контекст, чтобы EXPLAIN не попал в статистику HTTP-запроса
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            loop.create_task(
+                self._explain_async(statement, parameters, caller),
+                context=contextvars.Context(),
+            )
+            return
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=1, thread_name_prefix="slow-query-explain"
+                    )
+        self._executor.submit(self._explain, statement, parameters, caller)
+
+    def _explain(self, statement: str, parameters: Any, caller: str) -> None:
+        try:
+            with self.engine.connect() as conn:
+                rows = (
+                    conn.execution_options(**{SKIP_OPTION: True})
+                    .exec_driver_sql(self._explain_sql(statement), parameters)
+                    .all()
+                )
+        except Exception:
+            logger.exception("EXPLAIN failed for slow query in %s", caller)
+            return
+        self._log_plan(caller, statement, list(rows))
+
+    async def _explain_async(
+        self, statement: str, parameters: Any, caller: str
+    ) -> None:
+        try:
+            async with AsyncEngine(self.engine).connect() as conn:
+                conn = await conn.execution_options(**{SKIP_OPTION: True})
+                result = await conn.exec_driver_sql(
+                    self._explain_sql(statement), parameters
+                )
+                rows = result.all()
+        except Exception:
+            logger.exception("EXPLAIN failed for slow query in %s", caller)
+            return
+        self._log_plan(caller, statement, list(rows))
+
+    def close(self) -> None:
+        """Дождаться начатых EXPLAIN и остановить фоновый поток"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def install_slow_query_log(
+    engine: Engine, threshold_seconds: float, explain: bool = False
+) -> SlowQueryLog:
+    """Подключить журнал медленных запросов к движку"""
+    slow_log = SlowQueryLog(engine, threshold_seconds, explain)
+    event.listen(engine, "before_cursor_execute", slow_log.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", slow_log.after_cursor_execute)
+    return slow_log
@@ -0,0 +1,331 @@
+"""
+Трассировка запросов: спаны маршрута, методов сервисов и репозиториев и
+SQL-запросов.
+
+Текущий спан хранится в ContextVar, поэтому вложенность сохраняется и в
+пуле потоков (run_in_threadpool копирует контекст), и в run_sync
+асинхронной сессии. Решение о выборке принимается один раз для запроса
+(корневого спана): в невыбранном запросе текущего спана нет, и обертки
+методов сводятся к одной проверке ContextVar.
+
+Контекст передается заголовком traceparent (W3C Trace Context). Спаны
+трассы отправляются экспортеру одним пакетом, когда завершается корневой
+спан.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from inspect import iscoroutinefunction
+from pathlib import Path
+from typing import Any, Protocol
+
+from sqlalchemy import Engine, event
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+# SQL в атрибутах спана обрезается до этой длины
+MAX_STATEMENT_LENGTH = 1000
+
+
+@dataclass
+class Span:
+    """Участок работы внутри трассы"""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    kind: str
+    start_time_ns: int
+    end_time_ns: int = 0
+    status: str = "ok"
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time_ns - self.start_time_ns) / 1_000_000
+
+
+class SpanExporter(Protocol):
+    """Получатель завершенных трасс"""
+
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+
+class InMemoryExporter:
+    """Хранит спаны в памяти (тесты, отладка)"""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonLinesExporter:
+    """Дописывает спаны в файл, по одному JSON-объекту на строку"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        lines = "".join(json.dumps(asdict(span)) + "\n" for span in spans)
+        with self._lock, self.path.open("a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+@dataclass
+class _Trace:
+    """Спаны одной трассы, собираемые до завершения корневого спана"""
+
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+
+
+@dataclass
+class _Active:
+    span: Span
+    trace: _Trace
+
+
+_current: ContextVar[_Active | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Настройки трассировки: доля выбираемых запросов и экспортер"""
+
+    def __init__(self, exporter: SpanExporter | None = None, sample_rate: float = 0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def should_sample(self, parent: tuple[str, str, bool] | None) -> bool:
+        """Выбрать запрос: решение вызывающего сервиса или случайная выборка"""
+        if self.exporter is None:
+            return False
+        if parent is not None:
+            return parent[2]
+        return random.random() < self.sample_rate
+
+
+TRACER = Tracer()
+
+
+def configure_tracing(exporter: SpanExporter | None, sample_rate: float) -> Tracer:
+    """Настроить глобальный трассировщик"""
+    TRACER.exporter = exporter
+    TRACER.sample_rate = sample_rate
+    return TRACER
+
+
+def create_exporter(name: str, path: str) -> SpanExporter | None:
+    """Экспортер по имени из настроек: none, memory или jsonl"""
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryExporter()
+    if name == "jsonl":
+        return JsonLinesExporter(path)
+    raise ValueError(f"Unknown tracing exporter '{name}'")
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Разобрать traceparent: (trace_id, parent_id, sampled) или None"""
+    match = TRACEPARENT.match(value.strip().lower()) if value else None
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def format_traceparent(span: Span) -> str:
+    """Заголовок traceparent для передачи контекста спана дальше"""
+    return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+def current_span() -> Span | None:
+    """Текущий спан (None вне трассы или в невыбранном запросе)"""
+    active = _current.get()
+    return active.span if active is not None else None
+
+
+def start_span(name: str, kind: str, **attributes: Any) -> Span | None:
+    """
+    Начать дочерний спан текущего; вернуть его или None вне трассы.
+    Текущим спан не становится, завершает его вызывающий (end_time_ns).
+    """
+    parent = _current.get()
+    if parent is None:
+        return None
+    span = Span(
+        trace_id=parent.trace.trace_id,
+        span_id=_new_id(64),
+        parent_id=parent.span.span_id,
+        name=name,
+        kind=kind,
+        start_time_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    parent.trace.spans.append(span)
+    return span
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[Span | None]:
+    """Дочерний спан текущего на время блока (ничего не делает вне трассы)"""
+    parent = _current.get()
+    child = start_span(name, kind, **attributes)
+    if parent is None or child is None:
+        yield None
+        return
+    token = _current.set(_Active(child, parent.trace))
+    try:
+        yield child
+    except BaseException as error:
+        child.status = "error"
+        child.attributes["error"] = type(error).__name__
+        raise
+    finally:
+        child.end_time_ns = time.time_ns()
+        _current.reset(token)
+
+
+@contextmanager
+def root_span(
+    name: str, kind: str, traceparent: str | None = None, **attributes: Any
+) -> Iterator[Span | None]:
+    """
+    Корневой спан запроса. Продолжает трассу из traceparent или начинает
+    новую; при невыбранном запросе возвращает None. По завершении спаны
+    трассы уходят экспортеру.
+    """
+    parent = parse_traceparent(traceparent)
+    if not TRACER.should_sample(parent):
+        yield None
+        return
+    trace = _Trace(parent[0] if parent else _new_id(128))
+    root = Span(
+        trace_id=trace.trace_id,
+        span_id=_new_id(64),
+        parent_id=parent[1] if parent else None,
+        name=name,
+        kind=kind,
+        start_time_ns=time.time_ns(),
+        attributes=attributes,
+    )
+    trace.spans.append(root)
+    token = _current.set(_Active(root, trace))
+    try:
+        yield root
+    except BaseException as error:
+        root.status = "error"
+        root.attributes["error"] = type(error).__name__
+        raise
+    finally:
+        root.end_time_ns = time.time_ns()
+        _current.reset(token)
+        if TRACER.exporter is not None:
+            TRACER.exporter.export(trace.spans)
+
+
+def _traced_function(function: Callable, name: str, kind: str) -> Callable:
+    if iscoroutinefunction(function):
+
+        @wraps(function)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _current.get() is None:
+                return await function(*args, **kwargs)
+            with span(name, kind):
+                return await function(*args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _current.get() is None:
+            return function(*args, **kwargs)
+        with span(name, kind):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def traced[C: type](kind: str) -> Callable[[C], C]:
+    """
+    Декоратор класса: каждый публичный метод выполняется в спане
+    "<Класс>.<метод>" вида kind (service, repository).
+    """
+
+    def decorate(cls: C) -> C:
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_"):
+                continue
+            if isinstance(value, staticmethod | classmethod):
+                wrapped = _traced_function(
+                    value.__func__, f"{cls.__name__}.{attr}", kind
+                )
+                setattr(cls, attr, type(value)(wrapped))
+            elif callable(value):
+                setattr(
+                    cls,
+                    attr,
+                    _traced_function(value, f"{cls.__name__}.{attr}", kind),
+                )
+        return cls
+
+    return decorate
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_sql_span(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    if context is None or _current.get() is None:
+        return
+    context._trace_span = start_span(
+        "SQL",
+        "sql",
+        statement=statement[:MAX_STATEMENT_LENGTH],
+        executemany=many,
+        system=conn.dialect.name,
+    )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_sql_span(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    sql_span = getattr(context, "_trace_span", None)
+    if sql_span is not None:
+        sql_span.end_time_ns = time.time_ns()
+        context._trace_span = None
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_sql_span(exception_context: Any) -> None:
+    sql_span = getattr(exception_context.execution_context, "_trace_span", None)
+    if sql_span is not None:
+        sql_span.end_time_ns = time.time_ns()
+        sql_span.status = "error"
+        sql_span.attributes["error"] = type(
+            exception_context.original_exception
+        ).__name__
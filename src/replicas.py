@@ -0,0 +1,124 @@
+"""
+Реплики базы данных для чтения.
+
+ReplicaSet выбирает реплику по кругу, пропуская недоступные, и помнит
+пользователей, которые недавно писали в основную БД: их чтения идут в
+основную БД, пока реплика может отставать (read-your-writes).
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Sequence
+
+from sqlalchemy import Engine, event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Не чаще раза в столько записей чистим устаревшие отметки о записи
+PRUNE_EVERY = 1000
+
+
+class Replica:
+    """Реплика и ее состояние"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        # Момент (time.monotonic), до которого реплика считается недоступной
+        self.unavailable_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaSet:
+    """Набор реплик с выбором по кругу и проверкой доступности"""
+
+    def __init__(
+        self,
+        engines: Sequence[Engine],
+        read_your_writes_seconds: float,
+        retry_seconds: float,
+    ):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self._counter = itertools.count()
+        self._recent_writes: dict[int, float] = {}
+        self._writes_lock = threading.Lock()
+        self._writes_since_prune = 0
+
+        for replica in self.replicas:
+            event.listen(replica.engine, "handle_error", self._on_error(replica))
+
+    def _on_error(self, replica: Replica):
+        """Обработчик ошибок движка: потерянное соединение выводит реплику"""
+
+        def handle_error(context: ExceptionContext) -> None:
+            # connection is None - ошибка при подключении
+            if context.is_disconnect or context.connection is None:
+                self.mark_unavailable(replica)
+
+        return handle_error
+
+    def mark_unavailable(self, replica: Replica) -> None:
+        """Исключить реплику из выбора на retry_seconds"""
+        replica.unavailable_until = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Read replica %s is unavailable, retrying in %ss",
+            replica.name,
+            self.retry_seconds,
+        )
+
+    def _is_available(self, replica: Replica) -> bool:
+        """Доступна ли реплика; по истечении паузы проверяется запросом SELECT 1"""
+        if replica.unavailable_until == 0.0:
+            return True
+        if time.monotonic() < replica.unavailable_until:
+            return False
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except DBAPIError:
+            # Ошибку подключения уже учел обработчик handle_error
+            replica.unavailable_until = time.monotonic() + self.retry_seconds
+            return False
+        replica.unavailable_until = 0.0
+        logger.info("Read replica %s is available again", replica.name)
+        return True
+
+    def choose(self) -> Engine | None:
+        """Следующая доступная реплика по кругу; None, если доступных нет"""
+        start = next(self._counter)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._is_available(replica):
+                return replica.engine
+        return None
+
+    def record_write(self, user_id: int) -> None:
+        """Запомнить, что пользователь только что записал данные"""
+        now = time.monotonic()
+        with self._writes_lock:
+            self._recent_writes[user_id] = now
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= PRUNE_EVERY:
+                self._writes_since_prune = 0
+                expired = now - self.read_your_writes_seconds
+                self._recent_writes = {
+                    writer: written_at
+                    for writer, written_at in self._recent_writes.items()
+                    if written_at > expired
+                }
+
+    def wrote_recently(self, user_id: int) -> bool:
+        """Писал ли пользователь за последние read_your_writes_seconds"""
+        written_at = self._recent_writes.get(user_id)
+        return (
+            written_at is not None
+            and time.monotonic() - written_at < self.read_your_writes_seconds
+        )
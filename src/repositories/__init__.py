@@ -2,8 +2,20 @@
 Инициализация пакета repositories.
 """
 
+from .async_repositories import (
+    AsyncCategoryRepository,
+    AsyncTaskRepository,
+    AsyncUserRepository,
+)
 from .category_repository import CategoryRepository
 from .task_repository import TaskRepository
 from .user_repository import UserRepository
 
-__all__ = ["UserRepository", "CategoryRepository", "TaskRepository"]
+__all__ = [
+    "UserRepository",
+    "CategoryRepository",
+    "TaskRepository",
+    "AsyncUserRepository",
+    "AsyncCategoryRepository",
+    "AsyncTaskRepository",
+]
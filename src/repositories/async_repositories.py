@@ -0,0 +1,28 @@
+"""
+Асинхронные варианты репозиториев.
+Выполняют запросы синхронных репозиториев через run_in_session,
+не блокируя event loop.
+"""
+
+from src.database import AsyncSessionProxy
+from src.repositories.category_repository import CategoryRepository
+from src.repositories.task_repository import TaskRepository
+from src.repositories.user_repository import UserRepository
+
+
+class AsyncTaskRepository(AsyncSessionProxy):
+    """Асинхронный репозиторий задач"""
+
+    wrapped_class = TaskRepository
+
+
+class AsyncCategoryRepository(AsyncSessionProxy):
+    """Асинхронный репозиторий категорий"""
+
+    wrapped_class = CategoryRepository
+
+
+class AsyncUserRepository(AsyncSessionProxy):
+    """Асинхронный репозиторий пользователей"""
+
+    wrapped_class = UserRepository
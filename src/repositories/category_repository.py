@@ -3,12 +3,18 @@
 Содержит все операции CRUD для модели Category.
 """
 
-from sqlalchemy import func
+from sqlalchemy import ColumnElement, and_, func, select
 from sqlalchemy.orm import Session
 
 from src.models.category import Category
+from src.monitoring.tracing import traced
+from src.repositories.pagination import fetch_page_with_total
+from src.repositories.trigram_search import TrigramSearch
+from src.repositories.writes import column_values, update_returning
+from src.utils.pagination import TotalMode
 
 
+@traced("repository")
 class CategoryRepository:
     """Репозиторий для работы с категориями"""
 
@@ -23,6 +29,31 @@ class CategoryRepository:
             .first()
         )
 
+    def get_existing_ids(self, category_ids: set[int], user_id: int) -> set[int]:
+        """Получить ID категорий пользователя из указанных одним запросом"""
+        if not category_ids:
+            return set()
+        return set(
+            self.db.scalars(
+                select(Category.category_id).where(
+                    Category.user_id == user_id,
+                    Category.category_id.in_(category_ids),
+                )
+            )
+        )
+
+    def get_title_map(self, user_id: int) -> dict[str, int]:
+        """Названия категорий пользователя и их ID одним запросом"""
+        return dict(
+            self.db.execute(
+                select(Category.title, Category.category_id).where(
+                    Category.user_id == user_id
+                )
+            )
+            .tuples()
+            .all()
+        )
+
     def get_by_title(self, title: str, user_id: int) -> Category | None:
         """Получить категорию по названию для конкретного пользователя"""
         return (
@@ -32,91 +63,76 @@ class CategoryRepository:
         )
 
     def get_all_by_user(
-        self, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[Category], int]:
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact,
+    ) -> tuple[list[Category], int | None]:
         """Получить список всех категорий пользователя с пагинацией"""
-        # Получаем общее количество категорий пользователя
-        total = (
-            self.db.query(func.count(Category.category_id))
-            .filter(Category.user_id == user_id)
-            .scalar()
-        )
-
-        # Получаем категории с пагинацией
-        categories = (
-            self.db.query(Category)
-            .filter(Category.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        # Получаем категории с пагинацией и общее количество одним запросом
+        return fetch_page_with_total(
+            self.db.query(Category).filter(Category.user_id == user_id),
+            skip,
+            limit,
+            total_mode,
         )
 
-        return categories, total
-
     def search_categories(
-        self, query: str, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[Category], int]:
-        """Поиск категорий по названию для конкретного пользователя"""
-        search_filter = (Category.title.ilike(f"%{query}%")) & (
-            Category.user_id == user_id
-        )
-
-        # Получаем общее количество найденных категорий
-        total = (
-            self.db.query(func.count(Category.category_id))
-            .filter(search_filter)
-            .scalar()
-        )
-
-        # Получаем категории с пагинацией
-        categories = (
+        self,
+        query: str,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact,
+        fuzzy: bool = False,
+    ) -> tuple[list[Category], int | None]:
+        """
+        Поиск категорий по названию для конкретного пользователя.
+        Результаты упорядочены по сходству с запросом.
+        """
+        search = TrigramSearch(self.db, query, fuzzy)
+        search_query = (
             self.db.query(Category)
-            .filter(search_filter)
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .filter(Category.user_id == user_id, search.criteria(Category.title))
+            .order_by(search.rank(Category.title).desc(), Category.category_id)
         )
 
-        return categories, total
+        # Получаем категории с пагинацией и общее количество одним запросом
+        return fetch_page_with_total(search_query, skip, limit, total_mode)
 
     def create_category(self, title: str, user_id: int) -> Category:
         """Создать новую категорию"""
+        # INSERT ... RETURNING возвращает ключ и серверные значения
         new_category = Category(title=title, user_id=user_id)
         self.db.add(new_category)
-        self.db.commit()
-        self.db.refresh(new_category)
+        self.db.flush()
         return new_category
 
+    def _ownership(self, category_id: int, user_id: int) -> ColumnElement[bool]:
+        """Условие: категория с category_id принадлежит пользователю"""
+        return and_(Category.category_id == category_id, Category.user_id == user_id)
+
     def update_category(
         self, category_id: int, user_id: int, **kwargs
     ) -> Category | None:
         """Обновить данные категории"""
-        category = self.get_by_id(category_id, user_id)
-        if not category:
-            return None
-
-        for key, value in kwargs.items():
-            if value is not None and hasattr(category, key):
-                setattr(category, key, value)
-
-        self.db.commit()
-        self.db.refresh(category)
-        return category
+        values = {key: value for key, value in kwargs.items() if value is not None}
+        return update_returning(
+            self.db,
+            Category,
+            self._ownership(category_id, user_id),
+            column_values(Category, values),
+        )
 
     def update_category_partial(
         self, category_id: int, user_id: int, title: str | None = None
     ) -> Category | None:
         """Частичное обновление данных категории"""
-        category = self.get_by_id(category_id, user_id)
-        if not category:
-            return None
-
-        if title is not None:
-            category.title = title
-
-        self.db.commit()
-        self.db.refresh(category)
-        return category
+        values = {"title": title} if title is not None else {}
+        return update_returning(
+            self.db, Category, self._ownership(category_id, user_id), values
+        )
 
     def delete_category(self, category_id: int, user_id: int) -> bool:
         """Удалить категорию"""
@@ -125,7 +141,7 @@ class CategoryRepository:
             return False
 
         self.db.delete(category)
-        self.db.commit()
+        self.db.flush()
         return True
 
     def exists_by_title(self, title: str, user_id: int) -> bool:
@@ -155,7 +171,8 @@ class CategoryRepository:
     def count_by_user(self, user_id: int) -> int:
         """Получить количество категорий у пользователя"""
         result = (
-            self.db.query(func.count(Category.category_id))
+            self.db.query(func.count())
+            .select_from(Category)
             .filter(Category.user_id == user_id)
             .scalar()
         )
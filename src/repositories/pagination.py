@@ -0,0 +1,94 @@
+"""
+Общая пагинация для репозиториев.
+Страница строк и общее количество получаются одним запросом.
+"""
+
+import json
+from typing import Any
+
+from sqlalchemy import bindparam, func, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from src.utils.pagination import TotalMode
+
+# Ниже этого числа строк оценка заменяется точным подсчетом
+ESTIMATE_THRESHOLD = 10_000
+
+
+def count_rows(query: Query[Any]) -> int:
+    """Посчитать строки запроса без учета сортировки и пагинации"""
+    subquery = query.order_by(None).limit(None).offset(None).subquery()
+    return int(query.session.query(func.count()).select_from(subquery).scalar() or 0)
+
+
+def estimate_rows(query: Query[Any]) -> int | None:
+    """
+    Оценить количество строк запроса по статистике планировщика.
+    Берется оценка EXPLAIN (Plan Rows) в PostgreSQL; для остальных СУБД
+    оценки нет и возвращается None.
+    """
+    session = query.session
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    # Компилируем с именованными параметрами и оборачиваем в text(), чтобы
+    # значения (в том числе Enum) обработал SQLAlchemy, а не драйвер напрямую
+    statement = query.order_by(None).limit(None).offset(None).statement
+    compiled = statement.compile(dialect=postgresql.dialect(paramstyle="named"))
+    explain = text(f"EXPLAIN (FORMAT JSON) {compiled.string}").bindparams(
+        *(
+            bindparam(name, value=bind.effective_value, type_=bind.type)
+            for bind, name in compiled.bind_names.items()
+        )
+    )
+    plan = session.execute(explain).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(query: Query[Any], total_mode: TotalMode) -> int | None:
+    """Общее количество строк запроса согласно total_mode"""
+    if total_mode is TotalMode.none:
+        return None
+    if total_mode is TotalMode.estimate:
+        estimate = estimate_rows(query)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+    return count_rows(query)
+
+
+def fetch_page_with_total[T](
+    query: Query[T],
+    skip: int,
+    limit: int,
+    total_mode: TotalMode = TotalMode.exact,
+) -> tuple[list[T], int | None]:
+    """
+    Получить страницу строк и общее количество.
+
+    В режиме exact количество считается оконной функцией count(*) OVER ()
+    в том же SELECT. Если страница пуста (skip за пределами выборки), окно
+    не вернет ни одной строки, и количество считается отдельным запросом.
+    В режиме estimate для больших выборок берется оценка планировщика,
+    в режиме none количество не считается (None).
+    """
+    if total_mode is TotalMode.estimate:
+        estimate = estimate_rows(query)
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return query.offset(skip).limit(limit).all(), estimate
+    elif total_mode is TotalMode.none:
+        return query.offset(skip).limit(limit).all(), None
+
+    rows = (
+        query.add_columns(func.count().over().label("total_count"))
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    if rows:
+        return [row[0] for row in rows], int(rows[0][1])
+    if skip == 0:
+        return [], 0
+    return [], count_rows(query)
@@ -3,20 +3,105 @@
 Содержит все операции CRUD для модели Task.
 """
 
+from collections.abc import Iterator
 from datetime import datetime
-
-from sqlalchemy import and_, func
-from sqlalchemy.orm import Session
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.orm import Query, Session
 
 from src.models.task import PriorityEnum, StatusEnum, Task
-
-
+from src.monitoring.tracing import traced
+from src.repositories.pagination import count_total, fetch_page_with_total
+from src.repositories.task_search import TaskSearch
+from src.repositories.writes import column_values, update_returning
+from src.utils.pagination import TotalMode
+
+# Максимальное количество ID в одном IN (...) при массовых операциях
+BULK_CHUNK_SIZE = 500
+# Колонки выгрузки задач (поля TaskResponse)
+EXPORT_COLUMNS = (
+    Task.task_id,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.priority,
+    Task.due_date,
+    Task.category_id,
+    Task.user_id,
+    Task.created_at,
+    Task.updated_at,
+)
+
+
+def _chunked(ids: list[int]) -> Iterator[list[int]]:
+    """Разбить список ID на части не длиннее BULK_CHUNK_SIZE"""
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        yield ids[start : start + BULK_CHUNK_SIZE]
+
+
+@traced("repository")
 class TaskRepository:
     """Репозиторий для работы с задачами"""
 
     def __init__(self, db: Session):
         self.db = db
 
+    def _count_query(self) -> Query:
+        """Запрос COUNT(*) по задачам: выполняется только по индексу"""
+        return self.db.query(func.count()).select_from(Task)
+
+    @staticmethod
+    def _keyset_filter(
+        user_id: int, cursor: tuple[datetime, int]
+    ) -> ColumnElement[bool]:
+        """Условие для keyset-пагинации по (created_at, task_id)"""
+        created_at, task_id = cursor
+        # Берем created_at опорной задачи из БД, чтобы сравнение не зависело
+        # от точности хранения даты; если задача удалена - используем курсор
+        anchor = (
+            select(Task.created_at)
+            .where(Task.task_id == task_id, Task.user_id == user_id)
+            .scalar_subquery()
+        )
+        return tuple_(Task.created_at, Task.task_id) < tuple_(
+            func.coalesce(anchor, created_at), task_id
+        )
+
+    def _fetch_page(
+        self,
+        criteria: ColumnElement[bool],
+        user_id: int,
+        skip: int,
+        limit: int,
+        cursor: tuple[datetime, int] | None,
+        total_mode: TotalMode,
+    ) -> tuple[list[Task], int | None]:
+        """Получить страницу задач (offset или keyset) и общее количество"""
+        query = (
+            self.db.query(Task)
+            .filter(criteria)
+            .order_by(Task.created_at.desc(), Task.task_id.desc())
+        )
+        if cursor is None:
+            return fetch_page_with_total(query, skip, limit, total_mode)
+
+        # В keyset-режиме окно посчитало бы только задачи после курсора,
+        # поэтому общее количество считается отдельным запросом
+        total = count_total(query, total_mode)
+        tasks = query.filter(self._keyset_filter(user_id, cursor)).limit(limit).all()
+        return tasks, total
+
     def get_by_id(self, task_id: int, user_id: int) -> Task | None:
         """Получить задачу по ID для конкретного пользователя"""
         return (
@@ -36,8 +121,28 @@ class TaskRepository:
         due_date_from: datetime | None = None,
         due_date_to: datetime | None = None,
         search: str | None = None,
-    ) -> tuple[list[Task], int]:
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.exact,
+    ) -> tuple[list[Task], int | None]:
         """Получить список всех задач пользователя с фильтрацией и пагинацией"""
+        criteria = self._filter_criteria(
+            user_id, status, priority, category_id, due_date_from, due_date_to, search
+        )
+
+        # Получаем задачи с пагинацией и общее количество
+        return self._fetch_page(criteria, user_id, skip, limit, cursor, total_mode)
+
+    def _filter_criteria(
+        self,
+        user_id: int,
+        status: StatusEnum | None = None,
+        priority: PriorityEnum | None = None,
+        category_id: int | None = None,
+        due_date_from: datetime | None = None,
+        due_date_to: datetime | None = None,
+        search: str | None = None,
+    ) -> ColumnElement[bool]:
+        """Условие выборки задач пользователя по фильтрам TaskFilter"""
 
         # Базовый фильтр по пользователю
         filters = [Task.user_id == user_id]
@@ -59,97 +164,83 @@ class TaskRepository:
             filters.append(Task.due_date <= due_date_to)
 
         if search:
-            search_filter = Task.title.ilike(f"%{search}%") | Task.description.ilike(
-                f"%{search}%"
-            )
-            filters.append(search_filter)
+            filters.append(TaskSearch(self.db, search).criteria())
 
-        # Создаем условие фильтрации
-        filter_condition = and_(*filters)
+        return and_(*filters)
 
-        # Получаем общее количество задач
-        total = (
-            self.db.query(func.count(Task.task_id)).filter(filter_condition).scalar()
+    def export_query(
+        self,
+        user_id: int,
+        status: StatusEnum | None = None,
+        priority: PriorityEnum | None = None,
+        category_id: int | None = None,
+        due_date_from: datetime | None = None,
+        due_date_to: datetime | None = None,
+        search: str | None = None,
+    ) -> Select:
+        """
+        Запрос для выгрузки задач пользователя. Выбираются колонки, а не
+        объекты Task: строки не попадают в identity map сессии.
+        """
+        criteria = self._filter_criteria(
+            user_id, status, priority, category_id, due_date_from, due_date_to, search
         )
-
-        # Получаем задачи с пагинацией
-        tasks = (
-            self.db.query(Task)
-            .filter(filter_condition)
-            .order_by(Task.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return (
+            select(*EXPORT_COLUMNS)
+            .where(criteria)
+            .order_by(Task.created_at.desc(), Task.task_id.desc())
         )
 
-        return tasks, total
-
     def get_by_status(
-        self, user_id: int, status: StatusEnum, skip: int = 0, limit: int = 100
-    ) -> tuple[list[Task], int]:
+        self,
+        user_id: int,
+        status: StatusEnum,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.exact,
+    ) -> tuple[list[Task], int | None]:
         """Получить задачи по статусу для конкретного пользователя"""
-        # Получаем общее количество задач с указанным статусом
-        total = (
-            self.db.query(func.count(Task.task_id))
-            .filter(Task.user_id == user_id, Task.status == status)
-            .scalar()
-        )
-
-        # Получаем задачи с пагинацией
-        tasks = (
-            self.db.query(Task)
-            .filter(Task.user_id == user_id, Task.status == status)
-            .order_by(Task.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self._fetch_page(
+            and_(Task.user_id == user_id, Task.status == status),
+            user_id,
+            skip,
+            limit,
+            cursor,
+            total_mode,
         )
 
-        return tasks, total
-
     def get_by_category(
-        self, user_id: int, category_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[Task], int]:
+        self,
+        user_id: int,
+        category_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.exact,
+    ) -> tuple[list[Task], int | None]:
         """Получить задачи по категории для конкретного пользователя"""
-        # Получаем общее количество задач в указанной категории
-        total = (
-            self.db.query(func.count(Task.task_id))
-            .filter(Task.user_id == user_id, Task.category_id == category_id)
-            .scalar()
-        )
-
-        # Получаем задачи с пагинацией
-        tasks = (
-            self.db.query(Task)
-            .filter(Task.user_id == user_id, Task.category_id == category_id)
-            .order_by(Task.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        return self._fetch_page(
+            and_(Task.user_id == user_id, Task.category_id == category_id),
+            user_id,
+            skip,
+            limit,
+            cursor,
+            total_mode,
         )
 
-        return tasks, total
-
     def get_overdue_tasks(
-        self, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[Task], int]:
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact,
+    ) -> tuple[list[Task], int | None]:
         """Получить просроченные задачи для конкретного пользователя"""
         now = datetime.utcnow()
 
-        # Получаем общее количество просроченных задач
-        total = (
-            self.db.query(func.count(Task.task_id))
-            .filter(
-                Task.user_id == user_id,
-                Task.due_date < now,
-                Task.status != StatusEnum.done,
-                Task.status != StatusEnum.archived,
-            )
-            .scalar()
-        )
-
-        # Получаем просроченные задачи с пагинацией
-        tasks = (
+        # Получаем просроченные задачи с пагинацией и общее количество
+        query = (
             self.db.query(Task)
             .filter(
                 Task.user_id == user_id,
@@ -158,35 +249,40 @@ class TaskRepository:
                 Task.status != StatusEnum.archived,
             )
             .order_by(Task.due_date.asc())
-            .offset(skip)
-            .limit(limit)
-            .all()
         )
-
-        return tasks, total
+        return fetch_page_with_total(query, skip, limit, total_mode)
 
     def search_tasks(
-        self, query: str, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[Task], int]:
-        """Поиск задач по названию и описанию для конкретного пользователя"""
-        search_filter = (
-            Task.title.ilike(f"%{query}%") | Task.description.ilike(f"%{query}%")
-        ) & (Task.user_id == user_id)
-
-        # Получаем общее количество найденных задач
-        total = self.db.query(func.count(Task.task_id)).filter(search_filter).scalar()
-
-        # Получаем задачи с пагинацией
-        tasks = (
-            self.db.query(Task)
-            .filter(search_filter)
-            .order_by(Task.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        self,
+        query: str,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.exact,
+        ranked: bool = True,
+    ) -> tuple[list[Task], int | None]:
+        """
+        Поиск задач по названию и описанию для конкретного пользователя.
+        Без курсора результаты упорядочены по релевантности (если ranked),
+        с курсором - от новых к старым (keyset-пагинация).
+        """
+        search = TaskSearch(self.db, query)
+        if cursor is not None or not ranked:
+            search_filter = search.criteria() & (Task.user_id == user_id)
+            return self._fetch_page(
+                search_filter, user_id, skip, limit, cursor, total_mode
+            )
+
+        # Получаем задачи с пагинацией и общее количество
+        ranked_query = search.ranked(
+            self.db.query(Task).filter(Task.user_id == user_id)
         )
+        return fetch_page_with_total(ranked_query, skip, limit, total_mode)
 
-        return tasks, total
+    def get_search_snippets(self, query: str, task_ids: list[int]) -> dict[int, str]:
+        """Фрагменты текста задач с подсвеченными совпадениями запроса"""
+        return TaskSearch(self.db, query).snippets(self.db, task_ids)
 
     def create_task(
         self,
@@ -208,24 +304,54 @@ class TaskRepository:
             user_id=user_id,
             category_id=category_id,
         )
+        # INSERT ... RETURNING возвращает task_id и серверные значения
+        # (created_at, updated_at), повторное чтение не нужно
         self.db.add(new_task)
-        self.db.commit()
-        self.db.refresh(new_task)
+        self.db.flush()
         return new_task
 
+    def bulk_create(self, rows: list[dict[str, Any]]) -> list[Task]:
+        """
+        Создать задачи одним многострочным INSERT ... RETURNING.
+        Задачи возвращаются в порядке rows.
+        """
+        if not rows:
+            return []
+
+        # render_nulls: строки с None не разбиваются на отдельные INSERT.
+        # sort_by_parameter_order на SQLite вставлял бы по строке, поэтому
+        # порядок восстанавливаем по task_id - ключи выдаются по порядку VALUES
+        tasks = sorted(
+            self.db.scalars(
+                insert(Task).returning(Task).execution_options(render_nulls=True),
+                rows,
+            ),
+            key=lambda task: task.task_id,
+        )
+        return tasks
+
+    def insert_many(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Вставить задачи одним executemany без RETURNING: объекты Task не
+        создаются. Возвращает количество вставленных строк.
+        """
+        if not rows:
+            return 0
+        self.db.execute(insert(Task).execution_options(render_nulls=True), rows)
+        return len(rows)
+
+    def _ownership(self, task_id: int, user_id: int) -> ColumnElement[bool]:
+        """Условие: задача с task_id принадлежит пользователю"""
+        return and_(Task.task_id == task_id, Task.user_id == user_id)
+
     def update_task(self, task_id: int, user_id: int, **kwargs) -> Task | None:
         """Обновить данные задачи"""
-        task = self.get_by_id(task_id, user_id)
-        if not task:
-            return None
-
-        for key, value in kwargs.items():
-            if hasattr(task, key):
-                setattr(task, key, value)
-
-        self.db.commit()
-        self.db.refresh(task)
-        return task
+        return update_returning(
+            self.db,
+            Task,
+            self._ownership(task_id, user_id),
+            column_values(Task, kwargs),
+        )
 
     def update_task_partial(
         self,
@@ -239,94 +365,140 @@ class TaskRepository:
         category_id: int | None = None,
     ) -> Task | None:
         """Частичное обновление данных задачи"""
-        task = self.get_by_id(task_id, user_id)
-        if not task:
-            return None
-
-        if title is not None:
-            task.title = title
-        if description is not None:
-            task.description = description
-        if status is not None:
-            task.status = status
-        if priority is not None:
-            task.priority = priority
-        if due_date is not None:
-            task.due_date = due_date
-        if category_id is not None:
-            task.category_id = category_id
-
-        self.db.commit()
-        self.db.refresh(task)
-        return task
+        values = {
+            "title": title,
+            "description": description,
+            "status": status,
+            "priority": priority,
+            "due_date": due_date,
+            "category_id": category_id,
+        }
+        return update_returning(
+            self.db,
+            Task,
+            self._ownership(task_id, user_id),
+            {key: value for key, value in values.items() if value is not None},
+        )
 
     def update_status(
         self, task_id: int, user_id: int, status: StatusEnum
     ) -> Task | None:
         """Обновить статус задачи"""
-        task = self.get_by_id(task_id, user_id)
-        if not task:
-            return None
-
-        task.status = status
-        self.db.commit()
-        self.db.refresh(task)
-        return task
+        return update_returning(
+            self.db, Task, self._ownership(task_id, user_id), {"status": status}
+        )
 
     def delete_task(self, task_id: int, user_id: int) -> bool:
-        """Удалить задачу"""
-        task = self.get_by_id(task_id, user_id)
-        if not task:
-            return False
+        """Удалить задачу одним DELETE без предварительного чтения"""
+        deleted = self.db.scalar(
+            delete(Task)
+            .where(self._ownership(task_id, user_id))
+            .returning(Task.task_id)
+        )
+        return deleted is not None
+
+    def bulk_update_status(
+        self, task_ids: list[int], user_id: int, status: StatusEnum
+    ) -> tuple[list[Task], list[int]]:
+        """
+        Массово обновить статус задач пользователя.
+        Возвращает обновленные задачи и ID, которые не удалось обновить.
+        Если найдены не все задачи, вызывающий код должен откатить
+        транзакцию (сервис делает это, выбрасывая исключение).
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        updated: dict[int, Task] = {}
+
+        # UPDATE ... RETURNING по частям в одной транзакции
+        for chunk in _chunked(unique_ids):
+            tasks = self.db.scalars(
+                update(Task)
+                .where(Task.user_id == user_id, Task.task_id.in_(chunk))
+                .values(status=status)
+                .returning(Task)
+                .execution_options(populate_existing=True)
+            )
+            updated.update((task.task_id, task) for task in tasks)
+
+        failed_ids = [task_id for task_id in unique_ids if task_id not in updated]
+        if failed_ids:
+            return [], failed_ids
+        return [updated[task_id] for task_id in unique_ids], []
+
+    def bulk_delete(self, task_ids: list[int], user_id: int) -> list[int]:
+        """Массово удалить задачи пользователя, вернуть ID удаленных задач"""
+        unique_ids = list(dict.fromkeys(task_ids))
+        deleted: set[int] = set()
+
+        # DELETE ... RETURNING по частям в одной транзакции
+        for chunk in _chunked(unique_ids):
+            deleted.update(
+                self.db.scalars(
+                    delete(Task)
+                    .where(Task.user_id == user_id, Task.task_id.in_(chunk))
+                    .returning(Task.task_id)
+                )
+            )
 
-        self.db.delete(task)
-        self.db.commit()
-        return True
+        return [task_id for task_id in unique_ids if task_id in deleted]
 
     def count_by_user(self, user_id: int) -> int:
         """Получить общее количество задач у пользователя"""
-        result = (
-            self.db.query(func.count(Task.task_id))
-            .filter(Task.user_id == user_id)
-            .scalar()
-        )
+        result = self._count_query().filter(Task.user_id == user_id).scalar()
         return int(result or 0)
 
     def count_by_status(self, user_id: int, status: StatusEnum) -> int:
         """Получить количество задач определенного статуса у пользователя"""
         result = (
-            self.db.query(func.count(Task.task_id))
+            self._count_query()
             .filter(Task.user_id == user_id, Task.status == status)
             .scalar()
         )
         return int(result or 0)
 
     def get_task_statistics(self, user_id: int) -> dict:
-        """Получить статистику задач пользователя"""
-        total = self.count_by_user(user_id)
-        todo_count = self.count_by_status(user_id, StatusEnum.todo)
-        in_progress_count = self.count_by_status(user_id, StatusEnum.in_progress)
-        done_count = self.count_by_status(user_id, StatusEnum.done)
-        archived_count = self.count_by_status(user_id, StatusEnum.archived)
-
-        # Подсчитываем просроченные задачи
+        """Получить статистику задач пользователя одним запросом"""
         now = datetime.utcnow()
-        overdue_count = (
-            self.db.query(func.count(Task.task_id))
-            .filter(
-                Task.user_id == user_id,
-                Task.due_date < now,
-                Task.status != StatusEnum.done,
-                Task.status != StatusEnum.archived,
-            )
-            .scalar()
+        is_overdue = and_(
+            Task.due_date < now,
+            Task.status.notin_([StatusEnum.done, StatusEnum.archived]),
         )
 
+        # Одна группировка по (категория, статус, приоритет) с условным
+        # подсчетом просроченных задач; разрезы собираются из ее строк
+        rows = self.db.execute(
+            select(
+                Task.category_id,
+                Task.status,
+                Task.priority,
+                func.count(),
+                func.count().filter(is_overdue),
+            )
+            .where(Task.user_id == user_id)
+            .group_by(Task.category_id, Task.status, Task.priority)
+        ).all()
+
+        by_status = dict.fromkeys((item.value for item in StatusEnum), 0)
+        by_priority = dict.fromkeys((item.value for item in PriorityEnum), 0)
+        by_category: dict[int | None, int] = {}
+        total = 0
+        overdue_count = 0
+        for category_id, task_status, priority, count, overdue in rows:
+            total += count
+            overdue_count += overdue
+            by_status[task_status.value] += count
+            by_priority[priority.value] += count
+            by_category[category_id] = by_category.get(category_id, 0) + count
+
         return {
             "total": total,
-            "todo": todo_count,
-            "in_progress": in_progress_count,
-            "done": done_count,
-            "archived": archived_count,
+            **by_status,
             "overdue": overdue_count,
+            "by_priority": by_priority,
+            "by_category": [
+                {"category_id": category_id, "count": count}
+                for category_id, count in sorted(
+                    by_category.items(), key=lambda item: (item[0] is None, item[0])
+                )
+            ],
         }
@@ -0,0 +1,147 @@
+"""
+Построение условий полнотекстового поиска задач.
+Для PostgreSQL и SQLite используются индексы из src.models.search,
+для остальных СУБД и при FULL_TEXT_SEARCH=false - ILIKE по подстроке.
+"""
+
+import html
+import re
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    column,
+    false,
+    func,
+    literal_column,
+    select,
+    table,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Query, Session
+
+from src.config import settings
+from src.models.search import FTS_TABLE, SEARCH_CONFIG, SEARCH_VECTOR_COLUMN
+from src.models.task import Task
+
+FULL_TEXT_DIALECTS = frozenset({"postgresql", "sqlite"})
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Границы совпадений от СУБД: управляющие символы не меняются при
+# экранировании и заменяются на теги подсветки уже после него
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+# Примерная длина фрагмента с подсветкой, в словах
+SNIPPET_WORDS = 12
+
+_search_vector = literal_column(f"tasks.{SEARCH_VECTOR_COLUMN}", TSVECTOR)
+_fts = table(FTS_TABLE, column("rowid", Integer), column("rank"))
+_fts_column = literal_column(FTS_TABLE)
+
+
+def search_terms(query: str) -> list[str]:
+    """Слова поискового запроса; операторы и знаки препинания отбрасываются"""
+    return re.findall(r"\w+", query.lower())
+
+
+def _highlight(snippet: str) -> str:
+    """Экранировать фрагмент и заменить границы совпадений тегами подсветки"""
+    return (
+        html.escape(snippet)
+        .replace(_MATCH_START, HIGHLIGHT_START)
+        .replace(_MATCH_END, HIGHLIGHT_END)
+    )
+
+
+class TaskSearch:
+    """Условия поиска задач для диалекта сессии"""
+
+    def __init__(self, db: Session, query: str):
+        self.query = query
+        self.terms = search_terms(query)
+        dialect = db.get_bind().dialect.name
+        self.dialect = (
+            dialect
+            if settings.full_text_search and dialect in FULL_TEXT_DIALECTS
+            else None
+        )
+
+    def _ts_query(self) -> ColumnElement[Any]:
+        """tsquery: все слова запроса, каждое как префикс"""
+        return func.to_tsquery(
+            literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+            " & ".join(f"{term}:*" for term in self.terms),
+        )
+
+    def _fts_match(self) -> ColumnElement[bool]:
+        """MATCH FTS5: все слова запроса, каждое как префикс"""
+        return _fts_column.op("MATCH")(" ".join(f'"{term}"*' for term in self.terms))
+
+    def criteria(self) -> ColumnElement[bool]:
+        """Условие совпадения задачи с запросом (без ранжирования)"""
+        if self.dialect is None:
+            return Task.title.ilike(f"%{self.query}%") | Task.description.ilike(
+                f"%{self.query}%"
+            )
+        if not self.terms:
+            return false()
+        if self.dialect == "postgresql":
+            return _search_vector.op("@@")(self._ts_query())
+        return Task.task_id.in_(select(_fts.c.rowid).where(self._fts_match()))
+
+    def ranked(self, query: Query[Task]) -> Query[Task]:
+        """
+        Отфильтровать запрос задач по совпадению и отсортировать
+        по релевантности; при равной релевантности - от новых к старым.
+        """
+        order = (Task.created_at.desc(), Task.task_id.desc())
+        if self.dialect is None or not self.terms:
+            return query.filter(self.criteria()).order_by(*order)
+        if self.dialect == "postgresql":
+            ts_query = self._ts_query()
+            return (
+                query.filter(_search_vector.op("@@")(ts_query))
+                .order_by(func.ts_rank_cd(_search_vector, ts_query).desc())
+                .order_by(*order)
+            )
+        # rank FTS5 - bm25 со знаком минус: меньше значит релевантнее
+        return (
+            query.join(_fts, _fts.c.rowid == Task.task_id)
+            .filter(self._fts_match())
+            .order_by(_fts.c.rank)
+            .order_by(*order)
+        )
+
+    def snippets(self, db: Session, task_ids: list[int]) -> dict[int, str]:
+        """
+        Фрагменты названия или описания с подсвеченными совпадениями.
+        Текст задач экранируется для HTML, разметка - только теги подсветки.
+        """
+        if not task_ids or self.dialect is None or not self.terms:
+            return {}
+        if self.dialect == "postgresql":
+            document = (
+                func.coalesce(Task.title, "")
+                + " "
+                + func.coalesce(Task.description, "")
+            )
+            snippet = func.ts_headline(
+                literal_column(f"'{SEARCH_CONFIG}'::regconfig"),
+                document,
+                self._ts_query(),
+                f"StartSel={_MATCH_START}, StopSel={_MATCH_END}, "
+                f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+            )
+            statement = select(Task.task_id, snippet).where(Task.task_id.in_(task_ids))
+        else:
+            snippet = func.snippet(
+                _fts_column, -1, _MATCH_START, _MATCH_END, "…", SNIPPET_WORDS
+            )
+            statement = select(_fts.c.rowid, snippet).where(
+                self._fts_match(), _fts.c.rowid.in_(task_ids)
+            )
+        return {
+            task_id: _highlight(snippet)
+            for task_id, snippet in db.execute(statement).tuples()
+        }
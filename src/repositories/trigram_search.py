@@ -0,0 +1,48 @@
+"""
+Поиск подстроки с ранжированием по триграммному сходству.
+В PostgreSQL условия используют GIN-индексы pg_trgm из src.models.search,
+в SQLite сходство считает функция similarity() на Python.
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, func, or_
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+# Порог сходства для нечеткого поиска, как pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+class TrigramSearch:
+    """Условия поиска подстроки и сходства по нескольким колонкам"""
+
+    def __init__(self, db: Session, query: str, fuzzy: bool = False):
+        self.query = query
+        self.fuzzy = fuzzy
+        self.postgresql = db.get_bind().dialect.name == "postgresql"
+
+    def criteria(self, *columns: InstrumentedAttribute[Any]) -> ColumnElement[bool]:
+        """
+        Совпадение подстроки хотя бы в одной колонке; в нечетком режиме
+        также строки, похожие на запрос (например, с опечаткой).
+        """
+        conditions = [column.ilike(f"%{self.query}%") for column in columns]
+        if self.fuzzy:
+            if self.postgresql:
+                # Оператор % (а не similarity() >= порог) использует индекс
+                conditions += [column.op("%")(self.query) for column in columns]
+            else:
+                conditions += [
+                    func.similarity(column, self.query) >= SIMILARITY_THRESHOLD
+                    for column in columns
+                ]
+        return or_(*conditions)
+
+    def rank(self, *columns: InstrumentedAttribute[Any]) -> ColumnElement[float]:
+        """Сходство с запросом: максимум по колонкам, больше - релевантнее"""
+        similarities = [func.similarity(column, self.query) for column in columns]
+        if len(similarities) == 1:
+            return similarities[0]
+        # В SQLite max() с несколькими аргументами - скалярная функция
+        greatest = func.greatest if self.postgresql else func.max
+        return greatest(*similarities)
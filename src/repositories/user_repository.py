@@ -3,13 +3,21 @@
 Содержит все операции CRUD для модели User.
 """
 
-from sqlalchemy import func
+from sqlalchemy import delete, or_, select
 from sqlalchemy.orm import Session
 
+from src.models.category import Category
+from src.models.task import Task
 from src.models.user import User
+from src.monitoring.tracing import traced
+from src.repositories.pagination import fetch_page_with_total
+from src.repositories.trigram_search import TrigramSearch
+from src.repositories.writes import column_values, update_returning
+from src.utils.pagination import TotalMode
 from src.utils.password import get_password_hash
 
 
+@traced("repository")
 class UserRepository:
     """Репозиторий для работы с пользователями"""
 
@@ -28,60 +36,60 @@ class UserRepository:
         """Получить пользователя по username"""
         return self.db.query(User).filter(User.username == username).first()
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> tuple[list[User], int]:
+    def get_all(
+        self, skip: int = 0, limit: int = 100, total_mode: TotalMode = TotalMode.exact
+    ) -> tuple[list[User], int | None]:
         """Получить список всех пользователей с пагинацией"""
-        # Получаем общее количество пользователей
-        total = self.db.query(func.count(User.user_id)).scalar()
-
-        # Получаем пользователей с пагинацией
-        users = self.db.query(User).offset(skip).limit(limit).all()
-
-        return users, total
+        # Получаем пользователей с пагинацией и общее количество одним запросом
+        return fetch_page_with_total(self.db.query(User), skip, limit, total_mode)
 
     def search_users(
-        self, query: str, skip: int = 0, limit: int = 100
-    ) -> tuple[list[User], int]:
-        """Поиск пользователей по email или username"""
-        search_filter = User.email.ilike(f"%{query}%") | User.username.ilike(
-            f"%{query}%"
-        )
-
-        # Получаем общее количество найденных пользователей
-        total = self.db.query(func.count(User.user_id)).filter(search_filter).scalar()
-
-        # Получаем пользователей с пагинацией
-        users = (
-            self.db.query(User).filter(search_filter).offset(skip).limit(limit).all()
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 100,
+        total_mode: TotalMode = TotalMode.exact,
+        fuzzy: bool = False,
+    ) -> tuple[list[User], int | None]:
+        """
+        Поиск пользователей по email или username.
+        Результаты упорядочены по сходству с запросом.
+        """
+        search = TrigramSearch(self.db, query, fuzzy)
+        search_query = (
+            self.db.query(User)
+            .filter(search.criteria(User.email, User.username))
+            .order_by(search.rank(User.email, User.username).desc(), User.user_id)
         )
 
-        return users, total
+        # Получаем пользователей с пагинацией и общее количество одним запросом
+        return fetch_page_with_total(search_query, skip, limit, total_mode)
 
-    def create_user(self, email: str, username: str, password: str) -> User:
-        """Создать нового пользователя"""
-        hashed_password = get_password_hash(password)
+    def create_user(
+        self,
+        email: str,
+        username: str,
+        password: str | None = None,
+        hashed_password: str | None = None,
+    ) -> User:
+        """Создать нового пользователя (по паролю или готовому хешу)"""
+        if hashed_password is None:
+            hashed_password = get_password_hash(str(password))
         new_user = User(email=email, username=username, hashed_password=hashed_password)
+        # INSERT ... RETURNING возвращает ключ и серверные значения
         self.db.add(new_user)
-        self.db.commit()
-        self.db.refresh(new_user)
+        self.db.flush()
         return new_user
 
     def update_user(self, user_id: int, **kwargs) -> User | None:
         """Обновить данные пользователя"""
-        user = self.get_by_id(user_id)
-        if not user:
-            return None
-
-        for key, value in kwargs.items():
-            if value is not None and hasattr(user, key):
-                if key == "password":
-                    # Хешируем пароль при обновлении
-                    user.hashed_password = get_password_hash(value)
-                else:
-                    setattr(user, key, value)
-
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        values = {key: value for key, value in kwargs.items() if value is not None}
+        if "password" in values:
+            # Хешируем пароль при обновлении
+            values["hashed_password"] = get_password_hash(values.pop("password"))
+        return update_returning(
+            self.db, User, User.user_id == user_id, column_values(User, values)
+        )
 
     def update_user_partial(
         self,
@@ -89,32 +97,60 @@ class UserRepository:
         email: str | None = None,
         username: str | None = None,
         password: str | None = None,
+        hashed_password: str | None = None,
     ) -> User | None:
         """Частичное обновление данных пользователя"""
-        user = self.get_by_id(user_id)
-        if not user:
-            return None
-
-        if email is not None:
-            user.email = email
-        if username is not None:
-            user.username = username
-        if password is not None:
-            user.hashed_password = get_password_hash(password)
-
-        self.db.commit()
-        self.db.refresh(user)
-        return user
+        if hashed_password is None and password is not None:
+            hashed_password = get_password_hash(password)
+        values = {
+            "email": email,
+            "username": username,
+            "hashed_password": hashed_password,
+        }
+        return update_returning(
+            self.db,
+            User,
+            User.user_id == user_id,
+            {key: value for key, value in values.items() if value is not None},
+        )
 
     def delete_user(self, user_id: int) -> bool:
-        """Удалить пользователя"""
-        user = self.get_by_id(user_id)
-        if not user:
-            return False
-
-        self.db.delete(user)
-        self.db.commit()
-        return True
+        """
+        Удалить пользователя вместе с его задачами и категориями.
+        Три DELETE вместо загрузки и удаления каждой связанной строки.
+        """
+        self.db.execute(delete(Task).where(Task.user_id == user_id))
+        self.db.execute(delete(Category).where(Category.user_id == user_id))
+        deleted = self.db.scalar(
+            delete(User).where(User.user_id == user_id).returning(User.user_id)
+        )
+        return deleted is not None
+
+    def find_taken(
+        self,
+        email: str | None,
+        username: str | None,
+        exclude_user_id: int | None = None,
+    ) -> tuple[bool, bool]:
+        """
+        Заняты ли email и username другими пользователями, одним запросом.
+        Оба поля уникальны, поэтому совпасть могут не больше двух строк.
+        """
+        conditions = []
+        if email:
+            conditions.append(User.email == email)
+        if username:
+            conditions.append(User.username == username)
+        if not conditions:
+            return False, False
+        statement = select(User.email, User.username).where(or_(*conditions))
+        if exclude_user_id is not None:
+            statement = statement.where(User.user_id != exclude_user_id)
+        rows = self.db.execute(statement.limit(2)).all()
+        return (
+            bool(email) and any(row.email == email for row in rows),
+            bool(username) and any(row.username == username for row in rows),
+        )
 
     def exists_by_email(self, email: str) -> bool:
         """Проверить существование пользователя по email"""
@@ -0,0 +1,39 @@
+"""
+Общие операции записи для репозиториев.
+Изменение строки выполняется одним UPDATE ... RETURNING без чтения до и после.
+Коммит выполняет сервис (src.database.transaction), репозитории его не делают.
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, update
+from sqlalchemy.orm import Session
+
+from src.models.base import BaseModel
+
+
+def column_values(model: type[BaseModel], values: dict[str, Any]) -> dict[str, Any]:
+    """Оставить только значения колонок модели"""
+    columns = model.__table__.columns
+    return {key: value for key, value in values.items() if key in columns}
+
+
+def update_returning[M: BaseModel](
+    db: Session,
+    model: type[M],
+    criteria: ColumnElement[bool],
+    values: dict[str, Any],
+) -> M | None:
+    """
+    Обновить строку, подходящую под criteria, и вернуть ее.
+    Обновленная строка (включая updated_at) приходит в том же запросе
+    через RETURNING; None, если строка не найдена.
+    """
+    statement = (
+        update(model)
+        .where(criteria)
+        .values(values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    return db.scalars(statement).one_or_none()
@@ -2,6 +2,6 @@
 Инициализация пакета routers.
 """
 
-from . import auth, categories, tasks, token, users
+from . import auth, categories, monitoring, tasks, token, users
 
-__all__ = ["auth", "categories", "tasks", "token", "users"]
+__all__ = ["auth", "categories", "monitoring", "tasks", "token", "users"]
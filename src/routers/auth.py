@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
 
-from src.database import get_db
+from src.database import DBSession, get_session
 from src.schemas.errors import AUTH_ERRORS
 from src.schemas.user import UserCreate, UserResponse
-from src.services.auth_service import UserService
+from src.services.async_services import AsyncUserService
 
 router = APIRouter()
 
@@ -18,7 +17,7 @@ router = APIRouter()
     response_description="Данные созданного пользователя",
     responses=AUTH_ERRORS,
 )
-async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: UserCreate, db: DBSession = Depends(get_session)):
     """
     ## Регистрация нового пользователя
 
@@ -43,8 +42,8 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     - **400**: Пользователь с таким email или username уже существует
     - **422**: Ошибка валидации данных
     """
-    user_service = UserService(db)
-    new_user = user_service.register_user(
+    user_service = AsyncUserService(db)
+    new_user = await user_service.register_user(
         email=user_data.email, username=user_data.username, password=user_data.password
     )
     return new_user
@@ -4,10 +4,9 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
 
 from src.auth.jwt import get_current_user
-from src.database import get_db
+from src.database import DBSession, get_session
 from src.schemas.category import (
     CategoryCreate,
     CategoryList,
@@ -15,7 +14,8 @@ from src.schemas.category import (
     CategoryUpdate,
 )
 from src.schemas.user import UserResponse
-from src.services.category_service import CategoryService
+from src.services.async_services import AsyncCategoryService
+from src.utils.pagination import TotalMode
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
@@ -27,35 +27,41 @@ async def get_categories(
         100, ge=1, le=1000, description="Максимальное количество записей"
     ),
     search: str | None = Query(None, description="Поиск по названию категории"),
+    include_total: TotalMode = Query(
+        TotalMode.exact,
+        description="Подсчет total: exact, estimate или none (только has_more)",
+    ),
+    fuzzy: bool = Query(
+        False,
+        description="Нечеткий поиск: также похожие значения (например, с опечаткой)",
+    ),
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Получить список категорий пользователя"""
-    service = CategoryService(db)
+    service = AsyncCategoryService(db)
 
     if search:
-        categories, total = service.search_categories(
-            search, current_user.user_id, skip, limit
+        result = await service.search_categories(
+            search, current_user.user_id, skip, limit, include_total, fuzzy
         )
     else:
-        categories, total = service.get_categories_by_user(
-            current_user.user_id, skip, limit
+        result = await service.get_categories_by_user(
+            current_user.user_id, skip, limit, include_total
         )
 
-    page = (skip // limit) + 1
-
-    return CategoryList(categories=categories, total=total, page=page, per_page=limit)
+    return CategoryList(**result)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(
     category_id: int,
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Получить категорию по ID"""
-    service = CategoryService(db)
-    category = service.get_category_by_id(category_id, current_user.user_id)
+    service = AsyncCategoryService(db)
+    category = await service.get_category_by_id(category_id, current_user.user_id)
 
     if not category:
         raise HTTPException(
@@ -69,11 +75,11 @@ async def get_category(
 async def create_category(
     category_data: CategoryCreate,
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Создать новую категорию"""
-    service = CategoryService(db)
-    category = service.create_category(category_data, current_user.user_id)
+    service = AsyncCategoryService(db)
+    category = await service.create_category(category_data, current_user.user_id)
 
     if not category:
         raise HTTPException(
@@ -89,15 +95,17 @@ async def update_category(
     category_id: int,
     category_data: CategoryUpdate,
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Обновить категорию"""
-    service = CategoryService(db)
-    category = service.update_category(category_id, category_data, current_user.user_id)
+    service = AsyncCategoryService(db)
+    category = await service.update_category(
+        category_id, category_data, current_user.user_id
+    )
 
     if not category:
         # Проверяем, существует ли категория
-        if not service.category_exists(category_id, current_user.user_id):
+        if not await service.category_exists(category_id, current_user.user_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Категория не найдена"
             )
@@ -115,7 +123,7 @@ async def partial_update_category(
     category_id: int,
     category_data: CategoryUpdate,
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Частично обновить категорию"""
     return await update_category(category_id, category_data, current_user, db)
@@ -125,11 +133,11 @@ async def partial_update_category(
 async def delete_category(
     category_id: int,
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Удалить категорию"""
-    service = CategoryService(db)
-    success = service.delete_category(category_id, current_user.user_id)
+    service = AsyncCategoryService(db)
+    success = await service.delete_category(category_id, current_user.user_id)
 
     if not success:
         raise HTTPException(
@@ -140,10 +148,10 @@ async def delete_category(
 @router.get("/stats/count")
 async def get_categories_count(
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Получить количество категорий пользователя"""
-    service = CategoryService(db)
-    count = service.get_category_count_by_user(current_user.user_id)
+    service = AsyncCategoryService(db)
+    count = await service.get_category_count_by_user(current_user.user_id)
 
     return {"count": count}
@@ -0,0 +1,51 @@
+"""
+Эндпоинты мониторинга: состояние пула соединений с БД и метрики Prometheus.
+"""
+
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.monitoring.metrics import CONTENT_TYPE, render_metrics
+from src.monitoring.pool import pool_snapshot
+
+router = APIRouter()
+
+
+@router.get(
+    "/health/pool",
+    summary="Connection Pool Status",
+    description="Состояние пулов соединений с БД: занятые соединения, "
+    "переполнение, таймауты и гистограмма ожидания соединения",
+    response_description="Метрики пулов соединений по именам движков",
+)
+async def connection_pool_status() -> dict[str, Any]:
+    """
+    ## Состояние пула соединений
+
+    Для каждого движка (primary, primary_async):
+    - **checked_out** / **overflow**: занятые соединения и соединения сверх pool_size
+    - **timeouts**: запросы, не дождавшиеся соединения за DB_POOL_TIMEOUT
+    - **wait_seconds**: гистограмма времени ожидания соединения
+    """
+    return pool_snapshot()
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    description="Метрики HTTP-запросов, БД и bcrypt в текстовом формате Prometheus",
+    response_class=PlainTextResponse,
+)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+    ## Метрики Prometheus
+
+    - **http_request_duration_seconds**: задержка по шаблонам маршрутов
+    - **http_requests_total**: запросы по кодам ответа
+    - **http_request_db_duration_seconds**: время запросов к БД за HTTP-запрос
+    - **password_hash_duration_seconds**: время bcrypt (verify - вход через /token)
+    - **db_pool_***: состояние пулов соединений
+    """
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
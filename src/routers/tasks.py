@@ -3,23 +3,60 @@ API маршруты для работы с задачами.
 Обрабатывает HTTP запросы для CRUD операций с задачами.
 """
 
-from fastapi import APIRouter, Depends, Query, status
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from starlette.datastructures import UploadFile
 
 from src.auth.jwt import get_current_user
-from src.database import get_db
+from src.database import DBSession, get_session
 from src.models.task import PriorityEnum, StatusEnum
-from src.schemas.task import TaskCreate, TaskFilter, TaskList, TaskResponse, TaskUpdate
+from src.schemas.task import (
+    SearchOrder,
+    TaskCreate,
+    TaskFileFormat,
+    TaskFilter,
+    TaskImportResult,
+    TaskList,
+    TaskResponse,
+    TaskSearchList,
+    TaskUpdate,
+)
 from src.schemas.user import UserInDB
-from src.services.task_service import TaskService
+from src.services import task_export, task_import
+from src.services.async_services import AsyncTaskService
+from src.utils.pagination import TotalMode
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+CURSOR_DESCRIPTION = (
+    "Курсор следующей страницы из поля next_cursor предыдущего ответа. "
+    "Если указан, параметр skip игнорируется"
+)
+INCLUDE_TOTAL_DESCRIPTION = (
+    "Подсчет total: exact - точный COUNT, estimate - оценка планировщика "
+    "для больших выборок, none - без подсчета (только has_more)"
+)
+
+# Максимальное количество задач в одном запросе массового создания
+MAX_BULK_CREATE = 1000
+# Размер части, которой читается загруженный файл
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-def get_task_service(db: Session = Depends(get_db)) -> TaskService:
+
+def get_task_service(db: DBSession = Depends(get_session)) -> AsyncTaskService:
     """Dependency для получения сервиса задач"""
-    return TaskService(db)
+    return AsyncTaskService(db)
 
 
 @router.get(
@@ -36,8 +73,12 @@ async def get_tasks(
     priority: PriorityEnum | None = Query(None, description="Фильтр по приоритету"),
     category_id: int | None = Query(None, description="Фильтр по категории"),
     search: str | None = Query(None, description="Поиск по названию и описанию"),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: TotalMode = Query(
+        TotalMode.exact, description=INCLUDE_TOTAL_DESCRIPTION
+    ),
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Получить список задач пользователя
@@ -54,6 +95,8 @@ async def get_tasks(
     - **priority**: фильтр по приоритету (low, medium, high)
     - **category_id**: ID категории для фильтрации
     - **search**: текст для поиска в названии и описании
+    - **cursor**: курсор следующей страницы (keyset-пагинация, вместо skip)
+    - **include_total**: подсчет total (exact, estimate, none)
     """
     filters = TaskFilter(
         status=status,
@@ -64,11 +107,16 @@ async def get_tasks(
         due_date_to=None,
     )
 
-    tasks, total = task_service.get_user_tasks(
-        user_id=int(current_user.user_id), skip=skip, limit=limit, filters=filters
+    page = await task_service.get_user_tasks(
+        user_id=int(current_user.user_id),
+        skip=skip,
+        limit=limit,
+        filters=filters,
+        cursor=cursor,
+        include_total=include_total,
     )
 
-    return TaskList(tasks=tasks, total=total, page=skip // limit + 1, per_page=limit)
+    return TaskList(**page)
 
 
 @router.get(
@@ -82,8 +130,12 @@ async def get_tasks_by_status(
     status: StatusEnum,
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(10, ge=1, le=100, description="Максимальное количество записей"),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: TotalMode = Query(
+        TotalMode.exact, description=INCLUDE_TOTAL_DESCRIPTION
+    ),
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Получить задачи по статусу
@@ -95,11 +147,16 @@ async def get_tasks_by_status(
     - **in_progress**: задачи в процессе выполнения
     - **done**: завершенные задачи
     """
-    tasks, total = task_service.get_tasks_by_status(
-        user_id=int(current_user.user_id), status=status, skip=skip, limit=limit
+    page = await task_service.get_tasks_by_status(
+        user_id=int(current_user.user_id),
+        status=status,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
     )
 
-    return TaskList(tasks=tasks, total=total, page=skip // limit + 1, per_page=limit)
+    return TaskList(**page)
 
 
 @router.get(
@@ -113,8 +170,12 @@ async def get_tasks_by_category(
     category_id: int,
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(10, ge=1, le=100, description="Максимальное количество записей"),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: TotalMode = Query(
+        TotalMode.exact, description=INCLUDE_TOTAL_DESCRIPTION
+    ),
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Получить задачи по категории
@@ -124,14 +185,16 @@ async def get_tasks_by_category(
     ### Параметры:
     - **category_id**: уникальный идентификатор категории
     """
-    tasks, total = task_service.get_tasks_by_category(
+    page = await task_service.get_tasks_by_category(
         user_id=int(current_user.user_id),
         category_id=category_id,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
     )
 
-    return TaskList(tasks=tasks, total=total, page=skip // limit + 1, per_page=limit)
+    return TaskList(**page)
 
 
 @router.get(
@@ -144,8 +207,11 @@ async def get_tasks_by_category(
 async def get_overdue_tasks(
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(10, ge=1, le=100, description="Максимальное количество записей"),
+    include_total: TotalMode = Query(
+        TotalMode.exact, description=INCLUDE_TOTAL_DESCRIPTION
+    ),
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Получить просроченные задачи
@@ -153,42 +219,69 @@ async def get_overdue_tasks(
     Возвращает все задачи пользователя, у которых срок выполнения (due_date)
     уже прошел, но статус не равен 'done'.
     """
-    tasks, total = task_service.get_overdue_tasks(
-        user_id=int(current_user.user_id), skip=skip, limit=limit
+    page = await task_service.get_overdue_tasks(
+        user_id=int(current_user.user_id),
+        skip=skip,
+        limit=limit,
+        include_total=include_total,
     )
 
-    return TaskList(tasks=tasks, total=total, page=skip // limit + 1, per_page=limit)
+    return TaskList(**page)
 
 
 @router.get(
     "/search",
-    response_model=TaskList,
+    response_model=TaskSearchList,
     summary="Поиск задач",
-    description="Поиск задач по тексту в названии и описании",
+    description="Полнотекстовый поиск задач по названию и описанию",
     response_description="Список найденных задач",
 )
 async def search_tasks(
     q: str = Query(..., description="Поисковый запрос"),
     skip: int = Query(0, ge=0, description="Количество записей для пропуска"),
     limit: int = Query(10, ge=1, le=100, description="Максимальное количество записей"),
+    cursor: str | None = Query(None, description=CURSOR_DESCRIPTION),
+    include_total: TotalMode = Query(
+        TotalMode.exact, description=INCLUDE_TOTAL_DESCRIPTION
+    ),
+    order: SearchOrder = Query(
+        SearchOrder.relevance,
+        description="Порядок: relevance - по релевантности, recent - от новых к старым",
+    ),
+    highlight: bool = Query(
+        False, description="Вернуть фрагменты текста с подсветкой совпадений"
+    ),
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Поиск задач
 
     Выполняет полнотекстовый поиск по названию и описанию задач.
+    Задача находится, если содержит все слова запроса (по началу слова).
 
     ### Параметры:
     - **q**: поисковый запрос (обязательный)
     - **skip**: количество записей для пропуска
     - **limit**: максимальное количество записей
+    - **cursor**: курсор следующей страницы (keyset-пагинация, вместо skip);
+      с курсором результаты идут от новых к старым
+    - **include_total**: подсчет total (exact, estimate, none)
+    - **order**: relevance (по умолчанию) или recent
+    - **highlight**: добавить поле snippet с тегами `<mark>`
     """
-    tasks, total = task_service.search_tasks(
-        user_id=int(current_user.user_id), query=q, skip=skip, limit=limit
+    page = await task_service.search_tasks(
+        user_id=int(current_user.user_id),
+        query=q,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total,
+        order=order,
+        highlight=highlight,
     )
 
-    return TaskList(tasks=tasks, total=total, page=skip // limit + 1, per_page=limit)
+    return TaskSearchList(**page)
 
 
 @router.get(
@@ -200,18 +293,155 @@ async def search_tasks(
 )
 async def get_task_statistics(
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Статистика задач пользователя
 
     Возвращает подробную статистику по задачам:
     - Количество задач по статусам
-    - Количество задач по приоритетам
+    - Количество задач по приоритетам (by_priority)
+    - Количество задач по категориям (by_category)
     - Количество просроченных задач
     - Общее количество задач
+
+    Вся статистика считается одним агрегирующим запросом к базе данных.
+    """
+    return await task_service.get_task_statistics(int(current_user.user_id))
+
+
+@router.get(
+    "/export",
+    summary="Выгрузка задач",
+    description="Выгрузить все задачи пользователя потоком в NDJSON или CSV",
+    response_description="Задачи в выбранном формате",
+    response_class=StreamingResponse,
+)
+async def export_tasks(
+    format: TaskFileFormat = Query(
+        TaskFileFormat.ndjson, description="Формат выгрузки"
+    ),
+    status: StatusEnum | None = Query(None, description="Фильтр по статусу"),
+    priority: PriorityEnum | None = Query(None, description="Фильтр по приоритету"),
+    category_id: int | None = Query(None, description="Фильтр по категории"),
+    due_date_from: datetime | None = Query(
+        None, description="Задачи со сроком от указанной даты"
+    ),
+    due_date_to: datetime | None = Query(
+        None, description="Задачи со сроком до указанной даты"
+    ),
+    search: str | None = Query(None, description="Поиск по названию и описанию"),
+    current_user: UserInDB = Depends(get_current_user),
+    task_service: AsyncTaskService = Depends(get_task_service),
+    db: DBSession = Depends(get_session),
+):
+    """
+    ## Выгрузка задач
+
+    Возвращает все задачи пользователя одним ответом без пагинации и
+    подсчета total, от новых к старым. Строки читаются из базы пачками
+    через серверный курсор и отправляются по мере чтения, поэтому
+    выгрузка не ограничена размером страницы и не держит задачи в памяти.
+
+    ### Параметры:
+    - **format**: ndjson (по одной задаче в JSON на строку) или csv
+      (с заголовком, поля как в `GET /api/tasks/{task_id}`)
+    - **status**, **priority**, **category_id**, **due_date_from**,
+      **due_date_to**, **search**: фильтры, как в списке задач
+    """
+    filters = TaskFilter(
+        status=status,
+        priority=priority,
+        category_id=category_id,
+        due_date_from=due_date_from,
+        due_date_to=due_date_to,
+        search=search,
+    )
+    statement = await task_service.export_query(int(current_user.user_id), filters)
+    return StreamingResponse(
+        task_export.export_tasks(db, statement, format),
+        media_type=task_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+@router.post(
+    "/import",
+    response_model=TaskImportResult,
+    summary="Загрузка задач",
+    description="Загрузить задачи из NDJSON или CSV (тело запроса или файл)",
+    response_description="Количество созданных задач и ошибки по строкам",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}},
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                },
+            },
+            "required": True,
+        }
+    },
+)
+async def import_tasks(
+    request: Request,
+    current_user: UserInDB = Depends(get_current_user),
+    task_service: AsyncTaskService = Depends(get_task_service),
+):
     """
-    return task_service.get_task_statistics(int(current_user.user_id))
+    ## Загрузка задач
+
+    Создает задачи из большого файла, не загружая его в память целиком:
+    тело разбирается по мере получения, задачи вставляются пачками по 500,
+    каждая пачка - в своей транзакции. Строки с ошибками не прерывают
+    загрузку и перечисляются в ответе.
+
+    ### Форматы:
+    - **NDJSON** (`Content-Type: application/x-ndjson`): по задаче в JSON
+      на строку, поля как в `POST /api/tasks/`
+    - **CSV** (`Content-Type: text/csv`): первая строка - заголовок с
+      названиями полей
+    - **multipart/form-data**: файл в поле `file`, формат по типу файла
+      или расширению (.ndjson, .jsonl, .csv)
+
+    Вместо `category_id` можно указать название категории в поле
+    `category`. Лишние поля (например, `task_id` из выгрузки) игнорируются.
+    """
+    chunks: AsyncIterator[bytes]
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Multipart request must contain a 'file' field",
+            )
+        file_format = task_import.detect_format(upload.content_type, upload.filename)
+        chunks = _read_upload(upload)
+    else:
+        file_format = task_import.detect_format(content_type)
+        chunks = request.stream()
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected NDJSON (application/x-ndjson) or CSV (text/csv)",
+        )
+
+    return await task_import.import_tasks(
+        task_service, int(current_user.user_id), chunks, file_format
+    )
+
+
+async def _read_upload(upload: UploadFile) -> AsyncIterator[bytes]:
+    """Содержимое загруженного файла частями"""
+    while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
 
 
 # Массовые операции
@@ -228,6 +458,17 @@ class BulkStatusUpdate(BaseModel):
     new_status: StatusEnum = Field(..., description="Новый статус для всех задач")
 
 
+class BulkTaskCreate(BaseModel):
+    """Схема для массового создания задач"""
+
+    tasks: list[TaskCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BULK_CREATE,
+        description="Список создаваемых задач",
+    )
+
+
 class BulkTaskIds(BaseModel):
     """Схема для массовых операций с задачами"""
 
@@ -236,6 +477,34 @@ class BulkTaskIds(BaseModel):
     )
 
 
+@router.post(
+    "/bulk",
+    response_model=list[TaskResponse],
+    status_code=status.HTTP_201_CREATED,
+    summary="Массовое создание задач",
+    description="Создать несколько задач одним запросом",
+    response_description="Список созданных задач",
+)
+async def bulk_create_tasks(
+    bulk_data: BulkTaskCreate,
+    current_user: UserInDB = Depends(get_current_user),
+    task_service: AsyncTaskService = Depends(get_task_service),
+):
+    """
+    ## Массовое создание задач
+
+    Создает до 1000 задач в одной транзакции: все указанные категории
+    проверяются одним запросом, задачи вставляются одним многострочным
+    INSERT. Если хотя бы одна задача некорректна, не создается ни одна.
+
+    ### Тело запроса:
+    - **tasks**: список задач в формате `POST /api/tasks/`
+    """
+    return await task_service.bulk_create_tasks(
+        bulk_data.tasks, int(current_user.user_id)
+    )
+
+
 @router.patch(
     "/bulk/status",
     response_model=list[TaskResponse],
@@ -246,7 +515,7 @@ class BulkTaskIds(BaseModel):
 async def bulk_update_status(
     bulk_data: BulkStatusUpdate,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Массовое обновление статуса задач
@@ -258,7 +527,7 @@ async def bulk_update_status(
     - **task_ids**: список ID задач для обновления
     - **new_status**: новый статус для всех задач
     """
-    tasks = task_service.bulk_update_status(
+    tasks = await task_service.bulk_update_status(
         bulk_data.task_ids, bulk_data.new_status, int(current_user.user_id)
     )
     return tasks
@@ -274,7 +543,7 @@ async def bulk_update_status(
 async def bulk_delete_tasks(
     bulk_data: BulkTaskIds,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Массовое удаление задач
@@ -285,7 +554,7 @@ async def bulk_delete_tasks(
     ### Тело запроса:
     - **task_ids**: список ID задач для удаления
     """
-    result = task_service.bulk_delete_tasks(
+    result = await task_service.bulk_delete_tasks(
         bulk_data.task_ids, int(current_user.user_id)
     )
     return result
@@ -301,7 +570,7 @@ async def bulk_delete_tasks(
 async def get_task(
     task_id: int,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Получить задачу по ID
@@ -311,7 +580,7 @@ async def get_task(
     ### Параметры:
     - **task_id**: уникальный идентификатор задачи
     """
-    task = task_service.get_task_by_id(task_id, int(current_user.user_id))
+    task = await task_service.get_task_by_id(task_id, int(current_user.user_id))
     return task
 
 
@@ -326,7 +595,7 @@ async def get_task(
 async def create_task(
     task_data: TaskCreate,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Создать новую задачу
@@ -343,7 +612,7 @@ async def create_task(
     - **due_date**: срок выполнения
     - **category_id**: ID категории
     """
-    task = task_service.create_task(task_data, int(current_user.user_id))
+    task = await task_service.create_task(task_data, int(current_user.user_id))
     return task
 
 
@@ -358,7 +627,7 @@ async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Обновить задачу
@@ -376,7 +645,7 @@ async def update_task(
     - **due_date**: новый срок выполнения
     - **category_id**: новая категория
     """
-    task = task_service.update_task(task_id, task_data, int(current_user.user_id))
+    task = await task_service.update_task(task_id, task_data, int(current_user.user_id))
     return task
 
 
@@ -391,7 +660,7 @@ async def update_task_status(
     task_id: int,
     new_status: StatusEnum,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Обновить статус задачи
@@ -402,7 +671,7 @@ async def update_task_status(
     - **task_id**: ID задачи
     - **new_status**: новый статус (todo, in_progress, done)
     """
-    task = task_service.update_task_status(
+    task = await task_service.update_task_status(
         task_id, new_status, int(current_user.user_id)
     )
     return task
@@ -418,7 +687,7 @@ async def update_task_status(
 async def delete_task(
     task_id: int,
     current_user: UserInDB = Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    task_service: AsyncTaskService = Depends(get_task_service),
 ):
     """
     ## Удалить задачу
@@ -428,4 +697,4 @@ async def delete_task(
     ### Параметры:
     - **task_id**: ID задачи для удаления
     """
-    task_service.delete_task(task_id, int(current_user.user_id))
+    await task_service.delete_task(task_id, int(current_user.user_id))
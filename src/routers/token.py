@@ -2,12 +2,11 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from src.database import get_db
+from src.database import DBSession, get_session, use_primary
 from src.schemas.errors import LOGIN_ERRORS
 from src.schemas.token import Token
-from src.services.auth_service import AuthService
+from src.services.async_services import AsyncAuthService
 
 router = APIRouter()
 
@@ -23,7 +22,7 @@ router = APIRouter()
 )
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ) -> Token:
     """
     ## Аутентификация и получение токена доступа
@@ -50,6 +49,8 @@ async def login_for_access_token(
     - **401**: Неверные учетные данные
     - **422**: Ошибка валидации данных формы
     """
-    auth_service = AuthService(db)
-    token_data = auth_service.login(form_data.username, form_data.password)
+    # Только что зарегистрированного пользователя может еще не быть в реплике
+    use_primary(db)
+    auth_service = AsyncAuthService(db)
+    token_data = await auth_service.login(form_data.username, form_data.password)
     return Token(**token_data)
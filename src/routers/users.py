@@ -1,13 +1,13 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
 
 from src.auth.jwt import get_current_active_user
-from src.database import get_db
+from src.database import DBSession, get_session
 from src.models.user import User
 from src.schemas.user import UserList, UserResponse, UserUpdate
-from src.services.auth_service import UserService
+from src.services.async_services import AsyncUserService
+from src.utils.pagination import TotalMode
 
 router = APIRouter()
 
@@ -24,11 +24,11 @@ async def read_users_me(
 async def update_users_me(
     user_update: UserUpdate,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Обновление информации о текущем пользователе"""
-    user_service = UserService(db)
-    return user_service.update_user(
+    user_service = AsyncUserService(db)
+    return await user_service.update_user(
         user_id=int(current_user.user_id),
         email=user_update.email,
         username=user_update.username,
@@ -39,11 +39,11 @@ async def update_users_me(
 @router.delete("/users/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_users_me(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Удаление аккаунта текущего пользователя"""
-    user_service = UserService(db)
-    if not user_service.delete_user(int(current_user.user_id)):
+    user_service = AsyncUserService(db)
+    if not await user_service.delete_user(int(current_user.user_id)):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete user",
@@ -53,20 +53,36 @@ async def delete_users_me(
 @router.get("/users", response_model=UserList)
 async def get_users(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
     skip: int = Query(0, ge=0, description="Количество пользователей для пропуска"),
     limit: int = Query(
         100, ge=1, le=1000, description="Количество пользователей для возврата"
     ),
     search: str | None = Query(None, description="Поиск по email или username"),
+    include_total: TotalMode = Query(
+        TotalMode.exact,
+        description="Подсчет total: exact, estimate или none (только has_more)",
+    ),
+    fuzzy: bool = Query(
+        False,
+        description="Нечеткий поиск: также похожие значения (например, с опечаткой)",
+    ),
 ):
     """Получение списка пользователей с пагинацией и поиском"""
-    user_service = UserService(db)
+    user_service = AsyncUserService(db)
 
     if search:
-        result = user_service.search_users(query=search, skip=skip, limit=limit)
+        result = await user_service.search_users(
+            query=search,
+            skip=skip,
+            limit=limit,
+            include_total=include_total,
+            fuzzy=fuzzy,
+        )
     else:
-        result = user_service.get_all_users(skip=skip, limit=limit)
+        result = await user_service.get_all_users(
+            skip=skip, limit=limit, include_total=include_total
+        )
 
     return UserList(**result)
 
@@ -75,11 +91,11 @@ async def get_users(
 async def get_user(
     user_id: int,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Получение пользователя по ID"""
-    user_service = UserService(db)
-    user = user_service.get_user_by_id(user_id)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user_by_id(user_id)
 
     if not user:
         raise HTTPException(
@@ -94,15 +110,15 @@ async def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Обновление пользователя по ID (требует административных прав)"""
     # Здесь можно добавить проверку прав администратора
     # if not current_user.is_admin:
     #     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
 
-    user_service = UserService(db)
-    return user_service.update_user(
+    user_service = AsyncUserService(db)
+    return await user_service.update_user(
         user_id=user_id,
         email=user_update.email,
         username=user_update.username,
@@ -114,15 +130,15 @@ async def update_user(
 async def delete_user(
     user_id: int,
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Удаление пользователя по ID (требует административных прав)"""
     # Здесь можно добавить проверку прав администратора
     # if not current_user.is_admin:
     #     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
 
-    user_service = UserService(db)
-    if not user_service.delete_user(user_id):
+    user_service = AsyncUserService(db)
+    if not await user_service.delete_user(user_id):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete user",
@@ -132,7 +148,7 @@ async def delete_user(
 @router.get("/users/me/tasks")
 async def read_own_tasks(
     current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
     """Получение задач текущего пользователя"""
     # Здесь можно добавить логику получения задач пользователя
@@ -9,15 +9,30 @@ from .category import (
     CategoryResponse,
     CategoryUpdate,
 )
-from .task import TaskCreate, TaskFilter, TaskInDB, TaskList, TaskResponse, TaskUpdate
+from .task import (
+    SearchOrder,
+    TaskCreate,
+    TaskFileFormat,
+    TaskFilter,
+    TaskImportError,
+    TaskImportResult,
+    TaskImportRow,
+    TaskInDB,
+    TaskList,
+    TaskResponse,
+    TaskSearchList,
+    TaskSearchResult,
+    TaskUpdate,
+)
 from .token import Token
-from .user import UserCreate, UserInDB, UserResponse, UserUpdate
+from .user import UserCreate, UserInDB, UserPrincipal, UserResponse, UserUpdate
 
 __all__ = [
     "UserCreate",
     "UserUpdate",
     "UserResponse",
     "UserInDB",
+    "UserPrincipal",
     "CategoryCreate",
     "CategoryUpdate",
     "CategoryResponse",
@@ -29,5 +44,12 @@ __all__ = [
     "TaskInDB",
     "TaskList",
     "TaskFilter",
+    "TaskSearchResult",
+    "TaskSearchList",
+    "SearchOrder",
+    "TaskFileFormat",
+    "TaskImportRow",
+    "TaskImportError",
+    "TaskImportResult",
     "Token",
 ]
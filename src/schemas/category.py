@@ -109,10 +109,15 @@ class CategoryList(BaseModel):
     """Схема для списка категорий с пагинацией"""
 
     categories: list[CategoryResponse] = Field(..., description="Список категорий")
-    total: int = Field(
-        ..., description="Общее количество категорий", examples=[5, 10, 0]
+    total: int | None = Field(
+        ...,
+        description="Общее количество категорий (null при include_total=none)",
+        examples=[5, 10, 0],
     )
     page: int = Field(..., description="Текущая страница", examples=[1, 2, 3])
     per_page: int = Field(
         ..., description="Количество категорий на странице", examples=[10, 20, 50]
     )
+    has_more: bool = Field(
+        False, description="Есть ли записи после текущей страницы", examples=[True]
+    )
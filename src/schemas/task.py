@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import StrEnum
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -182,11 +183,23 @@ class TaskList(BaseModel):
     """Схема для списка задач с пагинацией"""
 
     tasks: list[TaskResponse] = Field(..., description="Список задач")
-    total: int = Field(..., description="Общее количество задач", examples=[25, 100, 0])
+    total: int | None = Field(
+        ...,
+        description="Общее количество задач (null при include_total=none)",
+        examples=[25, 100, 0],
+    )
     page: int = Field(..., description="Текущая страница", examples=[1, 2, 3])
     per_page: int = Field(
         ..., description="Количество задач на странице", examples=[10, 20, 50]
     )
+    next_cursor: str | None = Field(
+        None,
+        description="Курсор следующей страницы (null, если страниц больше нет)",
+        examples=["WyIyMDI1LTA2LTI1VDEwOjAwOjAwIiw0Ml0"],
+    )
+    has_more: bool = Field(
+        False, description="Есть ли записи после текущей страницы", examples=[True]
+    )
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -210,12 +223,80 @@ class TaskList(BaseModel):
                     "total": 25,
                     "page": 1,
                     "per_page": 10,
+                    "next_cursor": "WyIyMDI1LTA2LTI1VDEwOjAwOjAwIiwxXQ",
+                    "has_more": True,
                 }
             ]
         },
     )
 
 
+class TaskSearchResult(TaskResponse):
+    """Схема найденной задачи с фрагментом текста"""
+
+    snippet: str | None = Field(
+        None,
+        description=(
+            "Фрагмент названия или описания, совпадения выделены тегами <mark> "
+            "(только при highlight=true)"
+        ),
+        examples=["<mark>Изучить</mark> документацию и создать приложение"],
+    )
+
+
+class TaskSearchList(TaskList):
+    """Схема результатов поиска задач с пагинацией"""
+
+    tasks: list[TaskSearchResult] = Field(  # type: ignore[assignment]
+        ..., description="Найденные задачи"
+    )
+
+
+class SearchOrder(StrEnum):
+    """Порядок результатов поиска задач"""
+
+    relevance = "relevance"  # по релевантности, пагинация через skip
+    recent = "recent"  # от новых к старым, доступна пагинация курсором
+
+
+class TaskFileFormat(StrEnum):
+    """Формат файла задач для выгрузки и загрузки"""
+
+    ndjson = "ndjson"  # по одному JSON-объекту на строку
+    csv = "csv"
+
+
+class TaskImportRow(TaskCreate):
+    """Строка загружаемого файла задач"""
+
+    category: str | None = Field(
+        None,
+        description="Название категории пользователя (вместо category_id)",
+        examples=["Работа"],
+    )
+
+
+class TaskImportError(BaseModel):
+    """Ошибка в строке загружаемого файла"""
+
+    row: int = Field(..., description="Номер строки файла (с 1)", examples=[3])
+    errors: list[str] = Field(
+        ...,
+        description="Описание ошибок строки",
+        examples=[["title: Field required"], ["Category not found: Работа"]],
+    )
+
+
+class TaskImportResult(BaseModel):
+    """Результат загрузки задач из файла"""
+
+    created: int = Field(..., description="Количество созданных задач")
+    failed: int = Field(..., description="Количество строк с ошибками")
+    errors: list[TaskImportError] = Field(
+        ..., description="Ошибки по строкам (не больше первой 1000)"
+    )
+
+
 class TaskFilter(BaseModel):
     """Схема для фильтрации задач"""
 
@@ -31,6 +31,12 @@ class TokenData(BaseModel):
     email: str | None = Field(
         None, description="Email пользователя из токена", examples=["user@example.com"]
     )
+    user_id: int | None = Field(
+        None, description="ID пользователя из токена", examples=[1]
+    )
+    username: str | None = Field(
+        None, description="Имя пользователя из токена", examples=["johndoe"]
+    )
 
 
 class LoginRequest(BaseModel):
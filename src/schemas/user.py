@@ -132,14 +132,27 @@ class UserInDB(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPrincipal(BaseModel):
+    """Текущий пользователь, восстановленный из claims JWT без запроса к БД"""
+
+    user_id: int = Field(..., description="Уникальный идентификатор пользователя")
+    email: str = Field(..., description="Email пользователя")
+    username: str = Field(..., description="Имя пользователя")
+
+
 class UserList(BaseModel):
     """Схема для списка пользователей с пагинацией"""
 
     users: list[UserResponse] = Field(..., description="Список пользователей")
-    total: int = Field(
-        ..., description="Общее количество пользователей", examples=[25, 100, 0]
+    total: int | None = Field(
+        ...,
+        description="Общее количество пользователей (null при include_total=none)",
+        examples=[25, 100, 0],
     )
     page: int = Field(..., description="Текущая страница", examples=[1, 2, 3])
     per_page: int = Field(
         ..., description="Количество пользователей на странице", examples=[10, 20, 50]
     )
+    has_more: bool = Field(
+        False, description="Есть ли записи после текущей страницы", examples=[True]
+    )
@@ -2,8 +2,23 @@
 Инициализация пакета services.
 """
 
+from .async_services import (
+    AsyncAuthService,
+    AsyncCategoryService,
+    AsyncTaskService,
+    AsyncUserService,
+)
 from .auth_service import AuthService, UserService
 from .category_service import CategoryService
 from .task_service import TaskService
 
-__all__ = ["AuthService", "UserService", "CategoryService", "TaskService"]
+__all__ = [
+    "AuthService",
+    "UserService",
+    "CategoryService",
+    "TaskService",
+    "AsyncAuthService",
+    "AsyncUserService",
+    "AsyncCategoryService",
+    "AsyncTaskService",
+]
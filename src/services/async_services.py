@@ -0,0 +1,81 @@
+"""
+Асинхронные варианты сервисов.
+Каждый вызов выполняет бизнес-логику синхронного сервиса через
+run_in_session, поэтому роутеры не блокируют event loop на запросах к БД.
+Хеширование паролей вынесено из сессии в пул процессов bcrypt.
+"""
+
+from src.database import AsyncSessionProxy
+from src.models.user import User
+from src.services.auth_service import AuthService, UserService
+from src.services.category_service import CategoryService
+from src.services.task_service import TaskService
+from src.utils.password import get_password_hash_async, verify_password_async
+
+
+class AsyncTaskService(AsyncSessionProxy):
+    """Асинхронный сервис задач"""
+
+    wrapped_class = TaskService
+
+
+class AsyncCategoryService(AsyncSessionProxy):
+    """Асинхронный сервис категорий"""
+
+    wrapped_class = CategoryService
+
+
+class AsyncUserService(AsyncSessionProxy):
+    """Асинхронный сервис пользователей"""
+
+    wrapped_class = UserService
+
+    async def register_user(self, email: str, username: str, password: str) -> User:
+        """Регистрация нового пользователя"""
+        # Занятые email и username отклоняются до bcrypt: повторная
+        # регистрация не должна стоить раунда хеширования
+        await self._call("check_user_available", email, username)
+        hashed_password = await get_password_hash_async(password)
+        return await self._call(
+            "register_user", email, username, hashed_password=hashed_password
+        )
+
+    async def update_user(
+        self,
+        user_id: int,
+        email: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+    ) -> User:
+        """Обновить данные пользователя"""
+        hashed_password = None
+        if password is not None:
+            if email or username:
+                await self._call("check_user_available", email, username, user_id)
+            hashed_password = await get_password_hash_async(password)
+        return await self._call(
+            "update_user",
+            user_id,
+            email=email,
+            username=username,
+            hashed_password=hashed_password,
+        )
+
+
+class AsyncAuthService(AsyncSessionProxy):
+    """Асинхронный сервис аутентификации"""
+
+    wrapped_class = AuthService
+
+    async def authenticate_user(self, login: str, password: str) -> User | None:
+        """Аутентификация пользователя по email или username"""
+        user = await self._call("get_user_by_login", login)
+        if not user:
+            return None
+        if not await verify_password_async(password, str(user.hashed_password)):
+            return None
+        return user
+
+    async def login(self, login: str, password: str) -> dict:
+        """Вход в систему по email или username"""
+        return AuthService.token_response(await self.authenticate_user(login, password))
@@ -10,11 +10,15 @@ from sqlalchemy.orm import Session
 
 from src.auth.jwt import create_access_token
 from src.config import settings
+from src.database import transactional
 from src.models.user import User
+from src.monitoring.tracing import traced
 from src.repositories.user_repository import UserRepository
+from src.utils.pagination import TotalMode, build_page
 from src.utils.password import verify_password
 
 
+@traced("service")
 class AuthService:
     """Сервис для аутентификации"""
 
@@ -22,32 +26,42 @@ class AuthService:
         self.db = db
         self.user_repo = UserRepository(db)
 
-    def authenticate_user(self, login: str, password: str) -> User | None:
-        """Аутентификация пользователя по email или username"""
+    def get_user_by_login(self, login: str) -> User | None:
+        """Найти пользователя по email или username"""
         # Сначала пробуем найти по email
         user: User | None = self.user_repo.get_by_email(login)
 
         # Если не найден по email, пробуем по username
         if not user:
             user = self.user_repo.get_by_username(login)
+        return user
 
+    def authenticate_user(self, login: str, password: str) -> User | None:
+        """Аутентификация пользователя по email или username"""
+        user = self.get_user_by_login(login)
         if not user:
             return None
         if not verify_password(password, str(user.hashed_password)):
             return None
         return user
 
-    def create_access_token_for_user(self, user: User) -> str:
+    @staticmethod
+    def create_access_token_for_user(user: User) -> str:
         """Создание токена доступа для пользователя"""
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data={
+                "sub": user.email,
+                "user_id": user.user_id,
+                "username": user.username,
+            },
+            expires_delta=access_token_expires,
         )
         return access_token
 
-    def login(self, login: str, password: str) -> dict:
-        """Вход в систему по email или username"""
-        user = self.authenticate_user(login, password)
+    @classmethod
+    def token_response(cls, user: User | None) -> dict:
+        """Ответ с токеном для аутентифицированного пользователя"""
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -55,10 +69,15 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token = self.create_access_token_for_user(user)
+        access_token = cls.create_access_token_for_user(user)
         return {"access_token": access_token, "token_type": "bearer"}
 
+    def login(self, login: str, password: str) -> dict:
+        """Вход в систему по email или username"""
+        return self.token_response(self.authenticate_user(login, password))
+
 
+@traced("service")
 class UserService:
     """Сервис для работы с пользователями"""
 
@@ -66,45 +85,72 @@ class UserService:
         self.db = db
         self.user_repo = UserRepository(db)
 
-    def get_all_users(self, skip: int = 0, limit: int = 100) -> dict:
+    def get_all_users(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include_total: TotalMode = TotalMode.exact,
+    ) -> dict:
         """Получить список всех пользователей с пагинацией"""
-        users, total = self.user_repo.get_all(skip=skip, limit=limit)
-
-        return {
-            "users": users,
-            "total": total,
-            "page": (skip // limit) + 1 if limit > 0 else 1,
-            "per_page": limit,
-        }
+        users, total = self.user_repo.get_all(
+            skip=skip, limit=limit + 1, total_mode=include_total
+        )
+        return build_page("users", users, total, skip, limit)
 
-    def search_users(self, query: str, skip: int = 0, limit: int = 100) -> dict:
+    def search_users(
+        self,
+        query: str,
+        skip: int = 0,
+        limit: int = 100,
+        include_total: TotalMode = TotalMode.exact,
+        fuzzy: bool = False,
+    ) -> dict:
         """Поиск пользователей"""
-        users, total = self.user_repo.search_users(query=query, skip=skip, limit=limit)
-
-        return {
-            "users": users,
-            "total": total,
-            "page": (skip // limit) + 1 if limit > 0 else 1,
-            "per_page": limit,
-        }
-
-    def register_user(self, email: str, username: str, password: str) -> User:
-        """Регистрация нового пользователя"""
-        # Проверяем существование пользователя с таким email
-        if self.user_repo.exists_by_email(email):
+        users, total = self.user_repo.search_users(
+            query=query,
+            skip=skip,
+            limit=limit + 1,
+            total_mode=include_total,
+            fuzzy=fuzzy,
+        )
+        return build_page("users", users, total, skip, limit)
+
+    def check_user_available(
+        self,
+        email: str | None,
+        username: str | None,
+        user_id: int | None = None,
+    ) -> None:
+        """
+        Проверить, что email и username не заняты (кроме пользователя
+        user_id); иначе 400
+        """
+        email_taken, username_taken = self.user_repo.find_taken(
+            email, username, exclude_user_id=user_id
+        )
+        if email_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
-
-        # Проверяем существование пользователя с таким username
-        if self.user_repo.exists_by_username(username):
+        if username_taken:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
             )
 
+    @transactional
+    def register_user(
+        self,
+        email: str,
+        username: str,
+        password: str | None = None,
+        hashed_password: str | None = None,
+    ) -> User:
+        """Регистрация нового пользователя (по паролю или готовому хешу)"""
+        self.check_user_available(email, username)
+
         # Создаем пользователя
-        return self.user_repo.create_user(email, username, password)
+        return self.user_repo.create_user(email, username, password, hashed_password)
 
     def get_user_by_email(self, email: str) -> User | None:
         """Получить пользователя по email"""
@@ -118,57 +164,40 @@ class UserService:
         """Получить пользователя по username"""
         return self.user_repo.get_by_username(username)
 
+    @transactional
     def update_user(
         self,
         user_id: int,
         email: str | None = None,
         username: str | None = None,
         password: str | None = None,
+        hashed_password: str | None = None,
     ) -> User:
         """Обновить данные пользователя"""
-        # Проверяем существование пользователя
-        user = self.user_repo.get_by_id(user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
-
-        # Проверяем уникальность email (если обновляется)
-        if email and email != user.email:
-            if self.user_repo.exists_by_email_except_user(email, user_id):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered",
-                )
-
-        # Проверяем уникальность username (если обновляется)
-        if username and username != user.username:
-            if self.user_repo.exists_by_username_except_user(username, user_id):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already taken",
-                )
+        # Проверяем уникальность email и username (если обновляются)
+        self.check_user_available(email, username, user_id)
 
         # Обновляем данные
         updated_user = self.user_repo.update_user_partial(
-            user_id=user_id, email=email, username=username, password=password
+            user_id=user_id,
+            email=email,
+            username=username,
+            password=password,
+            hashed_password=hashed_password,
         )
 
         if not updated_user:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update user",
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
         return updated_user
 
+    @transactional
     def delete_user(self, user_id: int) -> bool:
         """Удалить пользователя"""
-        # Проверяем существование пользователя
-        user = self.user_repo.get_by_id(user_id)
-        if not user:
+        if not self.user_repo.delete_user(user_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
-
-        return self.user_repo.delete_user(user_id)
+        return True
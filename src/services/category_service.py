@@ -5,14 +5,19 @@
 
 from sqlalchemy.orm import Session
 
+from src.database import transactional
+from src.monitoring.tracing import traced
 from src.repositories.category_repository import CategoryRepository
 from src.schemas.category import CategoryCreate, CategoryResponse, CategoryUpdate
+from src.utils.pagination import TotalMode, build_page
 
 
+@traced("service")
 class CategoryService:
     """Сервис для работы с категориями"""
 
     def __init__(self, db: Session):
+        self.db = db
         self.repository = CategoryRepository(db)
 
     def get_category_by_id(
@@ -25,27 +30,41 @@ class CategoryService:
         return None
 
     def get_categories_by_user(
-        self, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[CategoryResponse], int]:
-        """Получить список категорий пользователя"""
-        categories, total = self.repository.get_all_by_user(user_id, skip, limit)
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        include_total: TotalMode = TotalMode.exact,
+    ) -> dict:
+        """Получить страницу категорий пользователя"""
+        # Лишняя строка сверх limit показывает, есть ли следующая страница
+        categories, total = self.repository.get_all_by_user(
+            user_id, skip, limit + 1, include_total
+        )
         category_responses = [
             CategoryResponse.model_validate(cat) for cat in categories
         ]
-        return category_responses, total
+        return build_page("categories", category_responses, total, skip, limit)
 
     def search_categories(
-        self, query: str, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[CategoryResponse], int]:
+        self,
+        query: str,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        include_total: TotalMode = TotalMode.exact,
+        fuzzy: bool = False,
+    ) -> dict:
         """Поиск категорий по названию"""
         categories, total = self.repository.search_categories(
-            query, user_id, skip, limit
+            query, user_id, skip, limit + 1, include_total, fuzzy
         )
         category_responses = [
             CategoryResponse.model_validate(cat) for cat in categories
         ]
-        return category_responses, total
+        return build_page("categories", category_responses, total, skip, limit)
 
+    @transactional
     def create_category(
         self, category_data: CategoryCreate, user_id: int
     ) -> CategoryResponse | None:
@@ -64,15 +83,11 @@ class CategoryService:
         category = self.repository.create_category(cleaned_title, user_id)
         return CategoryResponse.model_validate(category)
 
+    @transactional
     def update_category(
         self, category_id: int, category_data: CategoryUpdate, user_id: int
     ) -> CategoryResponse | None:
         """Обновить категорию"""
-        # Проверяем, что категория существует и принадлежит пользователю
-        existing_category = self.repository.get_by_id(category_id, user_id)
-        if not existing_category:
-            return None
-
         # Если обновляется название, проверяем, что оно не занято другой категорией
         if (
             category_data.title is not None
@@ -82,7 +97,8 @@ class CategoryService:
         ):
             return None
 
-        # Обновляем только переданные поля
+        # Обновляем только переданные поля; None, если категория не найдена
+        # или принадлежит другому пользователю
         update_data = category_data.model_dump(exclude_unset=True)
         category = self.repository.update_category(category_id, user_id, **update_data)
 
@@ -90,6 +106,7 @@ class CategoryService:
             return CategoryResponse.model_validate(category)
         return None
 
+    @transactional
     def delete_category(self, category_id: int, user_id: int) -> bool:
         """Удалить категорию"""
         return self.repository.delete_category(category_id, user_id)
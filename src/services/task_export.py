@@ -0,0 +1,60 @@
+"""
+Потоковая выгрузка задач в NDJSON и CSV.
+
+Строки читаются из БД пачками через серверный курсор (stream_in_session)
+и сразу кодируются, поэтому память не зависит от числа задач: ни полного
+списка результатов, ни объектов ORM в identity map.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import Row, Select
+
+from src.database import DBSession, stream_in_session
+from src.schemas.task import TaskFileFormat, TaskResponse
+
+# Строк в одной пачке, читаемой из курсора и отправляемой клиенту
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    TaskFileFormat.ndjson: "application/x-ndjson",
+    TaskFileFormat.csv: "text/csv; charset=utf-8",
+}
+CSV_COLUMNS = list(TaskResponse.model_fields)
+
+
+def _tasks(rows: Iterable[Row]) -> Iterable[TaskResponse]:
+    """Строки выгрузки в представлении API"""
+    return (TaskResponse.model_validate(dict(row._mapping)) for row in rows)
+
+
+def encode_ndjson(rows: Sequence[Row]) -> str:
+    """Пачка строк в NDJSON"""
+    return "".join(task.model_dump_json() + "\n" for task in _tasks(rows))
+
+
+def encode_csv(rows: Sequence[Row]) -> str:
+    """Пачка строк в CSV (без заголовка); пустое значение - NULL"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_COLUMNS)
+    writer.writerows(task.model_dump(mode="json") for task in _tasks(rows))
+    return buffer.getvalue()
+
+
+async def export_tasks(
+    db: DBSession,
+    statement: Select,
+    export_format: TaskFileFormat,
+) -> AsyncIterator[str]:
+    """Тело ответа выгрузки: по одному фрагменту на пачку строк"""
+    if export_format is TaskFileFormat.csv:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(CSV_COLUMNS)
+        yield buffer.getvalue()
+        encode = encode_csv
+    else:
+        encode = encode_ndjson
+    async for rows in stream_in_session(db, statement, EXPORT_BATCH_SIZE):
+        yield encode(rows)
@@ -0,0 +1,257 @@
+"""
+Потоковая загрузка задач из NDJSON и CSV.
+
+Тело запроса разбирается по мере получения: байты декодируются
+инкрементально, из строк собираются записи, каждая запись проверяется
+схемой TaskImportRow. Проверенные задачи вставляются пачками по
+IMPORT_BATCH_SIZE, каждая пачка - отдельная транзакция. Категории
+сопоставляются с ID по словарю, загруженному одним запросом до начала
+загрузки. Строки с ошибками пропускаются и попадают в отчет, остальные
+строки загружаются.
+"""
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pydantic import ValidationError
+
+from src.schemas.task import (
+    TaskCreate,
+    TaskFileFormat,
+    TaskImportError,
+    TaskImportResult,
+    TaskImportRow,
+)
+from src.services.async_services import AsyncTaskService
+
+# Задач в одной транзакции
+IMPORT_BATCH_SIZE = 500
+# Строки длиннее отбрасываются с ошибкой, чтобы не копить их в памяти
+MAX_RECORD_LENGTH = 64 * 1024
+# Сколько ошибок строк возвращается в ответе (failed считает все)
+MAX_REPORTED_ERRORS = 1000
+
+# Типы содержимого и расширения файлов для форматов
+MEDIA_TYPES = {
+    "application/x-ndjson": TaskFileFormat.ndjson,
+    "application/ndjson": TaskFileFormat.ndjson,
+    "application/jsonl": TaskFileFormat.ndjson,
+    "text/csv": TaskFileFormat.csv,
+}
+EXTENSIONS = {
+    ".ndjson": TaskFileFormat.ndjson,
+    ".jsonl": TaskFileFormat.ndjson,
+    ".csv": TaskFileFormat.csv,
+}
+
+
+class RecordError(ValueError):
+    """Строка файла не разбирается как запись"""
+
+
+def detect_format(
+    content_type: str | None, filename: str | None = None
+) -> TaskFileFormat | None:
+    """Формат по типу содержимого, а если он не задан - по расширению файла"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in MEDIA_TYPES:
+        return MEDIA_TYPES[media_type]
+    if filename:
+        for extension, file_format in EXTENSIONS.items():
+            if filename.lower().endswith(extension):
+                return file_format
+    return None
+
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | None]:
+    """
+    Строки тела (без перевода строки) по мере получения байтов.
+    Вместо строки длиннее MAX_RECORD_LENGTH отдается None.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    skipping = False
+    async for chunk in chunks:
+        # Только "\n": str.splitlines делит и по символам внутри значений
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            if skipping or len(line) > MAX_RECORD_LENGTH:
+                skipping = False
+                yield None
+            else:
+                yield line.removesuffix("\r")
+        if len(pending) > MAX_RECORD_LENGTH:
+            pending = ""
+            skipping = True
+    pending += decoder.decode(b"", final=True)
+    if skipping or len(pending) > MAX_RECORD_LENGTH:
+        yield None
+    elif pending:
+        yield pending.removesuffix("\r")
+
+
+async def read_ndjson(
+    lines: AsyncIterator[str | None],
+) -> AsyncIterator[tuple[int, dict[str, Any] | RecordError]]:
+    """Записи NDJSON: (номер строки, объект или ошибка)"""
+    number = 0
+    async for line in lines:
+        number += 1
+        if line is None:
+            yield number, RecordError("Line is too long")
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield number, RecordError(f"Invalid JSON: {error}")
+            continue
+        if not isinstance(record, dict):
+            yield number, RecordError("Expected a JSON object")
+            continue
+        yield number, record
+
+
+async def read_csv(
+    lines: AsyncIterator[str | None],
+) -> AsyncIterator[tuple[int, dict[str, Any] | RecordError]]:
+    """
+    Записи CSV с заголовком: (номер первой строки записи, значения или
+    ошибка). Значение в кавычках может занимать несколько строк: запись
+    завершена, когда число кавычек в ней четное. Пустые значения
+    пропускаются (поле не задано).
+    """
+    header: list[str] | None = None
+    record: list[str] = []
+    start = number = 0
+    async for line in lines:
+        number += 1
+        if line is None:
+            record = []
+            yield number, RecordError("Line is too long")
+            continue
+        if not record:
+            start = number
+        record.append(line)
+        text = "\n".join(record)
+        if text.count('"') % 2:
+            if len(text) > MAX_RECORD_LENGTH:
+                record = []
+                yield start, RecordError("Record is too long")
+            continue
+        record = []
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as error:
+            yield start, RecordError(f"Invalid CSV: {error}")
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, RecordError(
+                f"Expected {len(header)} columns, got {len(values)}"
+            )
+            continue
+        yield start, {
+            name: value for name, value in zip(header, values, strict=True) if value
+        }
+    if record:
+        yield start, RecordError("Unterminated quoted value")
+
+
+def _validation_messages(error: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+class TaskImport:
+    """Загрузка задач одного пользователя"""
+
+    def __init__(self, task_service: AsyncTaskService, user_id: int):
+        self.task_service = task_service
+        self.user_id = user_id
+        self.categories: dict[str, int] = {}
+        self.category_ids: set[int] = set()
+        self.created = 0
+        self.failed = 0
+        self.errors: list[TaskImportError] = []
+        self._batch: list[TaskCreate] = []
+
+    def _fail(self, row: int, errors: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(TaskImportError(row=row, errors=errors))
+
+    def _validate(self, row: int, record: dict[str, Any]) -> TaskCreate | None:
+        """Проверить запись и сопоставить категорию; None при ошибке"""
+        try:
+            task = TaskImportRow.model_validate(record)
+        except ValidationError as error:
+            self._fail(row, _validation_messages(error))
+            return None
+        if not task.title.strip():
+            self._fail(row, ["title: Task title cannot be empty"])
+            return None
+        if task.category is not None:
+            category_id = self.categories.get(task.category.strip())
+            if category_id is None:
+                self._fail(row, [f"Category not found: {task.category}"])
+                return None
+            task.category_id = category_id
+        elif task.category_id is not None and task.category_id not in (
+            self.category_ids
+        ):
+            self._fail(row, [f"Category not found: {task.category_id}"])
+            return None
+        return task
+
+    async def _flush(self) -> None:
+        if self._batch:
+            self.created += await self.task_service.import_tasks(
+                self._batch, self.user_id
+            )
+            self._batch = []
+
+    async def run(
+        self, records: AsyncIterator[tuple[int, dict[str, Any] | RecordError]]
+    ) -> TaskImportResult:
+        """Загрузить записи пачками по IMPORT_BATCH_SIZE"""
+        self.categories = await self.task_service.get_category_lookup(self.user_id)
+        self.category_ids = set(self.categories.values())
+        async for row, record in records:
+            if isinstance(record, RecordError):
+                self._fail(row, [str(record)])
+                continue
+            task = self._validate(row, record)
+            if task is None:
+                continue
+            self._batch.append(task)
+            if len(self._batch) >= IMPORT_BATCH_SIZE:
+                await self._flush()
+        await self._flush()
+        return TaskImportResult(
+            created=self.created, failed=self.failed, errors=self.errors
+        )
+
+
+async def import_tasks(
+    task_service: AsyncTaskService,
+    user_id: int,
+    chunks: AsyncIterator[bytes],
+    file_format: TaskFileFormat,
+) -> TaskImportResult:
+    """Загрузить задачи пользователя из потока байтов NDJSON или CSV"""
+    lines = read_lines(chunks)
+    records = (
+        read_csv(lines) if file_format is TaskFileFormat.csv else read_ndjson(lines)
+    )
+    return await TaskImport(task_service, user_id).run(records)
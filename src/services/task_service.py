@@ -3,24 +3,73 @@
 Сервисный слой между API и репозиторием.
 """
 
+from collections.abc import Sequence
+from datetime import datetime
 from typing import Any
 
 from fastapi import HTTPException, status
+from sqlalchemy import Select
 from sqlalchemy.orm import Session
 
+from src.database import transactional
 from src.models.task import StatusEnum, Task
+from src.monitoring.tracing import traced
 from src.repositories.category_repository import CategoryRepository
 from src.repositories.task_repository import TaskRepository
-from src.schemas.task import TaskCreate, TaskFilter, TaskResponse, TaskUpdate
-
-
+from src.schemas.task import (
+    SearchOrder,
+    TaskCreate,
+    TaskFilter,
+    TaskResponse,
+    TaskSearchResult,
+    TaskUpdate,
+)
+from src.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from src.utils.pagination import TotalMode, build_page
+
+
+@traced("service")
 class TaskService:
     """Сервис для работы с задачами"""
 
     def __init__(self, db: Session):
+        self.db = db
         self.task_repo = TaskRepository(db)
         self.category_repo = CategoryRepository(db)
 
+    @staticmethod
+    def _decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+        """Раскодировать курсор пагинации из запроса"""
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            ) from None
+
+    @staticmethod
+    def _task_page(
+        tasks: Sequence[TaskResponse],
+        total: int | None,
+        skip: int,
+        limit: int,
+        keyset: bool = True,
+    ) -> dict:
+        """
+        Собрать страницу задач; tasks получен с limit + 1 строками.
+        Курсор выдается только для страниц, упорядоченных от новых
+        к старым (keyset).
+        """
+        page = build_page("tasks", tasks, total, skip, limit)
+        page["next_cursor"] = None
+        if page["has_more"] and keyset:
+            last = page["tasks"][-1]
+            page["next_cursor"] = encode_cursor(last.created_at, last.task_id)
+        return page
+
     def get_task_by_id(self, task_id: int, user_id: int) -> Task | None:
         """Получить задачу по ID"""
         task = self.task_repo.get_by_id(task_id, user_id)
@@ -36,39 +85,64 @@ class TaskService:
         skip: int = 0,
         limit: int = 100,
         filters: TaskFilter | None = None,
-    ) -> tuple[list[TaskResponse], int]:
-        """Получить список задач пользователя с фильтрацией"""
+        cursor: str | None = None,
+        include_total: TotalMode = TotalMode.exact,
+    ) -> dict:
+        """Получить страницу задач пользователя с фильтрацией"""
+        position = self._decode_cursor(cursor)
+        # Лишняя строка сверх limit показывает, есть ли следующая страница
         if filters:
             tasks, total = self.task_repo.get_all_by_user(
                 user_id=user_id,
                 skip=skip,
-                limit=limit,
+                limit=limit + 1,
                 status=filters.status,
                 priority=filters.priority,
                 category_id=filters.category_id,
                 due_date_from=filters.due_date_from,
                 due_date_to=filters.due_date_to,
                 search=filters.search,
+                cursor=position,
+                total_mode=include_total,
             )
         else:
-            tasks, total = self.task_repo.get_all_by_user(user_id, skip, limit)
+            tasks, total = self.task_repo.get_all_by_user(
+                user_id, skip, limit + 1, cursor=position, total_mode=include_total
+            )
 
         # Convert Task models to TaskResponse
         task_responses = [TaskResponse.model_validate(task) for task in tasks]
-        return task_responses, total
+        return self._task_page(task_responses, total, skip, limit)
 
     def get_tasks_by_status(
-        self, user_id: int, status: StatusEnum, skip: int = 0, limit: int = 100
-    ) -> tuple[list[TaskResponse], int]:
-        """Получить задачи по статусу"""
-        tasks, total = self.task_repo.get_by_status(user_id, status, skip, limit)
+        self,
+        user_id: int,
+        status: StatusEnum,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        include_total: TotalMode = TotalMode.exact,
+    ) -> dict:
+        """Получить страницу задач по статусу"""
+        position = self._decode_cursor(cursor)
+        tasks, total = self.task_repo.get_by_status(
+            user_id, status, skip, limit + 1, cursor=position, total_mode=include_total
+        )
         task_responses = [TaskResponse.model_validate(task) for task in tasks]
-        return task_responses, total
+        return self._task_page(task_responses, total, skip, limit)
 
     def get_tasks_by_category(
-        self, user_id: int, category_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[TaskResponse], int]:
-        """Получить задачи по категории"""
+        self,
+        user_id: int,
+        category_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        include_total: TotalMode = TotalMode.exact,
+    ) -> dict:
+        """Получить страницу задач по категории"""
+        position = self._decode_cursor(cursor)
+
         # Проверяем, что категория принадлежит пользователю
         category = self.category_repo.get_by_id(category_id, user_id)
         if not category:
@@ -76,32 +150,75 @@ class TaskService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
             )
 
-        tasks, total = self.task_repo.get_by_category(user_id, category_id, skip, limit)
+        tasks, total = self.task_repo.get_by_category(
+            user_id,
+            category_id,
+            skip,
+            limit + 1,
+            cursor=position,
+            total_mode=include_total,
+        )
         task_responses = [TaskResponse.model_validate(task) for task in tasks]
-        return task_responses, total
+        return self._task_page(task_responses, total, skip, limit)
 
     def get_overdue_tasks(
-        self, user_id: int, skip: int = 0, limit: int = 100
-    ) -> tuple[list[TaskResponse], int]:
-        """Получить просроченные задачи"""
-        tasks, total = self.task_repo.get_overdue_tasks(user_id, skip, limit)
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        include_total: TotalMode = TotalMode.exact,
+    ) -> dict:
+        """Получить страницу просроченных задач"""
+        tasks, total = self.task_repo.get_overdue_tasks(
+            user_id, skip, limit + 1, include_total
+        )
         task_responses = [TaskResponse.model_validate(task) for task in tasks]
-        return task_responses, total
+        return self._task_page(task_responses, total, skip, limit)
 
     def search_tasks(
-        self, user_id: int, query: str, skip: int = 0, limit: int = 100
-    ) -> tuple[list[TaskResponse], int]:
-        """Поиск задач"""
+        self,
+        user_id: int,
+        query: str,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        include_total: TotalMode = TotalMode.exact,
+        order: SearchOrder = SearchOrder.relevance,
+        highlight: bool = False,
+    ) -> dict:
+        """
+        Поиск задач.
+        С курсором результаты всегда упорядочены от новых к старым.
+        """
+        position = self._decode_cursor(cursor)
         if not query.strip():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Search query cannot be empty",
             )
 
-        tasks, total = self.task_repo.search_tasks(query, user_id, skip, limit)
-        task_responses = [TaskResponse.model_validate(task) for task in tasks]
-        return task_responses, total
-
+        tasks, total = self.task_repo.search_tasks(
+            query,
+            user_id,
+            skip,
+            limit + 1,
+            cursor=position,
+            total_mode=include_total,
+            ranked=order is SearchOrder.relevance,
+        )
+        results = [TaskSearchResult.model_validate(task) for task in tasks]
+        if highlight:
+            snippets = self.task_repo.get_search_snippets(
+                query, [result.task_id for result in results]
+            )
+            for result in results:
+                result.snippet = snippets.get(result.task_id)
+        # Курсор задает позицию по (created_at, task_id) и не подходит для
+        # порядка по релевантности
+        keyset = cursor is not None or order is SearchOrder.recent
+        return self._task_page(results, total, skip, limit, keyset)
+
+    @transactional
     def create_task(self, task_data: TaskCreate, user_id: int) -> Task:
         """Создать новую задачу"""
         # Проверяем существование категории, если указана
@@ -132,15 +249,73 @@ class TaskService:
             user_id=user_id,
         )
 
-    def update_task(self, task_id: int, task_data: TaskUpdate, user_id: int) -> Task:
-        """Обновить задачу"""
-        # Проверяем существование задачи
-        task = self.task_repo.get_by_id(task_id, user_id)
-        if not task:
+    @transactional
+    def bulk_create_tasks(
+        self, tasks_data: list[TaskCreate], user_id: int
+    ) -> list[Task]:
+        """Массовое создание задач в одной транзакции"""
+        # Проверяем корректность данных
+        empty_titles = [
+            index
+            for index, task_data in enumerate(tasks_data)
+            if not task_data.title.strip()
+        ]
+        if empty_titles:
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Task title cannot be empty (tasks: {empty_titles})",
+            )
+
+        # Проверяем все указанные категории одним запросом
+        category_ids = {
+            task_data.category_id for task_data in tasks_data if task_data.category_id
+        }
+        missing_ids = category_ids - self.category_repo.get_existing_ids(
+            category_ids, user_id
+        )
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Category not found: {sorted(missing_ids)}",
             )
 
+        return self.task_repo.bulk_create(
+            [self._task_values(task_data, user_id) for task_data in tasks_data]
+        )
+
+    @staticmethod
+    def _task_values(task_data: TaskCreate, user_id: int) -> dict[str, Any]:
+        """Значения колонок новой задачи"""
+        return {
+            "title": task_data.title.strip(),
+            "description": (
+                task_data.description.strip() if task_data.description else None
+            ),
+            "status": task_data.status,
+            "priority": task_data.priority,
+            "due_date": task_data.due_date,
+            "category_id": task_data.category_id,
+            "user_id": user_id,
+        }
+
+    def get_category_lookup(self, user_id: int) -> dict[str, int]:
+        """Категории пользователя для загрузки задач: название -> ID"""
+        return self.category_repo.get_title_map(user_id)
+
+    @transactional
+    def import_tasks(self, tasks_data: list[TaskCreate], user_id: int) -> int:
+        """
+        Вставить пачку проверенных задач загрузки в одной транзакции.
+        Категории уже сопоставлены с ID пользователя по get_category_lookup.
+        """
+        return self.task_repo.insert_many(
+            [self._task_values(task_data, user_id) for task_data in tasks_data]
+        )
+
+    @transactional
+    def update_task(self, task_id: int, task_data: TaskUpdate, user_id: int) -> Task:
+        """Обновить задачу"""
+        # Существование задачи проверяет сам UPDATE: без строки он вернет None
         # Проверяем существование категории, если указана
         if task_data.category_id is not None:
             if task_data.category_id > 0:  # 0 означает убрать категорию
@@ -189,68 +364,54 @@ class TaskService:
 
         return updated_task
 
+    @transactional
     def update_task_status(
         self, task_id: int, new_status: StatusEnum, user_id: int
     ) -> Task:
         """Обновить статус задачи"""
-        task = self.task_repo.get_by_id(task_id, user_id)
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
-            )
-
         updated_task = self.task_repo.update_status(task_id, user_id, new_status)
         if not updated_task:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to update task status",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
             )
 
         return updated_task
 
+    @transactional
     def delete_task(self, task_id: int, user_id: int) -> bool:
         """Удалить задачу"""
-        task = self.task_repo.get_by_id(task_id, user_id)
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
-            )
-
         success = self.task_repo.delete_task(task_id, user_id)
         if not success:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to delete task",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
             )
 
         return success
 
+    def export_query(self, user_id: int, filters: TaskFilter) -> Select:
+        """Запрос для потоковой выгрузки задач пользователя по фильтрам"""
+        return self.task_repo.export_query(
+            user_id,
+            status=filters.status,
+            priority=filters.priority,
+            category_id=filters.category_id,
+            due_date_from=filters.due_date_from,
+            due_date_to=filters.due_date_to,
+            search=filters.search,
+        )
+
     def get_task_statistics(self, user_id: int) -> dict:
         """Получить статистику задач пользователя"""
         return self.task_repo.get_task_statistics(user_id)
 
+    @transactional
     def bulk_update_status(
         self, task_ids: list[int], new_status: StatusEnum, user_id: int
     ) -> list[Task]:
-        """Массовое обновление статуса задач"""
-        updated_tasks = []
-        failed_ids = []
-
-        for task_id in task_ids:
-            try:
-                task = self.task_repo.get_by_id(task_id, user_id)
-                if task:
-                    updated_task = self.task_repo.update_status(
-                        task_id, user_id, new_status
-                    )
-                    if updated_task:
-                        updated_tasks.append(updated_task)
-                    else:
-                        failed_ids.append(task_id)
-                else:
-                    failed_ids.append(task_id)
-            except Exception:
-                failed_ids.append(task_id)
+        """Массовое обновление статуса задач (все или ничего)"""
+        updated_tasks, failed_ids = self.task_repo.bulk_update_status(
+            task_ids, user_id, new_status
+        )
 
         if failed_ids:
             raise HTTPException(
@@ -260,27 +421,16 @@ class TaskService:
 
         return updated_tasks
 
+    @transactional
     def bulk_delete_tasks(self, task_ids: list[int], user_id: int) -> dict:
         """Массовое удаление задач"""
-        deleted_count = 0
-        failed_ids = []
-
-        for task_id in task_ids:
-            try:
-                task = self.task_repo.get_by_id(task_id, user_id)
-                if task:
-                    success = self.task_repo.delete_task(task_id, user_id)
-                    if success:
-                        deleted_count += 1
-                    else:
-                        failed_ids.append(task_id)
-                else:
-                    failed_ids.append(task_id)
-            except Exception:
-                failed_ids.append(task_id)
+        deleted_ids = set(self.task_repo.bulk_delete(task_ids, user_id))
+        failed_ids = list(
+            dict.fromkeys(task_id for task_id in task_ids if task_id not in deleted_ids)
+        )
 
         return {
-            "deleted_count": deleted_count,
+            "deleted_count": len(deleted_ids),
             "failed_ids": failed_ids,
             "total_requested": len(task_ids),
         }
@@ -2,6 +2,24 @@
 Инициализация пакета utils.
 """
 
-from .password import get_password_hash, verify_password
+from .cursor import InvalidCursorError, decode_cursor, encode_cursor
+from .pagination import TotalMode, build_page, split_page
+from .password import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+)
 
-__all__ = ["verify_password", "get_password_hash"]
+__all__ = [
+    "verify_password",
+    "get_password_hash",
+    "verify_password_async",
+    "get_password_hash_async",
+    "encode_cursor",
+    "decode_cursor",
+    "InvalidCursorError",
+    "TotalMode",
+    "split_page",
+    "build_page",
+]
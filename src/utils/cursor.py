@@ -0,0 +1,28 @@
+"""
+Утилиты для курсорной (keyset) пагинации
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден или имеет неверный формат"""
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Закодировать позицию (created_at, id) в непрозрачный токен"""
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Раскодировать токен курсора обратно в позицию (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise InvalidCursorError("Invalid pagination cursor") from exc
@@ -0,0 +1,42 @@
+"""
+Утилиты для пагинации списков
+"""
+
+from collections.abc import Sequence
+from enum import StrEnum
+from typing import Any
+
+
+class TotalMode(StrEnum):
+    """Способ подсчета общего количества записей в списке"""
+
+    exact = "exact"  # точный COUNT
+    estimate = "estimate"  # оценка планировщика для больших выборок
+    none = "none"  # без подсчета, только признак has_more
+
+
+def split_page[T](items: Sequence[T], limit: int) -> tuple[list[T], bool]:
+    """
+    Отделить страницу от лишней строки.
+    Список запрашивается с limit + 1 строками: наличие лишней строки
+    означает, что следующая страница существует.
+    """
+    return list(items[:limit]), len(items) > limit
+
+
+def build_page(
+    key: str, items: Sequence[Any], total: int | None, skip: int, limit: int
+) -> dict[str, Any]:
+    """
+    Страница списка с метаданными пагинации.
+    items получен с limit + 1 строками (см. split_page), а записи
+    кладутся в ответ под ключом key.
+    """
+    page_items, has_more = split_page(items, limit)
+    return {
+        key: page_items,
+        "total": total,
+        "page": skip // limit + 1 if limit > 0 else 1,
+        "per_page": limit,
+        "has_more": has_more,
+    }
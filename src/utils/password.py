@@ -2,9 +2,24 @@
 Утилиты для работы с паролями и хешированием
 """
 
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
 from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+from src.config import settings
+from src.monitoring.metrics import PASSWORD_HASH_DURATION
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds
+)
+
+# Пул процессов для bcrypt, создается при первом хешировании
+_executor: ProcessPoolExecutor | None = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -15,3 +30,50 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Хеширование пароля"""
     return str(pwd_context.hash(password))
+
+
+def get_password_executor() -> ProcessPoolExecutor | None:
+    """Получить пул процессов для bcrypt (None при PASSWORD_HASH_WORKERS=0)"""
+    global _executor
+    if _executor is None and settings.password_hash_workers > 0:
+        # spawn: fork многопоточного процесса с event loop небезопасен
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_password_executor() -> None:
+    """Остановить пул процессов для bcrypt"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def _run_hashing[T](operation: str, func: Callable[..., T], *args: str) -> T:
+    """
+    Выполнить bcrypt вне event loop: в пуле процессов или потоков.
+    Время с ожиданием в очереди пула попадает в метрику operation.
+    """
+    executor = get_password_executor()
+    start = time.perf_counter()
+    try:
+        if executor is None:
+            return await run_in_threadpool(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    finally:
+        PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверка пароля без блокировки event loop"""
+    return await _run_hashing(
+        "verify", verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Хеширование пароля без блокировки event loop"""
+    return await _run_hashing("hash", get_password_hash, password)
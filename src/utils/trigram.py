@@ -0,0 +1,9 @@
+"""
+Триграммное сходство строк, совместимое с similarity() из pg_trgm.
+Реализация живет в src.models.search рядом с регистрацией функции SQLite:
+слой моделей не должен импортировать src.utils (и вместе с ним настройки).
+"""
+
+from src.models.search import similarity, trigrams
+
+__all__ = ["similarity", "trigrams"]
@@ -84,11 +84,11 @@ def test_get_categories_by_user(category_service, test_user):
     for category_data in categories_data:
         category_service.create_category(category_data, test_user.user_id)
 
-    categories, total = category_service.get_categories_by_user(test_user.user_id)
+    page = category_service.get_categories_by_user(test_user.user_id)
 
-    assert total == 3
-    assert len(categories) == 3
-    assert all(cat.user_id == test_user.user_id for cat in categories)
+    assert page["total"] == 3
+    assert len(page["categories"]) == 3
+    assert all(cat.user_id == test_user.user_id for cat in page["categories"])
 
 
 def test_update_category_success(category_service, test_user):
@@ -174,11 +174,27 @@ def test_search_categories(category_service, test_user):
         category_service.create_category(category_data, test_user.user_id)
 
     # Поиск по слову "work"
-    categories, total = category_service.search_categories("work", test_user.user_id)
+    page = category_service.search_categories("work", test_user.user_id)
 
-    assert total == 2
-    assert len(categories) == 2
-    assert all("work" in cat.title.lower() for cat in categories)
+    assert page["total"] == 2
+    assert len(page["categories"]) == 2
+    assert all("work" in cat.title.lower() for cat in page["categories"])
+
+
+def test_search_categories_fuzzy(category_service, test_user):
+    """Тест нечеткого поиска категорий с ранжированием по сходству"""
+    for title in ["Shopping list", "Shopping", "Sport"]:
+        category_service.create_category(CategoryCreate(title=title), test_user.user_id)
+
+    page = category_service.search_categories("shopping", test_user.user_id)
+    assert page["total"] == 2
+    assert [cat.title for cat in page["categories"]] == ["Shopping", "Shopping list"]
+
+    # Опечатка находится только в нечетком режиме
+    page = category_service.search_categories("shoping", test_user.user_id)
+    assert page["total"] == 0
+    page = category_service.search_categories("shoping", test_user.user_id, fuzzy=True)
+    assert [cat.title for cat in page["categories"]] == ["Shopping", "Shopping list"]
 
 
 def test_get_category_count_by_user(category_service, test_user):
@@ -8,9 +8,11 @@ from src.repositories.user_repository import UserRepository
 def test_user_for_api(db_session):
     """Создать тестового пользователя для API тестов"""
     user_repo = UserRepository(db_session)
-    return user_repo.create_user(
+    user = user_repo.create_user(
         email="api_test@example.com", username="api_test_user", password="password123"
     )
+    db_session.commit()
+    return user
 
 
 @pytest.fixture
@@ -67,6 +69,7 @@ def test_get_categories_api(client, auth_headers, db_session, test_user_for_api)
     category_repo.create_category("Категория 1", test_user_for_api.user_id)
     category_repo.create_category("Категория 2", test_user_for_api.user_id)
     category_repo.create_category("Категория 3", test_user_for_api.user_id)
+    db_session.commit()
 
     response = client.get("/api/categories/", headers=auth_headers)
 
@@ -87,6 +90,7 @@ def test_get_category_by_id_api(client, auth_headers, db_session, test_user_for_
     category = category_repo.create_category(
         "Тестовая категория", test_user_for_api.user_id
     )
+    db_session.commit()
 
     response = client.get(
         f"/api/categories/{category.category_id}", headers=auth_headers
@@ -114,6 +118,7 @@ def test_update_category_api(client, auth_headers, db_session, test_user_for_api
     category = category_repo.create_category(
         "Старое название", test_user_for_api.user_id
     )
+    db_session.commit()
 
     update_data = {"title": "Новое название"}
 
@@ -146,6 +151,7 @@ def test_patch_category_api(client, auth_headers, db_session, test_user_for_api)
     category = category_repo.create_category(
         "Исходное название", test_user_for_api.user_id
     )
+    db_session.commit()
 
     update_data = {"title": "Обновленное название"}
 
@@ -167,6 +173,7 @@ def test_delete_category_api(client, auth_headers, db_session, test_user_for_api
     category = category_repo.create_category(
         "Удаляемая категория", test_user_for_api.user_id
     )
+    db_session.commit()
 
     response = client.delete(
         f"/api/categories/{category.category_id}", headers=auth_headers
@@ -196,6 +203,7 @@ def test_search_categories_api(client, auth_headers, db_session, test_user_for_a
     category_repo.create_category("Work Projects", test_user_for_api.user_id)
     category_repo.create_category("Home Tasks", test_user_for_api.user_id)
     category_repo.create_category("Work Meetings", test_user_for_api.user_id)
+    db_session.commit()
 
     # Поиск по слову "work"
     response = client.get("/api/categories/?search=work", headers=auth_headers)
@@ -216,6 +224,7 @@ def test_get_categories_with_pagination_api(
     category_repo = CategoryRepository(db_session)
     for i in range(5):
         category_repo.create_category(f"Категория {i + 1}", test_user_for_api.user_id)
+    db_session.commit()
 
     # Запрашиваем первые 2 категории
     response = client.get("/api/categories/?skip=0&limit=2", headers=auth_headers)
@@ -236,6 +245,7 @@ def test_get_categories_count_api(client, auth_headers, db_session, test_user_fo
         category_repo.create_category(
             f"Счетная категория {i + 1}", test_user_for_api.user_id
         )
+    db_session.commit()
 
     response = client.get("/api/categories/stats/count", headers=auth_headers)
 
@@ -109,11 +109,9 @@ class TestMultilingualCategories:
         assert len(created_categories) == len(multilingual_categories)
 
         # Проверяем получение категорий
-        all_categories, total = category_service.get_categories_by_user(
-            multilingual_test_user.user_id
-        )
-        assert len(all_categories) == len(multilingual_categories)
-        assert total == len(multilingual_categories)
+        page = category_service.get_categories_by_user(multilingual_test_user.user_id)
+        assert len(page["categories"]) == len(multilingual_categories)
+        assert page["total"] == len(multilingual_categories)
 
     def test_emoji_categories(self, category_service, multilingual_test_user):
         """Тест категорий с эмодзи"""
@@ -263,9 +261,9 @@ class TestMultilingualCategories:
         ]
 
         for search_term, expected_count in search_tests:
-            found_categories, _ = category_service.search_categories(
+            found_categories = category_service.search_categories(
                 search_term, multilingual_test_user.user_id
-            )
+            )["categories"]
             assert (
                 len(found_categories) == expected_count
             ), f"Поиск '{search_term}': ожидалось {expected_count} результатов, найдено {len(found_categories)}"
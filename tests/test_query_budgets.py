@@ -0,0 +1,141 @@
+"""
+Бюджеты запросов к БД для эндпоинтов.
+
+Каждый маршрут приложения должен быть в QUERY_BUDGETS: новый маршрут без
+бюджета или рост числа запросов (например, N+1) ломают тест.
+"""
+
+import json
+
+import pytest
+from fastapi.routing import APIRoute
+
+from src.app import app
+from src.monitoring.queries import assert_max_queries
+
+TASKS = [{"title": f"Task {i}", "description": "budget"} for i in range(3)]
+
+# (метод, шаблон маршрута) -> (тело запроса, максимум запросов к БД)
+QUERY_BUDGETS: dict[tuple[str, str], tuple[dict | None, int]] = {
+    ("POST", "/token"): (None, 2),
+    ("POST", "/auth/register"): (None, 3),
+    ("GET", "/api/users/me"): (None, 1),
+    ("PUT", "/api/users/me"): ({"username": "renamed"}, 3),
+    ("DELETE", "/api/users/me"): (None, 4),
+    ("GET", "/api/users"): (None, 2),
+    ("GET", "/api/users/{user_id}"): (None, 2),
+    ("PUT", "/api/users/{user_id}"): ({"username": "renamed"}, 3),
+    ("DELETE", "/api/users/{user_id}"): (None, 4),
+    ("GET", "/api/users/me/tasks"): (None, 1),
+    ("GET", "/api/categories/"): (None, 2),
+    ("GET", "/api/categories/{category_id}"): (None, 2),
+    ("POST", "/api/categories/"): ({"title": "New category"}, 3),
+    ("PUT", "/api/categories/{category_id}"): ({"title": "Renamed"}, 3),
+    ("PATCH", "/api/categories/{category_id}"): ({"title": "Renamed"}, 3),
+    ("DELETE", "/api/categories/{category_id}"): (None, 5),
+    ("GET", "/api/categories/stats/count"): (None, 2),
+    ("GET", "/api/tasks/"): (None, 2),
+    ("GET", "/api/tasks/status/{status}"): (None, 2),
+    ("GET", "/api/tasks/category/{category_id}"): (None, 3),
+    ("GET", "/api/tasks/overdue"): (None, 2),
+    ("GET", "/api/tasks/search"): (None, 2),
+    ("GET", "/api/tasks/statistics"): (None, 2),
+    ("GET", "/api/tasks/export"): (None, 2),
+    ("POST", "/api/tasks/import"): (None, 3),
+    ("POST", "/api/tasks/bulk"): ({"tasks": TASKS}, 2),
+    ("PATCH", "/api/tasks/bulk/status"): ({"new_status": "done"}, 2),
+    ("DELETE", "/api/tasks/bulk"): ({}, 2),
+    ("GET", "/api/tasks/{task_id}"): (None, 2),
+    ("POST", "/api/tasks/"): ({"title": "New task"}, 2),
+    ("PUT", "/api/tasks/{task_id}"): ({"title": "Renamed"}, 2),
+    ("PATCH", "/api/tasks/{task_id}/status"): (None, 2),
+    ("DELETE", "/api/tasks/{task_id}"): (None, 2),
+    ("GET", "/health/pool"): (None, 0),
+    ("GET", "/metrics"): (None, 0),
+    ("GET", "/"): (None, 0),
+    ("GET", "/health"): (None, 0),
+}
+
+
+def app_routes() -> set[tuple[str, str]]:
+    """Все маршруты приложения (метод, шаблон)"""
+    return {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+
+
+def test_every_route_has_budget():
+    """Тест: у каждого маршрута есть бюджет запросов"""
+    assert app_routes() == set(QUERY_BUDGETS)
+
+
+@pytest.fixture
+def seeded(client, auth_headers, test_user_data):
+    """Пользователь с категорией и задачами в ней"""
+    category = client.post(
+        "/api/categories/", json={"title": "Budget"}, headers=auth_headers
+    ).json()
+    tasks = client.post(
+        "/api/tasks/bulk",
+        json={
+            "tasks": [
+                {**task, "category_id": category["category_id"]} for task in TASKS
+            ]
+        },
+        headers=auth_headers,
+    ).json()
+    me = client.get("/api/users/me", headers=auth_headers).json()
+    return {
+        "category_id": category["category_id"],
+        "task_id": tasks[0]["task_id"],
+        "task_ids": [task["task_id"] for task in tasks],
+        "user_id": me["user_id"],
+        "status": "todo",
+    }
+
+
+@pytest.mark.parametrize(("method", "template"), sorted(QUERY_BUDGETS))
+def test_route_query_budget(
+    client, auth_headers, test_user_data, seeded, method, template
+):
+    """Тест: маршрут выполняет не больше запросов, чем заложено в бюджет"""
+    body, budget = QUERY_BUDGETS[(method, template)]
+    url = template.format(**seeded)
+    kwargs: dict = {"headers": auth_headers}
+    if template == "/token":
+        kwargs = {
+            "data": {
+                "username": test_user_data["username"],
+                "password": test_user_data["password"],
+            }
+        }
+    elif template == "/auth/register":
+        kwargs = {
+            "json": {
+                "email": "budget@example.com",
+                "username": "budget",
+                "password": "budgetpassword",
+            }
+        }
+    elif template == "/api/tasks/search":
+        kwargs["params"] = {"q": "budget"}
+    elif template == "/api/tasks/import":
+        kwargs["content"] = "\n".join(json.dumps(task) for task in TASKS)
+        kwargs["headers"] = {**auth_headers, "Content-Type": "application/x-ndjson"}
+    elif template == "/api/tasks/{task_id}/status":
+        kwargs["params"] = {"new_status": "done"}
+    elif template.startswith("/api/tasks/bulk") and method != "POST":
+        kwargs["json"] = {**(body or {}), "task_ids": seeded["task_ids"]}
+    elif body is not None:
+        kwargs["json"] = body
+
+    with assert_max_queries(budget):
+        response = client.request(method, url, **kwargs)
+
+    assert response.status_code < 400, response.text
+    if budget:
+        assert int(response.headers["X-DB-Query-Count"]) <= budget
+        assert float(response.headers["X-DB-Time-Ms"]) >= 0
@@ -0,0 +1,151 @@
+"""
+Тесты для чтения из реплик.
+Основная БД и реплики - отдельные файлы SQLite с разным содержимым, поэтому
+по результату запроса видно, куда он ушел.
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.database import SESSION_USER_KEY, RoutingSession, transaction, use_primary
+from src.models.base import Base
+from src.models.category import Category
+from src.models.user import User
+from src.replicas import ReplicaSet
+
+
+def make_database(path, username):
+    """Создать базу с одним пользователем, username показывает, какая это база"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            User.__table__.insert().values(
+                user_id=1,
+                email=f"{username}@example.com",
+                username=username,
+                hashed_password="hash",
+            )
+        )
+    return engine
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Основная БД и две реплики"""
+    engines = [
+        make_database(tmp_path / f"{name}.db", name)
+        for name in ("primary", "replica_a", "replica_b")
+    ]
+    yield engines
+    for engine in engines:
+        engine.dispose()
+
+
+def make_session_factory(primary, replicas, read_your_writes_seconds=5.0):
+    """Фабрика маршрутизирующих сессий"""
+    replica_set = ReplicaSet(
+        replicas,
+        read_your_writes_seconds=read_your_writes_seconds,
+        retry_seconds=60.0,
+    )
+    return sessionmaker(
+        class_=RoutingSession,
+        bind=primary,
+        expire_on_commit=False,
+        replicas=replica_set,
+    )
+
+
+def read_username(db):
+    """Имя пользователя 1: по нему видно, какая база ответила"""
+    return db.scalar(select(User.username).where(User.user_id == 1))
+
+
+def test_reads_round_robin_over_replicas(databases):
+    """Тест: чтения распределяются по репликам по кругу"""
+    primary, replica_a, replica_b = databases
+    factory = make_session_factory(primary, [replica_a, replica_b])
+
+    with factory() as db:
+        assert [read_username(db) for _ in range(4)] == [
+            "replica_a",
+            "replica_b",
+            "replica_a",
+            "replica_b",
+        ]
+
+
+def test_writes_and_transactions_use_primary(databases):
+    """Тест: запись, чтение внутри transaction() и use_primary - в основную БД"""
+    primary, replica_a, _ = databases
+    factory = make_session_factory(primary, [replica_a])
+
+    with factory() as db:
+        with transaction(db):
+            # Проверка перед записью читает из основной БД
+            assert read_username(db) == "primary"
+            db.add(Category(title="Work", user_id=1))
+        # После записи сессия больше не читает из реплики
+        assert read_username(db) == "primary"
+
+    with factory() as db:
+        use_primary(db)
+        assert read_username(db) == "primary"
+
+    with factory() as db:
+        statement = select(User.username).where(User.user_id == 1).with_for_update()
+        assert db.scalar(statement) == "primary"
+
+
+def test_read_your_writes(databases):
+    """Тест: после записи пользователь какое-то время читает из основной БД"""
+    primary, replica_a, _ = databases
+    factory = make_session_factory(primary, [replica_a])
+
+    with factory() as db:
+        db.info[SESSION_USER_KEY] = 1
+        with transaction(db):
+            db.add(Category(title="Work", user_id=1))
+
+    with factory() as db:
+        db.info[SESSION_USER_KEY] = 1
+        assert read_username(db) == "primary"
+    with factory() as db:
+        db.info[SESSION_USER_KEY] = 2
+        assert read_username(db) == "replica_a"
+
+    # Окно read-your-writes истекло
+    expired = make_session_factory(primary, [replica_a], read_your_writes_seconds=0)
+    with expired() as db:
+        db.info[SESSION_USER_KEY] = 1
+        with transaction(db):
+            db.add(Category(title="Home", user_id=1))
+    with expired() as db:
+        db.info[SESSION_USER_KEY] = 1
+        assert read_username(db) == "replica_a"
+
+
+def test_unavailable_replica_is_skipped(databases, tmp_path):
+    """Тест: недоступная реплика исключается, пока не пройдет проверку"""
+    primary, replica_a, _ = databases
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    factory = make_session_factory(primary, [broken, replica_a])
+    replica_set = factory.kw["replicas"]
+
+    with factory() as db, pytest.raises(OperationalError):
+        read_username(db)
+    with factory() as db:
+        assert [read_username(db) for _ in range(3)] == ["replica_a"] * 3
+
+    # После паузы реплика проверяется SELECT 1 и снова исключается
+    replica_set.replicas[0].unavailable_until = 1.0
+    assert replica_set.choose() is replica_a
+    assert replica_set.replicas[0].unavailable_until > 1.0
+
+    # Без доступных реплик чтение идет в основную БД
+    replica_set.mark_unavailable(replica_set.replicas[1])
+    with factory() as db:
+        assert read_username(db) == "primary"
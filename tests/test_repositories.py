@@ -1,5 +1,8 @@
+from src.models.category import Category
+from src.models.task import Task
 from src.models.user import User
 from src.repositories.user_repository import UserRepository
+from src.utils.pagination import TotalMode
 
 
 def test_create_user(db_session):
@@ -71,6 +74,30 @@ def test_get_all_users(db_session):
     assert len(users) == 2
 
 
+def test_get_all_users_page_past_end(db_session):
+    repo = UserRepository(db_session)
+    repo.create_user("page1@example.com", "pageuser1", "pass")
+    repo.create_user("page2@example.com", "pageuser2", "pass")
+
+    users, total = repo.get_all(skip=1, limit=1)
+    assert total == 2
+    assert len(users) == 1
+
+    # За пределами выборки количество считается отдельным запросом
+    users, total = repo.get_all(skip=10, limit=1)
+    assert total == 2
+    assert users == []
+
+
+def test_get_all_users_without_total(db_session):
+    repo = UserRepository(db_session)
+    repo.create_user("nototal1@example.com", "nototaluser1", "pass")
+
+    users, total = repo.get_all(total_mode=TotalMode.none)
+    assert total is None
+    assert len(users) >= 1
+
+
 def test_search_users(db_session):
     repo = UserRepository(db_session)
     db_session.query(User).delete()
@@ -96,3 +123,49 @@ def test_update_user(db_session):
     assert updated_user is not None
     assert updated_user.username == "updated_username"
     assert updated_user.email == email
+
+
+def test_delete_user_with_categories_and_tasks(db_session):
+    repo = UserRepository(db_session)
+    user = repo.create_user("owner@example.com", "owner", "password")
+    other = repo.create_user("other@example.com", "other", "password")
+    for owner in (user, other):
+        category = Category(title="Work", user_id=owner.user_id)
+        db_session.add(category)
+        db_session.flush()
+        db_session.add_all(
+            [
+                Task(title="In category", user_id=owner.user_id, category=category),
+                Task(title="Without category", user_id=owner.user_id),
+            ]
+        )
+    db_session.flush()
+    user_id = user.user_id
+
+    assert repo.delete_user(user_id) is True
+    db_session.expire_all()
+
+    assert db_session.query(User).filter(User.user_id == user_id).count() == 0
+    assert db_session.query(Category).filter(Category.user_id == user_id).count() == 0
+    assert db_session.query(Task).filter(Task.user_id == user_id).count() == 0
+    # Данные другого пользователя не затронуты
+    assert db_session.query(Category).filter_by(user_id=other.user_id).count() == 1
+    assert db_session.query(Task).filter_by(user_id=other.user_id).count() == 2
+    assert repo.delete_user(user_id) is False
+
+
+def test_search_users_fuzzy(db_session):
+    repo = UserRepository(db_session)
+    repo.create_user("alexander@example.com", "alexander", "pass")
+    repo.create_user("sasha@example.com", "alex", "pass")
+
+    users, total = repo.search_users(query="alex")
+    assert total == 2
+    # Точное совпадение username релевантнее
+    assert [user.username for user in users] == ["alex", "alexander"]
+
+    users, total = repo.search_users(query="alexandr")
+    assert total == 0
+    # Ближе всего alexander (0.58), alex похож меньше (0.4)
+    users, total = repo.search_users(query="alexandr", fuzzy=True)
+    assert [user.username for user in users] == ["alexander", "alex"]
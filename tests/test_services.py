@@ -3,6 +3,7 @@ from fastapi import HTTPException
 
 from src.repositories.user_repository import UserRepository
 from src.services.auth_service import AuthService, UserService
+from src.utils.pagination import TotalMode
 
 
 @pytest.fixture
@@ -73,6 +74,23 @@ def test_search_users(user_service, db_session):
     assert len(result["users"]) == 2
 
 
+def test_search_users_has_more(user_service, db_session):
+    repo = UserRepository(db_session)
+    repo.create_user("has_more1@example.com", "has_more_user1", "pass")
+    repo.create_user("has_more2@example.com", "has_more_user2", "pass")
+
+    result = user_service.search_users(
+        query="has_more", limit=1, include_total=TotalMode.none
+    )
+    assert result["total"] is None
+    assert result["has_more"] is True
+    assert len(result["users"]) == 1
+
+    result = user_service.search_users(query="has_more", skip=1, limit=1)
+    assert result["total"] == 2
+    assert result["has_more"] is False
+
+
 def test_register_user_success(user_service):
     email = "register_test@example.com"
     username = "register_test_user"
@@ -5,11 +5,16 @@
 from datetime import datetime, timedelta
 
 import pytest
+from sqlalchemy import event
 
+from src.config import settings
+from src.database import transaction
 from src.models.category import Category
 from src.models.task import PriorityEnum, StatusEnum, Task
 from src.models.user import User
+from src.repositories import task_repository
 from src.repositories.task_repository import TaskRepository
+from src.utils.pagination import TotalMode
 
 
 class TestTaskRepository:
@@ -110,6 +115,100 @@ class TestTaskRepository:
         assert total == 3
         assert len(tasks) == 3
 
+    def test_get_all_by_user_single_statement(self, task_repo, user, db_session):
+        """Тест: страница и общее количество получаются одним запросом"""
+        for i in range(5):
+            db_session.add(Task(title=f"Task {i + 1}", user_id=user.user_id))
+        db_session.commit()
+        user_id = user.user_id
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            tasks, total = task_repo.get_all_by_user(user_id, skip=1, limit=2)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert len(statements) == 1
+        assert "OVER ()" in statements[0]
+        assert total == 5
+        assert [task.title for task in tasks] == ["Task 4", "Task 3"]
+
+        tasks, total = task_repo.get_all_by_user(user_id, skip=10, limit=2)
+        assert tasks == []
+        assert total == 5
+
+    def test_get_all_by_user_without_total(self, task_repo, user, db_session):
+        """Тест: в режиме none общее количество не считается"""
+        for i in range(3):
+            db_session.add(Task(title=f"Task {i + 1}", user_id=user.user_id))
+        db_session.commit()
+        user_id = user.user_id
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            tasks, total = task_repo.get_all_by_user(
+                user_id, limit=2, total_mode=TotalMode.none
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert total is None
+        assert len(tasks) == 2
+        assert len(statements) == 1
+        assert "count" not in statements[0].lower()
+
+    def test_get_all_by_user_estimated_total(self, task_repo, user, db_session):
+        """Тест: без статистики планировщика (SQLite) оценка заменяется точным"""
+        for i in range(3):
+            db_session.add(Task(title=f"Task {i + 1}", user_id=user.user_id))
+        db_session.commit()
+
+        tasks, total = task_repo.get_all_by_user(
+            user.user_id, limit=2, total_mode=TotalMode.estimate
+        )
+        assert total == 3
+        assert len(tasks) == 2
+
+        first_page, _ = task_repo.get_all_by_user(user.user_id, limit=1)
+        last = first_page[0]
+        tasks, total = task_repo.get_all_by_user(
+            user.user_id,
+            cursor=(last.created_at, last.task_id),
+            total_mode=TotalMode.estimate,
+        )
+        assert total == 3
+        assert len(tasks) == 2
+
+    def test_get_all_by_user_with_cursor(self, task_repo, user, db_session):
+        """Тест keyset-пагинации задач пользователя"""
+        for i in range(5):
+            db_session.add(Task(title=f"Task {i + 1}", user_id=user.user_id))
+        db_session.commit()
+
+        first_page, total = task_repo.get_all_by_user(user.user_id, limit=3)
+        assert total == 5
+        assert len(first_page) == 3
+
+        last = first_page[-1]
+        second_page, _ = task_repo.get_all_by_user(
+            user.user_id, limit=3, cursor=(last.created_at, last.task_id)
+        )
+        assert len(second_page) == 2
+        first_ids = {task.task_id for task in first_page}
+        assert first_ids.isdisjoint(task.task_id for task in second_page)
+
     def test_get_all_by_user_with_filters(self, task_repo, user, db_session):
         """Тест получения задач с фильтрацией"""
         # Создаем задачи с разными статусами
@@ -228,6 +327,71 @@ class TestTaskRepository:
         tasks, total = task_repo.search_tasks("important", user.user_id)
         assert total == 2  # В названии и в описании
 
+    def test_search_tasks_ranked(self, task_repo, user, db_session):
+        """Тест: совпадение в названии релевантнее совпадения в описании"""
+        db_session.add_all(
+            [
+                Task(
+                    title="Code review",
+                    description="Review PR for the release",
+                    user_id=user.user_id,
+                ),
+                Task(
+                    title="Release notes",
+                    description="Write notes",
+                    user_id=user.user_id,
+                ),
+            ]
+        )
+        db_session.commit()
+
+        tasks, total = task_repo.search_tasks("release", user.user_id)
+        assert total == 2
+        assert [task.title for task in tasks] == ["Release notes", "Code review"]
+
+        # По префиксу слова, все слова запроса обязательны
+        tasks, _ = task_repo.search_tasks("rev rel", user.user_id)
+        assert [task.title for task in tasks] == ["Code review"]
+
+        tasks, total = task_repo.search_tasks("?!", user.user_id)
+        assert tasks == []
+        assert total == 0
+
+    def test_search_index_follows_changes(self, task_repo, user, db_session):
+        """Тест: индекс поиска обновляется при изменении и удалении задач"""
+        task = task_repo.create_task(title="Встреча с командой", user_id=user.user_id)
+
+        tasks, _ = task_repo.search_tasks("ВСТРЕЧА", user.user_id)
+        assert [found.task_id for found in tasks] == [task.task_id]
+
+        task_repo.update_task_partial(task.task_id, user.user_id, title="Созвон")
+        assert task_repo.search_tasks("встреча", user.user_id)[1] == 0
+        assert task_repo.search_tasks("созвон", user.user_id)[1] == 1
+
+        task_repo.delete_task(task.task_id, user.user_id)
+        assert task_repo.search_tasks("созвон", user.user_id)[1] == 0
+
+    def test_search_snippets(self, task_repo, user, db_session):
+        """Тест фрагментов с подсветкой совпадений"""
+        task = task_repo.create_task(
+            title="Buy groceries", description="Milk and bread", user_id=user.user_id
+        )
+
+        snippets = task_repo.get_search_snippets("bread", [task.task_id])
+        assert snippets == {task.task_id: "Milk and <mark>bread</mark>"}
+
+    def test_search_tasks_ilike_fallback(
+        self, task_repo, user, db_session, monkeypatch
+    ):
+        """Тест поиска по подстроке при отключенном полнотекстовом поиске"""
+        monkeypatch.setattr(settings, "full_text_search", False)
+        db_session.add(Task(title="Task manager", user_id=user.user_id))
+        db_session.commit()
+
+        tasks, total = task_repo.search_tasks("ask", user.user_id)
+        assert total == 1
+        assert task_repo.get_search_snippets("ask", [tasks[0].task_id]) == {}
+
     def test_update_task(self, task_repo, task, user):
         """Тест обновления задачи"""
         updated_task = task_repo.update_task(
@@ -278,6 +442,134 @@ class TestTaskRepository:
         success = task_repo.delete_task(99999, user.user_id)
         assert success is False
 
+    def test_writes_single_round_trip(self, task_repo, user, db_session):
+        """Тест: создание и изменение задачи - по одному запросу с RETURNING"""
+        user_id = user.user_id
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            task = task_repo.create_task(title="Round trip", user_id=user_id)
+            created = (task.task_id, task.created_at, task.updated_at)
+            updated = task_repo.update_task(
+                task.task_id, user_id, title="Updated", priority=PriorityEnum.high
+            )
+            assert updated is not None
+            updated_fields = (updated.title, updated.priority, updated.updated_at)
+            deleted = task_repo.delete_task(task.task_id, user_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert [statement.split()[0] for statement in statements] == [
+            "INSERT",
+            "UPDATE",
+            "DELETE",
+        ]
+        assert all("RETURNING" in statement for statement in statements)
+        assert None not in created
+        assert updated is task
+        assert updated_fields[:2] == ("Updated", PriorityEnum.high)
+        assert updated_fields[2] is not None
+        assert deleted is True
+
+    def test_update_foreign_task(self, task_repo, task, user):
+        """Тест: чужую или несуществующую задачу обновить нельзя"""
+        assert task_repo.update_task(task.task_id, user.user_id + 1, title="X") is None
+        assert task_repo.update_status(99999, user.user_id, StatusEnum.done) is None
+
+    def test_bulk_create_single_insert(self, task_repo, user, db_session):
+        """Тест: массовое создание выполняется одним INSERT ... RETURNING"""
+        user_id = user.user_id
+        rows = [
+            {
+                "title": f"Bulk {i}",
+                "description": "Описание" if i % 2 else None,
+                "user_id": user_id,
+            }
+            for i in range(50)
+        ]
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            tasks = task_repo.bulk_create(rows)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert len([s for s in statements if s.startswith("INSERT")]) == 1
+        assert [task.title for task in tasks] == [row["title"] for row in rows]
+        assert tasks[1].description == "Описание"
+        assert all(task.created_at is not None for task in tasks)
+        assert task_repo.count_by_user(user_id) == 50
+
+    def test_bulk_update_status_in_chunks(
+        self, task_repo, user, db_session, monkeypatch
+    ):
+        """Тест массового обновления статуса частями одним UPDATE на часть"""
+        monkeypatch.setattr(task_repository, "BULK_CHUNK_SIZE", 2)
+        tasks = [Task(title=f"Bulk {i}", user_id=user.user_id) for i in range(5)]
+        db_session.add_all(tasks)
+        db_session.commit()
+        task_ids = [task.task_id for task in tasks]
+        user_id = user.user_id
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            updated, failed_ids = task_repo.bulk_update_status(
+                list(reversed(task_ids)), user_id, StatusEnum.done
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        assert failed_ids == []
+        assert [task.task_id for task in updated] == list(reversed(task_ids))
+        assert all(task.status == StatusEnum.done for task in updated)
+        assert len([s for s in statements if s.startswith("UPDATE")]) == 3
+        assert task_repo.count_by_status(user_id, StatusEnum.done) == 5
+
+    def test_bulk_update_status_rolls_back_on_missing(
+        self, task_repo, task, user, db_session
+    ):
+        """Тест: при ненайденных ID массовое обновление откатывается транзакцией"""
+        with pytest.raises(LookupError), transaction(db_session):
+            updated, failed_ids = task_repo.bulk_update_status(
+                [task.task_id, 99999], user.user_id, StatusEnum.done
+            )
+            assert updated == []
+            assert failed_ids == [99999]
+            raise LookupError(failed_ids)
+
+        assert task_repo.get_by_id(task.task_id, user.user_id).status == (
+            StatusEnum.todo
+        )
+
+    def test_bulk_delete(self, task_repo, user, db_session, monkeypatch):
+        """Тест массового удаления задач частями"""
+        monkeypatch.setattr(task_repository, "BULK_CHUNK_SIZE", 2)
+        tasks = [Task(title=f"Delete {i}", user_id=user.user_id) for i in range(3)]
+        db_session.add_all(tasks)
+        db_session.commit()
+        task_ids = [task.task_id for task in tasks]
+
+        deleted_ids = task_repo.bulk_delete(task_ids + [99999], user.user_id)
+
+        assert deleted_ids == task_ids
+        assert task_repo.count_by_user(user.user_id) == 0
+
     def test_count_by_user(self, task_repo, user, db_session):
         """Тест подсчета задач пользователя"""
         # Создаем несколько задач
@@ -338,3 +630,68 @@ class TestTaskRepository:
         assert stats["in_progress"] == 1
         assert stats["done"] == 1
         assert stats["overdue"] == 1
+
+    def test_get_task_statistics_breakdowns(
+        self, task_repo, user, category, db_session
+    ):
+        """Тест разрезов статистики по приоритетам и категориям одним запросом"""
+        tasks_data = [
+            {"title": "Low", "priority": PriorityEnum.low},
+            {"title": "High 1", "priority": PriorityEnum.high},
+            {
+                "title": "High 2",
+                "priority": PriorityEnum.high,
+                "category_id": category.category_id,
+            },
+        ]
+        for data in tasks_data:
+            db_session.add(Task(user_id=user.user_id, **data))
+        db_session.commit()
+
+        user_id = user.user_id
+        category_id = category.category_id
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, many):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            stats = task_repo.get_task_statistics(user_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+        assert len(statements) == 1
+        assert stats["total"] == 3
+        assert stats["by_priority"] == {
+            "low": 1,
+            "medium": 0,
+            "high": 2,
+            "urgent": 0,
+        }
+        assert stats["by_category"] == [
+            {"category_id": category_id, "count": 1},
+            {"category_id": None, "count": 2},
+        ]
+
+    def test_count_by_user_uses_covering_index(self, task_repo, user, db_session):
+        """Тест: подсчет задач пользователя выполняется только по индексу"""
+        user_id = user.user_id
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append((statement, parameters))
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            task_repo.count_by_user(user_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        statement, parameters = statements[-1]
+        plan = db_session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN " + statement, parameters
+        )
+        assert any("COVERING INDEX" in row[-1] for row in plan)
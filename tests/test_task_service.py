@@ -4,7 +4,9 @@
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 
+from src.database import transaction
 from src.models.category import Category
 from src.models.task import PriorityEnum, StatusEnum
 from src.models.user import User
@@ -116,10 +118,11 @@ class TestTaskService:
             task_data = TaskCreate(title=f"Task {i + 1}")
             task_service.create_task(task_data, user.user_id)
 
-        tasks, total = task_service.get_user_tasks(user.user_id)
+        page = task_service.get_user_tasks(user.user_id)
 
-        assert total == 3
-        assert len(tasks) == 3
+        assert page["total"] == 3
+        assert len(page["tasks"]) == 3
+        assert page["has_more"] is False
 
     def test_get_user_tasks_with_filters(self, task_service, user):
         """Тест получения задач с фильтрами"""
@@ -132,10 +135,10 @@ class TestTaskService:
 
         # Фильтруем по статусу
         filters = TaskFilter(status=StatusEnum.todo)
-        tasks, total = task_service.get_user_tasks(user.user_id, filters=filters)
+        page = task_service.get_user_tasks(user.user_id, filters=filters)
 
-        assert total == 1
-        assert tasks[0].status == StatusEnum.todo
+        assert page["total"] == 1
+        assert page["tasks"][0].status == StatusEnum.todo
 
     def test_get_tasks_by_category_success(self, task_service, user, category):
         """Тест получения задач по категории"""
@@ -145,12 +148,10 @@ class TestTaskService:
         )
         task_service.create_task(task_data, user.user_id)
 
-        tasks, total = task_service.get_tasks_by_category(
-            user.user_id, category.category_id
-        )
+        page = task_service.get_tasks_by_category(user.user_id, category.category_id)
 
-        assert total == 1
-        assert tasks[0].category_id == category.category_id
+        assert page["total"] == 1
+        assert page["tasks"][0].category_id == category.category_id
 
     def test_get_tasks_by_invalid_category(self, task_service, user):
         """Тест получения задач по несуществующей категории"""
@@ -169,10 +170,10 @@ class TestTaskService:
         task_service.create_task(task1_data, user.user_id)
         task_service.create_task(task2_data, user.user_id)
 
-        tasks, total = task_service.search_tasks(user.user_id, "meeting")
+        page = task_service.search_tasks(user.user_id, "meeting")
 
-        assert total == 1
-        assert "meeting" in tasks[0].title.lower()
+        assert page["total"] == 1
+        assert "meeting" in page["tasks"][0].title.lower()
 
     def test_search_tasks_empty_query(self, task_service, user):
         """Тест поиска с пустым запросом"""
@@ -313,6 +314,45 @@ class TestTaskService:
         assert stats["in_progress"] == 1
         assert stats["done"] == 1
 
+    def test_bulk_create_tasks(self, task_service, user, category):
+        """Тест массового создания задач"""
+        tasks_data = [
+            TaskCreate(title=" First ", category_id=category.category_id),
+            TaskCreate(title="Second", priority=PriorityEnum.high),
+        ]
+
+        tasks = task_service.bulk_create_tasks(tasks_data, user.user_id)
+
+        assert [task.title for task in tasks] == ["First", "Second"]
+        assert tasks[0].category_id == category.category_id
+        assert tasks[1].priority == PriorityEnum.high
+        assert all(task.task_id and task.created_at for task in tasks)
+        assert task_service.task_repo.count_by_user(user.user_id) == 2
+
+    def test_bulk_create_tasks_category_not_found(self, task_service, user):
+        """Тест: массовое создание не создает задачи при чужой категории"""
+        tasks_data = [
+            TaskCreate(title="Valid"),
+            TaskCreate(title="Invalid", category_id=99999),
+        ]
+
+        with pytest.raises(HTTPException) as exc_info:
+            task_service.bulk_create_tasks(tasks_data, user.user_id)
+
+        assert exc_info.value.status_code == 404
+        assert "99999" in str(exc_info.value.detail)
+        assert task_service.task_repo.count_by_user(user.user_id) == 0
+
+    def test_bulk_create_tasks_empty_title(self, task_service, user):
+        """Тест массового создания с пустым названием"""
+        tasks_data = [TaskCreate(title="Valid"), TaskCreate(title="   ")]
+
+        with pytest.raises(HTTPException) as exc_info:
+            task_service.bulk_create_tasks(tasks_data, user.user_id)
+
+        assert exc_info.value.status_code == 400
+        assert task_service.task_repo.count_by_user(user.user_id) == 0
+
     def test_bulk_update_status_success(self, task_service, user):
         """Тест массового обновления статуса"""
         # Создаем несколько задач
@@ -345,6 +385,31 @@ class TestTaskService:
 
         assert exc_info.value.status_code == 400
         assert "99999" in str(exc_info.value.detail)
+        # Транзакция откатилась: найденная задача тоже не изменилась
+        task = task_service.get_task_by_id(valid_task.task_id, user.user_id)
+        assert task.status == StatusEnum.todo
+
+    def test_write_operation_commits_once(self, task_service, user, db_session):
+        """Тест: операция сервиса выполняется в одной транзакции с одним коммитом"""
+        commits = []
+
+        def record_commit(session):
+            commits.append(session)
+
+        event.listen(db_session, "after_commit", record_commit)
+        try:
+            task_service.bulk_create_tasks(
+                [TaskCreate(title=f"Task {i}") for i in range(3)], user.user_id
+            )
+            with transaction(db_session):
+                # Вложенный вызов сервиса присоединяется к внешней транзакции
+                task_service.create_task(TaskCreate(title="Nested"), user.user_id)
+                assert commits == [db_session]
+        finally:
+            event.remove(db_session, "after_commit", record_commit)
+
+        assert len(commits) == 2
+        assert task_service.task_repo.count_by_user(user.user_id) == 4
 
     def test_bulk_delete_tasks_success(self, task_service, user):
         """Тест массового удаления задач"""
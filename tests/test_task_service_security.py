@@ -97,15 +97,15 @@ class TestTaskServiceSecurity:
             task_service.create_task(task_data, another_user.user_id)
 
         # Проверяем, что каждый пользователь видит только свои задачи
-        user1_tasks, user1_total = task_service.get_user_tasks(test_user.user_id)
-        assert user1_total == 3
-        for task in user1_tasks:
+        user1_page = task_service.get_user_tasks(test_user.user_id)
+        assert user1_page["total"] == 3
+        for task in user1_page["tasks"]:
             assert "User1" in task.title
             assert task.user_id == test_user.user_id
 
-        user2_tasks, user2_total = task_service.get_user_tasks(another_user.user_id)
-        assert user2_total == 2
-        for task in user2_tasks:
+        user2_page = task_service.get_user_tasks(another_user.user_id)
+        assert user2_page["total"] == 2
+        for task in user2_page["tasks"]:
             assert "User2" in task.title
             assert task.user_id == another_user.user_id
 
@@ -121,19 +121,19 @@ class TestTaskServiceSecurity:
         task_service.create_task(task_data, another_user.user_id)
 
         # Каждый пользователь должен видеть только свои задачи
-        user1_tasks, user1_total = task_service.get_tasks_by_status(
+        user1_page = task_service.get_tasks_by_status(
             test_user.user_id, StatusEnum.in_progress
         )
-        assert user1_total == 1
-        assert user1_tasks[0].title == "User1 In Progress"
-        assert user1_tasks[0].user_id == test_user.user_id
+        assert user1_page["total"] == 1
+        assert user1_page["tasks"][0].title == "User1 In Progress"
+        assert user1_page["tasks"][0].user_id == test_user.user_id
 
-        user2_tasks, user2_total = task_service.get_tasks_by_status(
+        user2_page = task_service.get_tasks_by_status(
             another_user.user_id, StatusEnum.in_progress
         )
-        assert user2_total == 1
-        assert user2_tasks[0].title == "User2 In Progress"
-        assert user2_tasks[0].user_id == another_user.user_id
+        assert user2_page["total"] == 1
+        assert user2_page["tasks"][0].title == "User2 In Progress"
+        assert user2_page["tasks"][0].user_id == another_user.user_id
 
     def test_search_tasks_isolation(self, db_session, test_user, another_user):
         """Тест: поиск задач - изоляция пользователей"""
@@ -147,19 +147,15 @@ class TestTaskServiceSecurity:
         task_service.create_task(task_data, another_user.user_id)
 
         # Каждый пользователь должен находить только свои задачи
-        user1_tasks, user1_total = task_service.search_tasks(
-            test_user.user_id, "Important"
-        )
-        assert user1_total == 1
-        assert "User1" in user1_tasks[0].title
-        assert user1_tasks[0].user_id == test_user.user_id
-
-        user2_tasks, user2_total = task_service.search_tasks(
-            another_user.user_id, "Important"
-        )
-        assert user2_total == 1
-        assert "User2" in user2_tasks[0].title
-        assert user2_tasks[0].user_id == another_user.user_id
+        user1_page = task_service.search_tasks(test_user.user_id, "Important")
+        assert user1_page["total"] == 1
+        assert "User1" in user1_page["tasks"][0].title
+        assert user1_page["tasks"][0].user_id == test_user.user_id
+
+        user2_page = task_service.search_tasks(another_user.user_id, "Important")
+        assert user2_page["total"] == 1
+        assert "User2" in user2_page["tasks"][0].title
+        assert user2_page["tasks"][0].user_id == another_user.user_id
 
     def test_bulk_update_status_security(self, db_session, test_user, another_user):
         """Тест: массовое обновление статуса - защита от чужих задач"""
@@ -2,10 +2,16 @@
 Тесты для API задач.
 """
 
+import csv
+import io
+import json
 from datetime import datetime, timedelta
 
 from fastapi.testclient import TestClient
 
+from src.schemas.task import TaskResponse
+from src.services import task_export, task_import
+
 
 class TestTasksAPI:
     """Тесты для API задач"""
@@ -92,6 +98,85 @@ class TestTasksAPI:
         assert data["page"] == 1
         assert data["per_page"] == 3
 
+    def test_get_tasks_with_cursor(self, client: TestClient, auth_headers: dict):
+        """Тест курсорной пагинации списка задач"""
+        for i in range(5):
+            client.post(
+                "/api/tasks/", json={"title": f"Task {i + 1}"}, headers=auth_headers
+            )
+
+        seen_ids: list[int] = []
+        cursor = None
+        for _ in range(3):
+            params: dict = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/tasks/", params=params, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] == 5
+            seen_ids.extend(task["task_id"] for task in data["tasks"])
+            cursor = data["next_cursor"]
+
+        # Все задачи получены ровно один раз, от новых к старым
+        assert len(seen_ids) == 5
+        assert seen_ids == sorted(seen_ids, reverse=True)
+        assert cursor is None
+
+    def test_get_tasks_without_total(self, client: TestClient, auth_headers: dict):
+        """Тест списка задач без подсчета общего количества"""
+        for i in range(3):
+            client.post(
+                "/api/tasks/", json={"title": f"Task {i + 1}"}, headers=auth_headers
+            )
+
+        response = client.get(
+            "/api/tasks/",
+            params={"limit": 2, "include_total": "none"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["has_more"] is True
+        assert len(data["tasks"]) == 2
+
+        response = client.get(
+            "/api/tasks/",
+            params={"limit": 2, "include_total": "none", "cursor": data["next_cursor"]},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["has_more"] is False
+        assert data["next_cursor"] is None
+        assert len(data["tasks"]) == 1
+
+    def test_get_tasks_estimated_total(self, client: TestClient, auth_headers: dict):
+        """Тест оценочного подсчета: на небольших выборках total точный"""
+        client.post("/api/tasks/", json={"title": "Task"}, headers=auth_headers)
+
+        response = client.get(
+            "/api/tasks/", params={"include_total": "estimate"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["has_more"] is False
+
+    def test_get_tasks_invalid_total_mode(self, client: TestClient, auth_headers: dict):
+        """Тест неизвестного режима подсчета"""
+        response = client.get(
+            "/api/tasks/?include_total=sometimes", headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    def test_get_tasks_with_invalid_cursor(
+        self, client: TestClient, auth_headers: dict
+    ):
+        """Тест получения задач с поврежденным курсором"""
+        response = client.get("/api/tasks/?cursor=garbage", headers=auth_headers)
+        assert response.status_code == 400
+
     def test_get_tasks_with_filters(self, client: TestClient, auth_headers: dict):
         """Тест получения задач с фильтрацией"""
         # Создаем задачу с определенным статусом
@@ -106,6 +191,188 @@ class TestTasksAPI:
         for task in data["tasks"]:
             assert task["status"] == "in_progress"
 
+    def test_export_tasks_ndjson(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        another_user_headers: dict,
+        monkeypatch,
+    ):
+        """Тест потоковой выгрузки задач в NDJSON с фильтром"""
+        # Маленькие пачки: выгрузка читает курсор в несколько приемов
+        monkeypatch.setattr(task_export, "EXPORT_BATCH_SIZE", 2)
+        tasks = [{"title": f"Export {i}", "status": "done"} for i in range(5)]
+        tasks.append({"title": "Not exported", "status": "todo"})
+        client.post("/api/tasks/bulk", json={"tasks": tasks}, headers=auth_headers)
+        client.post(
+            "/api/tasks/", json={"title": "Other user"}, headers=another_user_headers
+        )
+
+        response = client.get("/api/tasks/export?status=done", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(row["title"] for row in rows) == [f"Export {i}" for i in range(5)]
+        assert rows[0].keys() == TaskResponse.model_fields.keys()
+        assert [row["task_id"] for row in rows] == sorted(
+            (row["task_id"] for row in rows), reverse=True
+        )
+
+    def test_export_tasks_csv(
+        self, client: TestClient, auth_headers: dict, test_task_with_category: dict
+    ):
+        """Тест выгрузки задач в CSV"""
+        client.post(
+            "/api/tasks/", json={"title": "Без категории"}, headers=auth_headers
+        )
+
+        response = client.get(
+            "/api/tasks/export",
+            params={
+                "format": "csv",
+                "category_id": test_task_with_category["category_id"],
+            },
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "text/csv; charset=utf-8"
+        assert 'filename="tasks.csv"' in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["task_id"] == str(test_task_with_category["task_id"])
+        assert rows[0]["title"] == "Task with Category"
+        assert rows[0]["status"] == "todo"
+        assert rows[0]["due_date"] == ""
+
+    def test_export_tasks_requires_auth(self, client: TestClient):
+        """Тест: выгрузка недоступна без авторизации"""
+        assert client.get("/api/tasks/export").status_code == 401
+
+    def test_import_tasks_ndjson(
+        self,
+        client: TestClient,
+        auth_headers: dict,
+        test_category: dict,
+        monkeypatch,
+    ):
+        """Тест загрузки NDJSON: категории по названию, ошибки по строкам"""
+        monkeypatch.setattr(task_import, "IMPORT_BATCH_SIZE", 2)
+        lines = [
+            json.dumps({"title": "Первая", "category": test_category["title"]}),
+            json.dumps({"title": "Вторая", "priority": "high", "task_id": 999}),
+            "",
+            "{not json",
+            json.dumps({"title": "Чужая категория", "category": "Нет такой"}),
+            json.dumps({"description": "Без названия"}),
+            json.dumps({"title": "Третья", "category_id": 99999}),
+            json.dumps(["not", "an", "object"]),
+            json.dumps({"title": "Последняя", "due_date": "2025-12-31T23:59:59"}),
+        ]
+
+        response = client.post(
+            "/api/tasks/import",
+            content="\n".join(lines).encode(),
+            headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["created"] == 3
+        assert result["failed"] == 5
+        assert [error["row"] for error in result["errors"]] == [4, 5, 6, 7, 8]
+        assert result["errors"][1]["errors"] == ["Category not found: Нет такой"]
+        assert result["errors"][2]["errors"] == ["title: Field required"]
+
+        tasks = client.get("/api/tasks/?limit=10", headers=auth_headers).json()
+        by_title = {task["title"]: task for task in tasks["tasks"]}
+        assert set(by_title) == {"Первая", "Вторая", "Последняя"}
+        assert by_title["Первая"]["category_id"] == test_category["category_id"]
+        assert by_title["Вторая"]["priority"] == "high"
+        assert by_title["Вторая"]["task_id"] != 999
+
+    def test_import_tasks_csv_round_trip(self, client: TestClient, auth_headers: dict):
+        """Тест: выгрузка в CSV загружается обратно, включая многострочные поля"""
+        client.post(
+            "/api/tasks/bulk",
+            json={
+                "tasks": [
+                    {"title": "Отчет, квартал", "description": 'Строка 1\n"Строка 2"'},
+                    {"title": "工作任务", "status": "done"},
+                ]
+            },
+            headers=auth_headers,
+        )
+        exported = client.get("/api/tasks/export?format=csv", headers=auth_headers)
+
+        response = client.post(
+            "/api/tasks/import",
+            content=exported.content,
+            headers={**auth_headers, "Content-Type": "text/csv"},
+        )
+
+        assert response.json() == {"created": 2, "failed": 0, "errors": []}
+        tasks = client.get("/api/tasks/?limit=10", headers=auth_headers).json()
+        assert tasks["total"] == 4
+        copies = [task for task in tasks["tasks"] if task["title"] == "Отчет, квартал"]
+        assert {task["description"] for task in copies} == {'Строка 1\n"Строка 2"'}
+
+    def test_import_tasks_multipart(self, client: TestClient, auth_headers: dict):
+        """Тест загрузки файла через multipart/form-data"""
+        content = "title,status\nИз файла,in_progress\nБез статуса,\n,done\n"
+
+        response = client.post(
+            "/api/tasks/import",
+            files={"file": ("tasks.csv", content.encode(), "application/octet-stream")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["created"] == 2
+        assert result["errors"] == [{"row": 4, "errors": ["title: Field required"]}]
+
+    def test_import_tasks_malformed_records(
+        self, client: TestClient, auth_headers: dict, monkeypatch
+    ):
+        """Тест: слишком длинная строка и незакрытая кавычка - ошибки строк"""
+        monkeypatch.setattr(task_import, "MAX_RECORD_LENGTH", 100)
+        content = "\n".join(
+            ["title,description", f"Long,{'x' * 200}", "Короткая,ok", 'Broken,"open']
+        )
+
+        response = client.post(
+            "/api/tasks/import",
+            content=content.encode(),
+            headers={**auth_headers, "Content-Type": "text/csv; charset=utf-8"},
+        )
+
+        assert response.json() == {
+            "created": 1,
+            "failed": 2,
+            "errors": [
+                {"row": 2, "errors": ["Line is too long"]},
+                {"row": 4, "errors": ["Unterminated quoted value"]},
+            ],
+        }
+
+    def test_import_tasks_unsupported_format(
+        self, client: TestClient, auth_headers: dict
+    ):
+        """Тест: неизвестный формат и multipart без файла"""
+        response = client.post(
+            "/api/tasks/import", json=[{"title": "JSON"}], headers=auth_headers
+        )
+        assert response.status_code == 415
+
+        response = client.post(
+            "/api/tasks/import",
+            files={"other": ("tasks.csv", b"title\nTask\n", "text/csv")},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
+
     def test_get_task_by_id(
         self, client: TestClient, auth_headers: dict, test_task: dict
     ):
@@ -170,6 +437,80 @@ class TestTasksAPI:
         assert len(data["tasks"]) >= 1
         assert any("Unique" in task["title"] for task in data["tasks"])
 
+    def test_search_tasks_highlight(self, client: TestClient, auth_headers: dict):
+        """Тест поиска с подсветкой совпадений"""
+        client.post(
+            "/api/tasks/",
+            json={"title": "Plan", "description": "Prepare the quarterly report"},
+            headers=auth_headers,
+        )
+
+        response = client.get(
+            "/api/tasks/search",
+            params={"q": "report", "highlight": "true"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        task = response.json()["tasks"][0]
+        assert task["snippet"] == "Prepare the quarterly <mark>report</mark>"
+
+        response = client.get("/api/tasks/search?q=report", headers=auth_headers)
+        assert response.json()["tasks"][0]["snippet"] is None
+
+    def test_search_tasks_highlight_escapes_html(
+        self, client: TestClient, auth_headers: dict
+    ):
+        """Тест: разметка из текста задачи в фрагменте экранируется"""
+        client.post(
+            "/api/tasks/",
+            json={
+                "title": "<script>alert(1)</script><img src=x onerror=alert(1)> report"
+            },
+            headers=auth_headers,
+        )
+
+        response = client.get(
+            "/api/tasks/search",
+            params={"q": "report", "highlight": "true"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        snippet = response.json()["tasks"][0]["snippet"]
+        assert "<img" not in snippet
+        assert "<script>" not in snippet
+        assert snippet == (
+            "&lt;script&gt;alert(1)&lt;/script&gt;"
+            "&lt;img src=x onerror=alert(1)&gt; <mark>report</mark>"
+        )
+
+    def test_search_tasks_recent_with_cursor(
+        self, client: TestClient, auth_headers: dict
+    ):
+        """Тест: курсор выдается только для порядка от новых к старым"""
+        for i in range(3):
+            client.post(
+                "/api/tasks/", json={"title": f"Report {i}"}, headers=auth_headers
+            )
+
+        params = {"q": "report", "limit": 2}
+        data = client.get("/api/tasks/search", params=params, headers=auth_headers)
+        assert data.json()["has_more"] is True
+        assert data.json()["next_cursor"] is None
+
+        params["order"] = "recent"
+        data = client.get(
+            "/api/tasks/search", params=params, headers=auth_headers
+        ).json()
+        assert [task["title"] for task in data["tasks"]] == ["Report 2", "Report 1"]
+
+        del params["order"]
+        params["cursor"] = data["next_cursor"]
+        data = client.get(
+            "/api/tasks/search", params=params, headers=auth_headers
+        ).json()
+        assert [task["title"] for task in data["tasks"]] == ["Report 0"]
+        assert data["has_more"] is False
+
     def test_get_tasks_by_status(self, client: TestClient, auth_headers: dict):
         """Тест получения задач по статусу"""
         # Создаем задачу с определенным статусом
@@ -211,6 +552,31 @@ class TestTasksAPI:
         assert "archived" in data
         assert "overdue" in data
 
+    def test_bulk_create_tasks(self, client: TestClient, auth_headers: dict):
+        """Тест массового создания задач"""
+        bulk_data = {
+            "tasks": [
+                {"title": "Bulk Task 1"},
+                {"title": "Bulk Task 2", "priority": "high"},
+            ]
+        }
+        response = client.post("/api/tasks/bulk", json=bulk_data, headers=auth_headers)
+        assert response.status_code == 201
+
+        data = response.json()
+        assert [task["title"] for task in data] == ["Bulk Task 1", "Bulk Task 2"]
+        assert data[1]["priority"] == "high"
+
+        response = client.get("/api/tasks/", headers=auth_headers)
+        assert response.json()["total"] == 2
+
+    def test_bulk_create_tasks_empty_list(self, client: TestClient, auth_headers: dict):
+        """Тест массового создания с пустым списком"""
+        response = client.post(
+            "/api/tasks/bulk", json={"tasks": []}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
     def test_bulk_update_status(self, client: TestClient, auth_headers: dict):
         """Тест массового обновления статуса"""
         # Создаем несколько задач
@@ -0,0 +1,143 @@
+"""
+Тесты для трассировки запросов.
+"""
+
+import asyncio
+import json
+
+import pytest
+from starlette.middleware import Middleware
+
+from src.app import app
+from src.monitoring.middleware import QueryCountMiddleware, TracingMiddleware
+from src.monitoring.tracing import (
+    InMemoryExporter,
+    JsonLinesExporter,
+    configure_tracing,
+    parse_traceparent,
+    root_span,
+    traced,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exporter():
+    """Трассировка всех запросов в память"""
+    exporter = InMemoryExporter()
+    configure_tracing(exporter, sample_rate=1.0)
+    yield exporter
+    configure_tracing(None, sample_rate=0)
+
+
+@pytest.fixture
+def traced_client(client, exporter):
+    """Клиент приложения с TracingMiddleware внутри счетчика запросов к БД"""
+    position = next(
+        index
+        for index, middleware in enumerate(app.user_middleware)
+        if middleware.cls is QueryCountMiddleware
+    )
+    tracing = Middleware(TracingMiddleware)
+    app.user_middleware.insert(position + 1, tracing)
+    app.middleware_stack = None
+    yield client
+    app.user_middleware.remove(tracing)
+    app.middleware_stack = None
+
+
+def test_request_spans_by_layer(traced_client, exporter, auth_headers):
+    """Тест: спаны маршрута, сервиса, репозитория и SQL вложены по слоям"""
+    task = traced_client.post(
+        "/api/tasks/", json={"title": "Traced"}, headers=auth_headers
+    ).json()
+    exporter.clear()
+
+    response = traced_client.get(
+        f"/api/tasks/{task['task_id']}",
+        headers={**auth_headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"},
+    )
+
+    assert response.status_code == 200
+    spans = {span.span_id: span for span in exporter.spans}
+    assert {span.trace_id for span in spans.values()} == {TRACE_ID}
+    root = next(span for span in spans.values() if span.kind == "route")
+    assert root.name == "GET /api/tasks/{task_id}"
+    assert root.parent_id == PARENT_ID
+    assert root.attributes["status_code"] == 200
+    assert response.headers["traceparent"] == f"00-{TRACE_ID}-{root.span_id}-01"
+
+    service = next(s for s in spans.values() if s.name == "TaskService.get_task_by_id")
+    assert service.kind == "service"
+    assert service.parent_id == root.span_id
+    repository = next(s for s in spans.values() if s.name == "TaskRepository.get_by_id")
+    assert repository.parent_id == service.span_id
+    sql = next(s for s in spans.values() if s.parent_id == repository.span_id)
+    assert sql.kind == "sql"
+    assert sql.attributes["statement"].startswith("SELECT")
+    assert all(span.end_time_ns >= span.start_time_ns > 0 for span in spans.values())
+
+
+def test_unsampled_requests_not_traced(traced_client, exporter):
+    """Тест: невыбранный запрос не создает спанов"""
+    configure_tracing(exporter, sample_rate=0)
+
+    response = traced_client.get("/health")
+    traced_client.get(
+        "/health", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"}
+    )
+
+    assert exporter.spans == []
+    assert "traceparent" not in response.headers
+
+
+def test_parse_traceparent():
+    """Тест: разбор заголовка traceparent"""
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (
+        TRACE_ID,
+        PARENT_ID,
+        True,
+    )
+    assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_traced_async_method_error(exporter):
+    """Тест: ошибка в методе отмечается в спане"""
+
+    @traced("service")
+    class Service:
+        async def fail(self):
+            raise LookupError
+
+    async def scenario():
+        with root_span("job", "route"):
+            await Service().fail()
+
+    with pytest.raises(LookupError):
+        asyncio.run(scenario())
+
+    root, child = exporter.spans
+    assert child.name == "Service.fail"
+    assert child.parent_id == root.span_id
+    assert child.status == root.status == "error"
+    assert child.attributes["error"] == "LookupError"
+
+
+def test_json_lines_exporter(tmp_path, exporter):
+    """Тест: каждая трасса дописывается в файл построчно"""
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(JsonLinesExporter(path), sample_rate=1.0)
+
+    for _ in range(2):
+        with root_span("job", "route", job="export"):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(records) == 2
+    assert records[0]["name"] == "job"
+    assert records[0]["attributes"] == {"job": "export"}
+    assert records[0]["trace_id"] != records[1]["trace_id"]
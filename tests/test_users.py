@@ -2,6 +2,11 @@
 Тесты для защищенных эндпоинтов пользователей
 """
 
+import jwt
+from sqlalchemy import event
+
+from src.config import settings
+
 
 def get_access_token(client, user_data: dict) -> str:
     """Вспомогательная функция для получения токена доступа"""
@@ -116,6 +121,22 @@ def test_search_users(client, test_user_data):
     assert any(test_user_data["email"] in u["email"] for u in data["users"])
 
 
+def test_search_users_fuzzy(client, test_user_data):
+    """Тест нечеткого поиска пользователей (опечатка в запросе)"""
+    token = get_access_token(client, test_user_data)
+    headers = {"Authorization": f"Bearer {token}"}
+    typo = test_user_data["username"].replace("user", "usr")
+
+    response = client.get(f"/api/users?search={typo}", headers=headers)
+    assert response.json()["total"] == 0
+
+    response = client.get(f"/api/users?search={typo}&fuzzy=true", headers=headers)
+    assert response.status_code == 200
+    assert [u["username"] for u in response.json()["users"]] == [
+        test_user_data["username"]
+    ]
+
+
 def test_update_user_me(client, test_user_data):
     """Тест обновления текущего пользователя"""
     token = get_access_token(client, test_user_data)
@@ -165,6 +186,55 @@ def test_register_duplicate_username(client, test_user_data):
     assert response.status_code == 400 or response.status_code == 409
 
 
+def test_duplicate_registration_skips_password_hashing(
+    client, test_user_data, monkeypatch
+):
+    """Тест: занятые email или username отклоняются без хеширования пароля"""
+    client.post("/auth/register", json=test_user_data)
+    hashed = []
+
+    async def fake_hash(password: str) -> str:
+        hashed.append(password)
+        return "hashed"
+
+    monkeypatch.setattr(
+        "src.services.async_services.get_password_hash_async", fake_hash
+    )
+
+    taken_email = {**test_user_data, "username": test_user_data["username"] + "_x"}
+    taken_username = {**test_user_data, "email": "other_" + test_user_data["email"]}
+    for user_data in (taken_email, taken_username):
+        response = client.post("/auth/register", json=user_data)
+        assert response.status_code == 400
+    assert hashed == []
+
+
+def test_update_user_taken_username_skips_password_hashing(
+    client, test_user_data, another_user_data, monkeypatch
+):
+    """Тест: смена пароля с занятым username отклоняется без хеширования"""
+    client.post("/auth/register", json=another_user_data)
+    token = get_access_token(client, test_user_data)
+    hashed = []
+
+    async def fake_hash(password: str) -> str:
+        hashed.append(password)
+        return "hashed"
+
+    monkeypatch.setattr(
+        "src.services.async_services.get_password_hash_async", fake_hash
+    )
+
+    response = client.put(
+        "/api/users/me",
+        json={"username": another_user_data["username"], "password": "newpassword1"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already taken"
+    assert hashed == []
+
+
 def test_get_user_by_id(client, test_user_data):
     """Тест получения пользователя по ID"""
     token = get_access_token(client, test_user_data)
@@ -224,3 +294,52 @@ def test_delete_user_by_id(client, test_user_data):
     }
     login_response = client.post("/token", data=login_data)
     assert login_response.status_code == 401
+
+
+def test_access_token_contains_principal_claims(client, test_user_data):
+    """Тест: токен содержит claims user_id и username"""
+    token = get_access_token(client, test_user_data)
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+    assert payload["sub"] == test_user_data["email"]
+    assert payload["username"] == test_user_data["username"]
+    assert isinstance(payload["user_id"], int)
+
+
+def test_stateless_principal_skips_user_lookup(
+    client, db_session, test_user_data, monkeypatch
+):
+    """Тест: в режиме stateless principal пользователь не читается из БД"""
+    monkeypatch.setattr(settings, "jwt_stateless_principal", True)
+    token = get_access_token(client, test_user_data)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client.get("/api/tasks/", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert response.status_code == 200
+    assert not [s for s in statements if "FROM users" in s]
+
+    # Эндпоинтам, которым нужна полная запись, пользователь загружается по ID
+    response = client.get("/api/users/me/", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == test_user_data["email"]
+
+
+def test_stateless_principal_deleted_user(client, test_user_data, monkeypatch):
+    """Тест: полная запись удаленного пользователя не загружается"""
+    monkeypatch.setattr(settings, "jwt_stateless_principal", True)
+    token = get_access_token(client, test_user_data)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.delete("/api/users/me", headers=headers).status_code == 204
+    assert client.get("/api/users/me/", headers=headers).status_code == 401
@@ -1,4 +1,23 @@
-from src.utils.password import get_password_hash, verify_password
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+from src.config import settings
+from src.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from src.utils.pagination import build_page
+from src.utils.password import (
+    get_password_executor,
+    get_password_hash,
+    get_password_hash_async,
+    shutdown_password_executor,
+    verify_password,
+    verify_password_async,
+)
+from src.utils.trigram import similarity, trigrams
 
 
 def test_password_hashing():
@@ -7,3 +26,77 @@ def test_password_hashing():
     assert hashed_password != password
     assert verify_password(password, hashed_password)
     assert not verify_password("wrongpassword", hashed_password)
+
+
+def test_password_hash_uses_configured_rounds():
+    hashed_password = get_password_hash("plainpassword")
+    assert hashed_password.startswith(f"$2b${settings.bcrypt_rounds:02d}$")
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_password_hashing_async(monkeypatch, workers):
+    monkeypatch.setattr(settings, "password_hash_workers", workers)
+
+    async def scenario():
+        hashed_password = await get_password_hash_async("plainpassword")
+        assert await verify_password_async("plainpassword", hashed_password)
+        assert not await verify_password_async("wrongpassword", hashed_password)
+
+    try:
+        asyncio.run(scenario())
+        assert (get_password_executor() is not None) == bool(workers)
+    finally:
+        shutdown_password_executor()
+
+
+def test_cursor_roundtrip():
+    created_at = datetime(2025, 6, 25, 10, 0, 0, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_decode_invalid_cursor():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
+def test_build_page():
+    # Запрошено limit + 1 строк: лишняя строка означает следующую страницу
+    page = build_page("items", [1, 2, 3], 10, skip=4, limit=2)
+    assert page == {
+        "items": [1, 2],
+        "total": 10,
+        "page": 3,
+        "per_page": 2,
+        "has_more": True,
+    }
+
+    page = build_page("items", [1], None, skip=0, limit=2)
+    assert page["items"] == [1]
+    assert page["page"] == 1
+    assert page["has_more"] is False
+
+
+def test_trigram_similarity_matches_pg_trgm():
+    # Значения similarity() из pg_trgm
+    assert trigrams("Word") == {"  w", " wo", "wor", "ord", "rd "}
+    assert similarity("word", "two words") == pytest.approx(4 / 11)
+    assert similarity("john.doe", "JOHN doe") == 1.0
+    assert similarity("abc", None) == 0.0
+    assert similarity("...", "!!!") == 0.0
+
+
+def test_models_import_without_settings():
+    # Модели (и alembic/env.py) не зависят от настроек приложения
+    code = (
+        "import sys, src.models; "
+        "assert 'src.config' not in sys.modules, 'src.config imported'"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={"PATH": os.environ.get("PATH", "")},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr